@@ -1,23 +1,47 @@
 # Glotaran package __init__.py
 
-from . import model, parameter, io  # noqa: F401
+# The subpackages and the shortcuts below are imported on first access (PEP 562), so that
+# `import glotaran` does not pull in lmfit, scipy, pandas and xarray. Python 3.6 has no module
+# level `__getattr__`, there the shortcuts are imported eagerly.
 
-__version__ = '0.0.10'
-
-ParameterGroup = parameter.ParameterGroup
-
-read_parameter_from_csv_file = ParameterGroup.from_csv
-read_parameter_from_yml = ParameterGroup.from_yaml
-read_parameter_from_yml_file = ParameterGroup.from_yaml_file
-
-from .models import spectral_temporal  # noqa: E402
-KineticModel = spectral_temporal.KineticModel
+import importlib
+import sys
 
-from .models import doas  # noqa: E402
-DOASModel = doas.DOASModel
-
-
-from .parse import parser  # noqa: E402
+__version__ = '0.0.10'
 
-read_model_from_yml = parser.load_yml
-read_model_from_yml_file = parser.load_yml_file
+_SUBPACKAGES = {'analysis', 'examples', 'io', 'model', 'models', 'parameter', 'parse'}
+
+_LAZY_ATTRIBUTES = {
+    'ParameterGroup': ('glotaran.parameter', 'ParameterGroup'),
+    'read_parameter_from_csv_file': ('glotaran.parameter', 'ParameterGroup.from_csv'),
+    'read_parameter_from_yml': ('glotaran.parameter', 'ParameterGroup.from_yaml'),
+    'read_parameter_from_yml_file': ('glotaran.parameter', 'ParameterGroup.from_yaml_file'),
+    'KineticModel': ('glotaran.models.spectral_temporal', 'KineticModel'),
+    'DOASModel': ('glotaran.models.doas', 'DOASModel'),
+    'read_model_from_yml': ('glotaran.parse.parser', 'load_yml'),
+    'read_model_from_yml_file': ('glotaran.parse.parser', 'load_yml_file'),
+}
+
+
+def __getattr__(name):
+    if name in _SUBPACKAGES:
+        return importlib.import_module(f'glotaran.{name}')
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module 'glotaran' has no attribute '{name}'")
+    module, path = _LAZY_ATTRIBUTES[name]
+    value = importlib.import_module(module)
+    for attribute in path.split('.'):
+        value = getattr(value, attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | _SUBPACKAGES | set(_LAZY_ATTRIBUTES))
+
+
+if sys.version_info < (3, 7):
+    from . import model, parameter, io  # noqa: F401, E402
+    for _name in _LAZY_ATTRIBUTES:
+        __getattr__(_name)
+    del _name
@@ -0,0 +1,80 @@
+"""Functions for optimizing many independent datasets with one model."""
+
+import typing
+
+import xarray as xr
+
+import glotaran  # noqa F01
+from glotaran.parameter import ParameterGroup
+
+from .optimize import optimize
+from .parallel import WorkerPool
+from .result import Result
+
+
+def optimize_batch(model: typing.Type['glotaran.model.Model'],
+                   parameter: ParameterGroup,
+                   datasets: typing.Iterable[typing.Dict[str, typing.Union[xr.Dataset,
+                                                                           xr.DataArray]]],
+                   workers: int = None,
+                   nnls: bool = False,
+                   max_nfev: int = None,
+                   group_atol: float = 0,
+                   max_pending: int = None,
+                   ) -> typing.Iterator[typing.Union[Result, Exception]]:
+    """Optimizes the parameter independently for every entry in `datasets`.
+
+    The model and the initial parameter are sent once to every worker process, the data is
+    streamed to the workers. This is a generator, the results are yielded in the order of
+    `datasets` as they complete, while only a bounded number of datasets is in flight. Neither
+    the datasets nor the results are therefore held in memory all at once.
+
+    Parameters
+    ----------
+    model :
+        The global analysis model.
+    parameter :
+        The initial parameter for every optimization.
+    datasets :
+        An iterable of data dictionaries. Every data dictionary contains the datasets for one
+        optimization with their labels as keys.
+    workers :
+        The number of worker processes. If `None` the number of processors is used. With `1`
+        the optimizations run in the calling process.
+    nnls :
+        If `True` non-linear least squaes optimizing is used instead of variable projection.
+    max_nfev :
+        Maximum number of function evaluations. `None` for unlimited.
+    group_atol :
+        The tolerance for grouping datasets along the global dimension.
+    max_pending :
+        The maximum number of datasets in flight. If `None` two per worker process.
+
+    Yields
+    ------
+    result :
+        The results in the order of `datasets`. If an optimization fails, its entry is the raised
+        exception instead of a :class:`Result`.
+    """
+    state = {
+        'model': model,
+        'parameter': parameter,
+        'nnls': nnls,
+        'max_nfev': max_nfev,
+        'group_atol': group_atol,
+    }
+    with WorkerPool(workers, state) as pool:
+        yield from pool.imap(_optimize_in_worker, datasets, max_pending=max_pending)
+
+
+def _optimize_in_worker(state: typing.Dict[str, typing.Any],
+                        data: typing.Dict[str, typing.Union[xr.Dataset, xr.DataArray]]
+                        ) -> typing.Union[Result, Exception]:
+    """Optimizes one data dictionary with the model of the state."""
+    try:
+        result = Result(state['model'], data, state['parameter'], state['nnls'],
+                        atol=state['group_atol'])
+        optimize(result, verbose=False, max_nfev=state['max_nfev'])
+        return result
+    except Exception as e:
+        return e
@@ -0,0 +1,317 @@
+"""Functions for estimating parameter uncertainties by bootstrapping the residual."""
+
+import typing
+import warnings
+
+import numpy as np
+import xarray as xr
+
+import glotaran  # noqa F01
+
+from .optimize import optimize
+from .parallel import WorkerPool, warm_start_parameter
+
+
+class BootstrapResult(typing.NamedTuple):
+    """The summary statistics of the parameters optimized on bootstrap replicates."""
+
+    labels: typing.List[str]
+    """The labels of the varying parameters and the parameters defined by an expression."""
+
+    n: int
+    """The number of successfully optimized replicates."""
+
+    failed: int
+    """The number of replicates which failed to optimize. A warning with the first error is
+    issued if replicates failed."""
+
+    mean: np.ndarray
+    """The mean of the parameters over the replicates in the order of :attr:`labels`."""
+
+    std: np.ndarray
+    """The sample standard deviation of the parameters over the replicates."""
+
+    minimum: np.ndarray
+    """The minimum of the parameters over the replicates."""
+
+    maximum: np.ndarray
+    """The maximum of the parameters over the replicates."""
+
+    quantiles: typing.Dict[float, np.ndarray]
+    """The estimated quantiles of the parameters with the quantiles as keys."""
+
+
+class StreamingStatistics:
+    """Summary statistics of a stream of value vectors with constant memory.
+
+    The mean and the variance are updated with Welford's algorithm, the quantiles are estimated
+    with the P² algorithm of Jain and Chlamtac, which tracks five markers per quantile and value
+    instead of storing the values.
+    """
+
+    def __init__(self, size: int, quantiles: typing.Sequence[float] = (0.025, 0.5, 0.975)):
+        """
+        Parameters
+        ----------
+        size :
+            The number of values in each vector.
+        quantiles :
+            The quantiles to estimate, between 0 and 1.
+        """
+        quantiles = np.asarray(quantiles, dtype=np.float64)
+        if np.any((quantiles <= 0) | (quantiles >= 1)):
+            raise ValueError(f"Quantiles must be between 0 and 1, got {quantiles.tolist()}")
+        self._quantiles = quantiles
+        self._count = 0
+        self._mean = np.zeros(size)
+        self._m2 = np.zeros(size)
+        self._minimum = np.full(size, np.inf)
+        self._maximum = np.full(size, -np.inf)
+
+        # the marker heights and positions for every quantile, marker and value
+        self._heights = np.empty((quantiles.size, 5, size))
+        self._positions = np.tile(np.arange(5, dtype=np.float64)[None, :, None],
+                                  (quantiles.size, 1, size))
+        q = quantiles[:, None]
+        self._desired = np.hstack([np.zeros_like(q), 2 * q, 4 * q, 2 + 2 * q, np.full_like(q, 4)])
+        self._increments = np.hstack([np.zeros_like(q), q / 2, q, (1 + q) / 2, np.ones_like(q)])
+
+    @property
+    def count(self) -> int:
+        """The number of value vectors."""
+        return self._count
+
+    @property
+    def mean(self) -> np.ndarray:
+        """The mean of the values."""
+        return self._mean.copy()
+
+    @property
+    def std(self) -> np.ndarray:
+        """The sample standard deviation of the values."""
+        return np.sqrt(self._m2 / (self._count - 1)) if self._count > 1 else \
+            np.full_like(self._m2, np.nan)
+
+    @property
+    def minimum(self) -> np.ndarray:
+        """The minimum of the values."""
+        return self._minimum.copy()
+
+    @property
+    def maximum(self) -> np.ndarray:
+        """The maximum of the values."""
+        return self._maximum.copy()
+
+    @property
+    def quantiles(self) -> typing.Dict[float, np.ndarray]:
+        """The estimated quantiles of the values with the quantiles as keys."""
+        if self._count == 0:
+            return {float(q): np.full_like(self._mean, np.nan) for q in self._quantiles}
+        if self._count < 5:
+            values = np.sort(self._heights[0, :self._count], axis=0)
+            return {float(q): np.quantile(values, q, axis=0) for q in self._quantiles}
+        return {float(q): self._heights[i, 2].copy() for i, q in enumerate(self._quantiles)}
+
+    def update(self, values: np.ndarray):
+        """Adds a value vector.
+
+        Parameters
+        ----------
+        values :
+            The values.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        self._count += 1
+        delta = values - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (values - self._mean)
+        np.minimum(self._minimum, values, out=self._minimum)
+        np.maximum(self._maximum, values, out=self._maximum)
+
+        if self._count <= 5:
+            self._heights[:, self._count - 1] = values
+            if self._count == 5:
+                self._heights.sort(axis=1)
+            return
+        self._update_markers(values)
+
+    def _update_markers(self, values: np.ndarray):
+        heights = self._heights
+        positions = self._positions
+
+        # the cell of the value between the markers, the outer markers are moved to the value
+        cell = np.sum(values >= heights[:, 1:4], axis=1)
+        np.minimum(heights[:, 0], values, out=heights[:, 0])
+        np.maximum(heights[:, 4], values, out=heights[:, 4])
+        positions += np.arange(5)[None, :, None] > cell[:, None, :]
+        self._desired += self._increments
+
+        for i in range(1, 4):
+            offset = self._desired[:, i, None] - positions[:, i]
+            move = ((offset >= 1) & (positions[:, i + 1] - positions[:, i] > 1)) | \
+                ((offset <= -1) & (positions[:, i - 1] - positions[:, i] < -1))
+            if not np.any(move):
+                continue
+            d = np.where(move, np.sign(offset), 0)
+            h, h_prev, h_next = heights[:, i], heights[:, i - 1], heights[:, i + 1]
+            n, n_prev, n_next = positions[:, i], positions[:, i - 1], positions[:, i + 1]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                parabolic = h + d / (n_next - n_prev) * (
+                    (n - n_prev + d) * (h_next - h) / (n_next - n) +
+                    (n_next - n - d) * (h - h_prev) / (n - n_prev))
+                linear = h + d * np.where(d > 0, (h_next - h) / (n_next - n),
+                                          (h_prev - h) / (n_prev - n))
+            height = np.where((h_prev < parabolic) & (parabolic < h_next), parabolic, linear)
+            heights[:, i] = np.where(move, height, h)
+            positions[:, i] += d
+
+
+def bootstrap(result: 'glotaran.analysis.Result',
+              n: int,
+              workers: int = None,
+              seed: int = None,
+              method: str = 'residual',
+              quantiles: typing.Sequence[float] = (0.025, 0.5, 0.975),
+              max_nfev: int = None,
+              ) -> BootstrapResult:
+    """Estimates the distribution of the optimized parameters by optimizing replicates of the
+    data.
+
+    An exception is raised if all replicates fail to optimize.
+
+    Every replicate is the fitted data plus noise drawn from the residual of the result and is
+    optimized starting from the optimized parameters. The statistics are updated as the
+    replicates finish, so the memory does not grow with `n`.
+
+    Parameters
+    ----------
+    result :
+        The optimized global analysis result.
+    n :
+        The number of replicates.
+    workers :
+        The number of worker processes. If `None` the number of processors is used. With `1`
+        the replicates are optimized in the calling process.
+    seed :
+        The seed of the random noise. Replicate `i` uses the seed `(seed, i)`, so the statistics
+        do not depend on the number of workers. If `None` a random seed is used.
+    method :
+        With `residual` the noise is resampled with replacement from the (weighted) residual of
+        each dataset, with `parametric` it is drawn from a normal distribution with the
+        standard deviation of the residual.
+    quantiles :
+        The quantiles of the parameters to estimate.
+    max_nfev :
+        Maximum number of function evaluations per replicate. `None` for unlimited.
+    """
+    if method not in _METHODS:
+        raise ValueError(f"Unknown bootstrap method '{method}', supported methods are "
+                         f"{list(_METHODS)}")
+    if seed is None:
+        seed = int(np.random.randint(np.iinfo(np.int32).max))
+
+    labels = [label for label, p in result.initial_parameter.all() if p.vary or p.expr]
+    state = {
+        'model': result.model,
+        'parameter': warm_start_parameter(result.initial_parameter, result.optimized_parameter),
+        'data': {label: _replicate_base(result, dataset)
+                 for label, dataset in result.data.items()},
+        'labels': labels,
+        'seed': seed,
+        'method': method,
+        'nnls': result.nnls,
+        'atol': result._atol,
+        'dtype': result.dtype,
+        'solver_dtype': result.solver_dtype,
+        'max_nfev': max_nfev,
+    }
+    statistics = StreamingStatistics(len(labels), quantiles)
+
+    # the replicates are consumed in order, so that the quantile estimates do not depend on the
+    # scheduling of the workers
+    with WorkerPool(workers, state, tasks=n) as pool:
+        failed, error = _accumulate(pool.imap(_optimize_replicate, range(n)), statistics)
+
+    if failed and failed == n:
+        raise Exception(f"All {n} bootstrap replicates failed to optimize: {error}") from error
+    if failed:
+        warnings.warn(UserWarning(
+            f"{failed} of {n} bootstrap replicates failed to optimize, the first with: {error}"))
+
+    return BootstrapResult(
+        labels=labels,
+        n=statistics.count,
+        failed=failed,
+        mean=statistics.mean,
+        std=statistics.std,
+        minimum=statistics.minimum,
+        maximum=statistics.maximum,
+        quantiles=statistics.quantiles,
+    )
+
+
+_METHODS = ['residual', 'parametric']
+
+
+def _accumulate(replicates: typing.Iterable[typing.Union[np.ndarray, Exception]],
+                statistics: StreamingStatistics
+                ) -> typing.Tuple[int, typing.Optional[Exception]]:
+    """Adds the parameter values of the replicates to the statistics and returns the number of
+    failed replicates and the first error."""
+    failed = 0
+    error = None
+    for values in replicates:
+        if isinstance(values, Exception):
+            failed += 1
+            error = error or values
+        else:
+            statistics.update(values)
+    return failed, error
+
+
+def _replicate_base(result: 'glotaran.analysis.Result',
+                    dataset: xr.Dataset) -> typing.Dict[str, typing.Any]:
+    """Extracts the arrays of a dataset needed to create replicates."""
+    dims = (result.model.matrix_dimension, result.model.global_dimension)
+    weight = dataset.weight.transpose(*dims).values if 'weight' in dataset else None
+    residual = dataset.weighted_residual if weight is not None else dataset.residual
+    return {
+        'dims': dims,
+        'coords': {dim: dataset.coords[dim].values for dim in dims},
+        'fitted_data': dataset.fitted_data.transpose(*dims).values,
+        'residual': residual.transpose(*dims).values,
+        'weight': weight,
+    }
+
+
+def _optimize_replicate(state: typing.Dict[str, typing.Any],
+                        index: int) -> typing.Union[np.ndarray, Exception]:
+    """Optimizes a replicate and returns the parameter values or the error if it fails."""
+    from .result import Result
+
+    random_state = np.random.RandomState([state['seed'], index])
+    data = {}
+    for label, base in state['data'].items():
+        residual = base['residual']
+        if state['method'] == 'residual':
+            noise = residual.ravel()[random_state.randint(0, residual.size, residual.size)]
+            noise = noise.reshape(residual.shape)
+        else:
+            noise = random_state.normal(0, np.std(residual), residual.shape)
+        if base['weight'] is not None:
+            noise = noise / base['weight']
+        dataset = xr.Dataset({'data': (base['dims'], base['fitted_data'] + noise)},
+                             coords=base['coords'])
+        if base['weight'] is not None:
+            dataset['weight'] = (base['dims'], base['weight'])
+        data[label] = dataset
+
+    try:
+        result = Result(state['model'], data, state['parameter'], state['nnls'],
+                        atol=state['atol'], dtype=state['dtype'],
+                        solver_dtype=state['solver_dtype'])
+        optimize(result, verbose=False, max_nfev=state['max_nfev'])
+        return result.optimized_parameter.get_many(state['labels'])
+    except Exception as error:
+        # the error is returned to the calling process, so that the other replicates continue
+        return error
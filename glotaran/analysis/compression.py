@@ -0,0 +1,78 @@
+"""Functions for SVD-compressed global analysis."""
+
+import numpy as np
+import xarray as xr
+
+import glotaran  # noqa F01
+
+
+def create_compressed_result(result: 'glotaran.analysis.Result',
+                             svd_components: int) -> 'glotaran.analysis.Result':
+    """Creates a result with the data projected onto the top right singular vectors.
+
+    The data of all datasets is stacked along the model dimension and decomposed with a single
+    singular value decomposition, so the datasets share the compressed global axis and stay
+    linked. The global axis of the compressed result are the indices of the right singular
+    vectors.
+
+    Parameters
+    ----------
+    result :
+        The global analysis result with the full data.
+    svd_components :
+        The number of right singular vectors to project the data on.
+
+    Notes
+    -----
+
+    The compression is only valid for variable projection and models whose constrained matrix
+    does not depend on the index on the global axis, as reported by `model.index_dependent()`.
+    This rules out spectral relations and constraints, since their intervals cannot be evaluated
+    on the compressed axis.
+    """
+    if result.nnls:
+        raise Exception("SVD compression does not support non-negative least squares, the "
+                        "projected spectra can be negative")
+
+    model = result.model
+    if model.index_dependent():
+        raise Exception("SVD compression requires a model matrix which does not depend on the "
+                        f"index on the global dimension '{model.global_dimension}'")
+
+    global_axis = None
+    for label in model.dataset:
+        dataset = result.data[label]
+        if 'weight' in dataset:
+            raise Exception(f"SVD compression does not support weighted data in dataset "
+                            f"'{label}'")
+        axis = dataset.coords[model.global_dimension].values
+        if global_axis is None:
+            global_axis = axis
+        elif axis.shape != global_axis.shape or not np.allclose(axis, global_axis):
+            raise Exception("SVD compression requires the same global axis for all datasets")
+
+    if svd_components < 1 or svd_components > global_axis.size:
+        raise ValueError(f"The number of SVD components must be between 1 and "
+                         f"{global_axis.size}, got {svd_components}")
+
+    stacked = np.concatenate([result.data[label].data.values for label in model.dataset],
+                             axis=0)
+    _, _, right_singular_vectors = np.linalg.svd(stacked, full_matrices=False)
+    projection = right_singular_vectors[:svd_components].T
+
+    compressed_axis = np.arange(svd_components)
+    data = {}
+    for label in model.dataset:
+        dataset = result.data[label]
+        data[label] = xr.Dataset(
+            {'data': ((model.matrix_dimension, model.global_dimension),
+                      dataset.data.values @ projection)},
+            coords={
+                model.matrix_dimension: dataset.coords[model.matrix_dimension],
+                model.global_dimension: compressed_axis,
+            })
+
+    compressed = result.__class__(model, data, result.initial_parameter, result.nnls,
+                                  dtype=result.dtype, solver_dtype=result.solver_dtype)
+    compressed._instrumentation = result.instrumentation
+    return compressed
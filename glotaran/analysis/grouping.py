@@ -6,14 +6,16 @@ import numpy as np
 import xarray as xr
 
 import glotaran
-from glotaran.model.dataset_descriptor import DatasetDescriptor
 from glotaran.parameter import ParameterGroup
 
-Group = typing.Dict[typing.Any, typing.List[typing.Tuple[typing.Any, DatasetDescriptor]]]
+from .instrumentation import DISABLED, Instrumentation
+
+Group = typing.Dict[typing.Any,
+                    typing.List[typing.Tuple[typing.Any, 'glotaran.model.DatasetDescriptor']]]
 """A global analysis group is a dictonary which keys are indices in the global dimension and its
 values are `GroupItem`s"""
 
-GroupItem = typing.List[typing.Tuple[typing.Any, DatasetDescriptor]]
+GroupItem = typing.List[typing.Tuple[typing.Any, 'glotaran.model.DatasetDescriptor']]
 """A global analysis group item is a list of tuples containing an indix on the global dimension and
 a :class:`glotaran.model.DatasetDescriptor`"""
 
@@ -62,6 +64,8 @@ def calculate_group_item(item: GroupItem,
                          model: 'glotaran.model.Model',
                          parameter: ParameterGroup,
                          data: typing.Dict[str, xr.Dataset],
+                         weight: np.ndarray = None,
+                         instrumentation: Instrumentation = DISABLED,
                          ) -> typing.Tuple[typing.List[str], np.ndarray]:
     """Calculates the matrix for the group item and returns a Tuple containing a list of
     conditionaly linear parameters and he resulting matrix.
@@ -74,6 +78,11 @@ def calculate_group_item(item: GroupItem,
         The parameter for the calculation.
     data : typing.Dict[str, xr.Dataset]
         The data to analyze.
+    weight :
+        The weight vector for the group item as created by :func:`create_weight_group` or `None`
+        for unweighted data.
+    instrumentation :
+        The instrumentation recording the stages of the calculation.
     """
 
     if model.matrix is None:
@@ -85,33 +94,33 @@ def calculate_group_item(item: GroupItem,
 
         if dataset_descriptor.label not in data:
             raise Exception("Missing data for dataset '{dataset_descriptor.label}'")
-        dataset_descriptor = dataset_descriptor.fill(model, parameter)
+        with instrumentation.stage('fill'):
+            dataset_descriptor = dataset_descriptor.fill(model, parameter)
 
         dataset = data[dataset_descriptor.label]
         axis = dataset.coords[model.matrix_dimension].values
 
-        (clp, matrix) = model.matrix(dataset_descriptor, index, axis)
-
-        if 'concentration' not in dataset:
-            dataset.coords['clp_label'] = clp
-            dataset['concentration'] = (
-                (
-                    model.global_dimension,
-                    model.matrix_dimension,
-                    'clp_label',
-                ),
-                np.zeros((
-                    dataset.coords[model.global_dimension].size,
-                    axis.size,
-                    len(clp),
-                ), dtype=np.float64))
-        dataset.concentration.loc[{model.global_dimension: index}] = matrix
-
-        if 'weight' in dataset:
-            for i in range(matrix.shape[1]):
-                matrix[:, i] = np.multiply(
-                    matrix[:, i], dataset.weight.sel({model.global_dimension, index})
-                )
+        with instrumentation.stage('matrix'):
+            (clp, matrix) = model.matrix(dataset_descriptor, index, axis)
+            # the matrix kernels calculate in double precision, the data defines the dtype
+            matrix = matrix.astype(dataset.data.dtype, copy=False)
+        instrumentation.add_shape('matrix', matrix.shape)
+
+        with instrumentation.stage('concentration_write'):
+            if 'concentration' not in dataset:
+                dataset.coords['clp_label'] = clp
+                dataset['concentration'] = (
+                    (
+                        model.global_dimension,
+                        model.matrix_dimension,
+                        'clp_label',
+                    ),
+                    np.zeros((
+                        dataset.coords[model.global_dimension].size,
+                        axis.size,
+                        len(clp),
+                    ), dtype=matrix.dtype))
+            dataset.concentration.loc[{model.global_dimension: index}] = matrix
 
         if dataset_descriptor.scale:
             matrix *= dataset_descriptor.scale
@@ -125,20 +134,25 @@ def calculate_group_item(item: GroupItem,
                     if comp not in full_clp:
                         full_clp.append(comp)
                         full_matrix = np.concatenate(
-                            (full_matrix, np.zeros((full_matrix.shape[0], 1))), axis=1)
-                reshape = np.zeros((matrix.shape[0], len(full_clp)))
+                            (full_matrix, np.zeros((full_matrix.shape[0], 1),
+                                                   dtype=full_matrix.dtype)), axis=1)
+                reshape = np.zeros((matrix.shape[0], len(full_clp)), dtype=matrix.dtype)
                 for i, comp in enumerate(full_clp):
                     reshape[:, i] = matrix[:, clp.index(comp)] \
-                            if comp in clp else np.zeros((matrix.shape[0]))
+                            if comp in clp else 0
                 matrix = reshape
 
             full_matrix = np.concatenate([full_matrix, matrix], axis=0)
 
+    if weight is not None:
+        full_matrix = full_matrix * weight[:, np.newaxis].astype(full_matrix.dtype, copy=False)
+
     # Apply constraints
 
     if callable(model._constrain_matrix_function):
-        (full_clp, full_matrix) = \
-            model._constrain_matrix_function(parameter, full_clp, full_matrix, index)
+        with instrumentation.stage('constraints'):
+            (full_clp, full_matrix) = \
+                model._constrain_matrix_function(parameter, full_clp, full_matrix, index)
 
     return (full_clp, full_matrix)
 
@@ -176,3 +190,39 @@ def create_data_group(model: 'glotaran.model.Model',
                 full = np.append(full, dataset)
         result[i] = full
     return result
+
+
+def create_weight_group(model: 'glotaran.model.Model',
+                        group: Group,
+                        data: typing.Dict[str, xr.Dataset],
+                        ) -> typing.Dict[typing.Any, typing.Optional[np.ndarray]]:
+    """Creates a group of weight vectors for global analysis.
+
+    The weight vectors have the same layout as the vectors of :func:`create_data_group`. The
+    weight vector for a group item is `None` if none of its datasets has a weight, datasets
+    without weight are weighted with 1.
+
+    Parameters
+    ----------
+    model :
+        The global analysis model.
+    group :
+        The analysis group to create the weight group for.
+    data :
+        The data to analyze.
+    """
+
+    result = {}
+    for i, item in group.items():
+        weights = []
+        for index, dataset_descriptor in item:
+            dataset = data[dataset_descriptor.label]
+            if 'weight' in dataset:
+                weights.append(dataset.weight.sel({model.global_dimension: index}).values)
+            else:
+                weights.append(np.ones(dataset.coords[model.matrix_dimension].size))
+        if any('weight' in data[dataset_descriptor.label] for _, dataset_descriptor in item):
+            result[i] = np.concatenate(weights)
+        else:
+            result[i] = None
+    return result
@@ -0,0 +1,117 @@
+"""Lightweight instrumentation of the stages of a global analysis."""
+
+import time
+import typing
+
+
+class _NoStage:
+    """A no-op context manager used for disabled instrumentation."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+class _Stage:
+    """A context manager measuring the wall time of a stage."""
+
+    __slots__ = ('_instrumentation', '_name', '_start')
+
+    def __init__(self, instrumentation: 'Instrumentation', name: str):
+        self._instrumentation = instrumentation
+        self._name = name
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        self._instrumentation.add_timing(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class Instrumentation:
+
+    def __init__(self, enabled: bool = False):
+        """Collects wall times, call counts and matrix shapes of the stages of a global analysis.
+
+        If disabled, :meth:`stage` returns a shared no-op context manager and nothing is
+        recorded. The timings are added to the progress records of the optimization, see
+        :class:`glotaran.analysis.progress.ProgressReporter`.
+
+        Parameters
+        ----------
+        enabled :
+            If `True` the stages are measured.
+        """
+        self.enabled = enabled
+        self.timings = {}
+        self.counters = {}
+        self.shapes = {}
+
+    def stage(self, name: str) -> typing.ContextManager:
+        """Returns a context manager measuring the wall time of a stage.
+
+        Parameters
+        ----------
+        name :
+            The name of the stage.
+        """
+        if not self.enabled:
+            return _NO_STAGE
+        return _Stage(self, name)
+
+    def add_timing(self, name: str, elapsed: float):
+        """Adds a wall time to a stage and increments its call counter.
+
+        Parameters
+        ----------
+        name :
+            The name of the stage.
+        elapsed :
+            The wall time in seconds.
+        """
+        self.timings[name] = self.timings.get(name, 0.0) + elapsed
+        self.counters[name] = self.counters.get(name, 0) + 1
+
+    def count(self, name: str, n: int = 1):
+        """Increments a counter.
+
+        Parameters
+        ----------
+        name :
+            The name of the counter.
+        n :
+            The increment.
+        """
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_shape(self, name: str, shape: typing.Tuple[int, ...]):
+        """Records a matrix shape for a stage.
+
+        Parameters
+        ----------
+        name :
+            The name of the stage.
+        shape :
+            The shape of the matrix.
+        """
+        if self.enabled:
+            self.shapes.setdefault(name, set()).add(tuple(shape))
+
+    def reset(self):
+        """Removes all recorded timings, counters and shapes."""
+        self.timings = {}
+        self.counters = {}
+        self.shapes = {}
+
+
+DISABLED = Instrumentation()
+"""A shared disabled :class:`Instrumentation`."""
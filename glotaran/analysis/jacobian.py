@@ -0,0 +1,119 @@
+"""Functions for deriving the sparsity structure of the jacobian."""
+
+import typing
+
+import lmfit
+import numpy as np
+from scipy.sparse import csr_matrix
+
+import glotaran  # noqa F01
+
+
+def create_jacobian_sparsity(result: 'glotaran.analysis.Result',
+                             parameter: lmfit.Parameters,
+                             group_residuals: typing.List[np.ndarray],
+                             ) -> typing.Optional[csr_matrix]:
+    """Creates the sparsity structure of the jacobian of the residual.
+
+    The residual of a group, including its penalty, depends only on the parameters referenced
+    by the datasets in the group and on the parameters of model items which are not referenced
+    by any dataset, e.g. spectral relations. Parameters defined by an expression are replaced
+    by the parameters they depend on.
+
+    Parameters
+    ----------
+    result :
+        The global analysis result.
+    parameter :
+        The `lmfit` parameters of the optimization, the columns of the jacobian are the varying
+        parameters in their order.
+    group_residuals :
+        The residuals of the groups, see
+        :func:`glotaran.analysis.optimize.calculate_group_residuals`.
+
+    Returns
+    -------
+    sparsity :
+        A sparse matrix with the shape `(residual size, number of varying parameters)` with ones
+        where the residual can depend on the parameter or `None`, if the jacobian is dense.
+    """
+    model = result.model
+
+    # the lmfit names are the labels with the group separator replaced by an underscore
+    labels = {f"_{lmfit_label}": label for (lmfit_label, _), (label, _) in
+              zip(result.initial_parameter.all(seperator="_"), result.initial_parameter.all())}
+    columns = {labels[name]: i for i, name in enumerate(
+        name for name, p in parameter.items() if p.vary and not p.expr)}
+    if not columns:
+        return None
+
+    reached = set()
+    dataset_parameter = {
+        label: _resolve_expressions(
+            _referenced_parameter(model.dataset[label], model, reached), result)
+        for label in model.dataset}
+
+    global_parameter = set()
+    for name in model._glotaran_model_attributes:
+        attribute = getattr(model, name)
+        for item in attribute.values() if isinstance(attribute, dict) else attribute:
+            if id(item) not in reached and name != 'dataset':
+                global_parameter |= _referenced_parameter(item, model, set())
+    global_parameter = _resolve_expressions(global_parameter, result)
+
+    rows = []
+    cols = []
+    start = 0
+    for (index, item), residual in zip(result.groups.items(), group_residuals):
+        dependencies = set(global_parameter)
+        for _, dataset_descriptor in item:
+            dependencies |= dataset_parameter[dataset_descriptor.label]
+        dependency_columns = sorted(columns[label] for label in dependencies if label in columns)
+        rows.append(np.repeat(np.arange(start, start + residual.size), len(dependency_columns)))
+        cols.append(np.tile(np.asarray(dependency_columns, dtype=int), residual.size))
+        start += residual.size
+
+    rows = np.concatenate(rows)
+    if rows.size == start * len(columns):
+        return None
+    return csr_matrix((np.ones(rows.size, dtype=np.int8), (rows, np.concatenate(cols))),
+                      shape=(start, len(columns)))
+
+
+def _referenced_parameter(item: typing.Any,
+                          model: 'glotaran.model.Model',
+                          reached: typing.Set[int]) -> typing.Set[str]:
+    """Returns the labels of the parameters referenced by a model item and the model items it
+    references. The ids of all visited items are added to `reached`."""
+    reached.add(id(item))
+    labels = set()
+    for name in item._glotaran_properties:
+        prop = getattr(item.__class__, name)
+        value = getattr(item, name)
+        if value is None:
+            continue
+        values = value.values() if isinstance(value, dict) else \
+            value if isinstance(value, list) else [value]
+        if prop._is_parameter:
+            labels.update(str(p.full_label) for p in values)
+        elif isinstance(getattr(model, name, None), dict):
+            attribute = getattr(model, name)
+            for reference in values:
+                if reference in attribute:
+                    labels |= _referenced_parameter(attribute[reference], model, reached)
+    return labels
+
+
+def _resolve_expressions(labels: typing.Set[str],
+                         result: 'glotaran.analysis.Result') -> typing.Set[str]:
+    """Adds the parameters the parameters defined by an expression depend on."""
+    dependencies = result.parameter_expressions.dependencies
+    labels = set(labels)
+    pending = [label for label in labels if label in dependencies]
+    while pending:
+        for dependency in dependencies[pending.pop()]:
+            if dependency not in labels:
+                labels.add(dependency)
+                if dependency in dependencies:
+                    pending.append(dependency)
+    return labels
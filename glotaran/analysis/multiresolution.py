@@ -0,0 +1,198 @@
+"""Functions for coarse-to-fine optimization on binned data."""
+
+import typing
+
+import numpy as np
+import xarray as xr
+
+import glotaran  # noqa F01
+from glotaran.parameter import ParameterGroup
+
+from .optimize import optimize
+from .parallel import warm_start_parameter
+from .result import Result
+
+
+class ResolutionLevel(typing.NamedTuple):
+    """A level of a multiresolution schedule."""
+
+    global_bin: int = 1
+    """The number of consecutive points on the global axis averaged into one point."""
+
+    matrix_bins: int = None
+    """The number of bins on the model axis, growing logarithmically after the time zero.
+    `None` for no binning."""
+
+    max_nfev: int = None
+    """Maximum number of function evaluations on this level. `None` for unlimited."""
+
+
+DEFAULT_SCHEDULE = [ResolutionLevel(global_bin=8, matrix_bins=100), ResolutionLevel(global_bin=2)]
+"""The default coarse levels of a multiresolution schedule."""
+
+
+def optimize_multiresolution(model: typing.Type['glotaran.model.Model'],
+                             parameter: ParameterGroup,
+                             data: typing.Dict[str, typing.Union[xr.Dataset, xr.DataArray]],
+                             schedule: typing.List[ResolutionLevel] = None,
+                             nnls: bool = False,
+                             verbose: bool = True,
+                             max_nfev: int = None,
+                             group_atol: float = 0,
+                             time_zero: float = None,
+                             ) -> Result:
+    """Optimizes the parameter on increasingly finer binned data.
+
+    Every level of the schedule is optimized starting from the optimized parameter of the
+    previous level. The final optimization always runs on the full resolution data.
+
+    Parameters
+    ----------
+    model :
+        The global analysis model.
+    parameter :
+        The initial parameter.
+    data :
+        A dictonary containing all datasets with their labels as keys.
+    schedule :
+        The coarse levels, from coarsest to finest. If `None` the
+        :data:`DEFAULT_SCHEDULE` is used.
+    nnls :
+        If `True` non-linear least squaes optimizing is used instead of variable projection.
+    verbose :
+        If `True` feedback is printed at every iteration.
+    max_nfev :
+        Maximum number of function evaluations for the full resolution optimization. `None` for
+        unlimited.
+    group_atol :
+        The tolerance for grouping datasets along the global dimension.
+    time_zero :
+        The point on the model axis where the logarithmic binning starts. If `None` the start
+        of the instrument response of a dataset with a gaussian IRF is used, calculated with
+        the initial parameter, otherwise the start of the axis.
+    """
+    if schedule is None:
+        schedule = DEFAULT_SCHEDULE
+
+    time_zeros = {label: time_zero if time_zero is not None else
+                  _irf_time_zero(model, parameter, label) for label in data}
+    for level in schedule:
+        binned = {label: bin_dataset(model, dataset, global_bin=level.global_bin,
+                                     matrix_bins=level.matrix_bins,
+                                     time_zero=time_zeros[label])
+                  for label, dataset in data.items()}
+        result = Result(model, binned, parameter, nnls, atol=group_atol)
+        optimize(result, verbose=verbose, max_nfev=level.max_nfev)
+        parameter = warm_start_parameter(parameter, result.optimized_parameter)
+
+    result = Result(model, data, parameter, nnls, atol=group_atol)
+    optimize(result, verbose=verbose, max_nfev=max_nfev)
+    return result
+
+
+def bin_dataset(model: typing.Type['glotaran.model.Model'],
+                dataset: typing.Union[xr.Dataset, xr.DataArray],
+                global_bin: int = 1,
+                matrix_bins: int = None,
+                time_zero: float = None,
+                ) -> xr.Dataset:
+    """Averages the data of a dataset in bins and weights the bins by their size.
+
+    The weight of a bin is the inverse of the standard deviation of its mean, i.e. a bin of
+    `n` points with the weight `w` has the weight `sqrt(n) * w`, so that every point contributes
+    to the chi-square as in the full resolution data. Datasets without weight get one if any
+    bin contains more than one point.
+
+    Parameters
+    ----------
+    model :
+        The global analysis model.
+    dataset :
+        The dataset to bin.
+    global_bin :
+        The number of consecutive points on the global axis averaged into one point.
+    matrix_bins :
+        The number of bins on the model axis. The bin widths grow logarithmically from the
+        time zero, so early points, e.g. around the instrument response, keep their
+        resolution. The points before the time zero are binned linearly into a share of the
+        bins proportional to their number. `None` for no binning.
+    time_zero :
+        The point on the model axis where the logarithmic binning starts. If `None` the start
+        of the axis.
+    """
+    if isinstance(dataset, xr.DataArray):
+        dataset = dataset.to_dataset(name='data')
+
+    dims = (model.matrix_dimension, model.global_dimension)
+    matrix_axis = dataset.coords[model.matrix_dimension].values
+    global_axis = dataset.coords[model.global_dimension].values
+    data = dataset.data.transpose(*dims).values
+    # the variance of the points, the weight is its inverse square root
+    variance = dataset.weight.transpose(*dims).values ** -2.0 if 'weight' in dataset \
+        else np.ones(data.shape)
+    weighted = 'weight' in dataset
+
+    if global_bin > 1:
+        starts = np.arange(0, global_axis.size, global_bin)
+        global_axis = _bin_mean(global_axis, starts, 0)
+        data = _bin_mean(data, starts, 1)
+        variance = _bin_mean(variance, starts, 1) / _bin_counts(starts, variance.shape, 1)
+        weighted = True
+
+    if matrix_bins is not None and matrix_bins < matrix_axis.size:
+        starts = _matrix_bin_starts(matrix_axis, matrix_bins, time_zero)
+        matrix_axis = _bin_mean(matrix_axis, starts, 0)
+        data = _bin_mean(data, starts, 0)
+        variance = _bin_mean(variance, starts, 0) / _bin_counts(starts, variance.shape, 0)
+        weighted = True
+
+    variables = {'data': (dims, data)}
+    if weighted:
+        variables['weight'] = (dims, 1 / np.sqrt(variance))
+    return xr.Dataset(
+        variables,
+        coords={model.matrix_dimension: matrix_axis, model.global_dimension: global_axis})
+
+
+def _matrix_bin_starts(axis: np.ndarray, bins: int, time_zero: typing.Optional[float]
+                       ) -> np.ndarray:
+    """Returns the start indices of the bins on the model axis, linear before the time zero and
+    logarithmically growing after it."""
+    zero = 0 if time_zero is None else int(np.searchsorted(axis, time_zero))
+    before = min(int(round(bins * zero / axis.size)), zero)
+    if zero > 0:
+        before = max(before, 1)
+    starts = [np.round(np.linspace(0, zero, before, endpoint=False)).astype(int)]
+    if zero < axis.size:
+        after = max(bins - before, 1)
+        # the last bin ends at the end of the axis
+        offsets = np.geomspace(1, axis.size - zero + 1, after + 1)[:-1]
+        starts.append(zero + np.round(offsets).astype(int) - 1)
+    return np.unique(np.concatenate(starts))
+
+
+def _irf_time_zero(model: typing.Type['glotaran.model.Model'],
+                   parameter: ParameterGroup,
+                   label: str) -> typing.Optional[float]:
+    """Returns the start of the gaussian instrument response of a dataset, two widths before
+    its earliest center, or `None` if the dataset has none."""
+    irf = getattr(model.dataset[label].fill(model, parameter), 'irf', None)
+    if irf is None or not hasattr(irf, 'center'):
+        return None
+    center = min(p.value for p in irf.center)
+    width = max(p.value for p in irf.width)
+    return center - 2 * width
+
+
+def _bin_counts(starts: np.ndarray, shape: typing.Tuple[int, ...], axis: int) -> np.ndarray:
+    """Returns the number of points in bins starting at the given indices along an axis,
+    shaped for broadcasting against the binned values."""
+    counts = np.diff(np.append(starts, shape[axis]))
+    counts_shape = [1] * len(shape)
+    counts_shape[axis] = counts.size
+    return counts.reshape(counts_shape)
+
+
+def _bin_mean(values: np.ndarray, starts: np.ndarray, axis: int) -> np.ndarray:
+    """Averages the values in bins starting at the given indices along an axis."""
+    return np.add.reduceat(values, starts, axis=axis) / _bin_counts(starts, values.shape, axis)
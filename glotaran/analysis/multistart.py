@@ -0,0 +1,217 @@
+"""Functions for global optimization from many sampled starting points."""
+
+import typing
+import warnings
+
+import numpy as np
+import xarray as xr
+
+import glotaran  # noqa F01
+from glotaran.parameter import ParameterGroup
+
+from .optimize import optimize
+from .parallel import WorkerPool, warm_start_parameter
+from .result import Result
+
+
+_SAMPLINGS = ['latin_hypercube', 'sobol']
+
+
+def optimize_multistart(model: typing.Type['glotaran.model.Model'],
+                        parameter: ParameterGroup,
+                        data: typing.Dict[str, typing.Union[xr.Dataset, xr.DataArray]],
+                        starts: int = 16,
+                        sampling: str = 'latin_hypercube',
+                        bounds: typing.Dict[str, typing.Tuple[float, float]] = None,
+                        include_initial: bool = True,
+                        prune_nfev: typing.Optional[int] = 10,
+                        prune_factor: float = 10,
+                        workers: int = None,
+                        seed: int = None,
+                        nnls: bool = False,
+                        max_nfev: int = None,
+                        group_atol: float = 0,
+                        ) -> typing.List[Result]:
+    """Optimizes the parameter from many starting points sampled within their bounds.
+
+    The starting values of the varying parameters are sampled within their `min` and `max`,
+    non-negative parameters are sampled uniformly in the logarithm. The optimization runs in two
+    phases in a pool of worker processes: first all starts are optimized for `prune_nfev`
+    function evaluations, then only the starts with a chi-square of at most `prune_factor` times
+    the best chi-square are optimized to convergence from where they stopped.
+
+    Parameters
+    ----------
+    model :
+        The global analysis model.
+    parameter :
+        The initial parameter, the bounds and the options of the parameters are kept for every
+        start.
+    data :
+        A dictonary containing all datasets with their labels as keys.
+    starts :
+        The number of sampled starting points.
+    sampling :
+        The sampling of the starting points, either `latin_hypercube` or `sobol`. The Sobol
+        sequence requires `scipy.stats.qmc` (scipy 1.7 or newer).
+    bounds :
+        A dictionary with sampling bounds for parameters, overriding their `min` and `max`.
+    include_initial :
+        If `True`, the values of `parameter` are used as an additional start.
+    prune_nfev :
+        The number of function evaluations of the first phase. If `None`, all starts are
+        optimized to convergence.
+    prune_factor :
+        The factor of the best chi-square above which starts are pruned after the first phase.
+    workers :
+        The number of worker processes. If `None` the number of processors is used. With `1`
+        the optimizations run in the calling process.
+    seed :
+        The seed for sampling the starting points.
+    nnls :
+        If `True` non-linear least squaes optimizing is used instead of variable projection.
+    max_nfev :
+        Maximum number of function evaluations of the second phase. `None` for unlimited.
+    group_atol :
+        The tolerance for grouping datasets along the global dimension.
+
+    Returns
+    -------
+    results :
+        The results of the starts which were optimized to convergence, ranked by their
+        chi-square, with the sampled start as initial parameter. Failed optimizations are left
+        out with a warning, if all starts of a phase fail an exception is raised.
+    """
+    start_parameters = sample_parameter(parameter, starts, sampling=sampling, bounds=bounds,
+                                        seed=seed)
+    if include_initial:
+        start_parameters.insert(0, parameter)
+
+    state = {'model': model, 'data': data, 'nnls': nnls, 'group_atol': group_atol}
+    with WorkerPool(workers, state, tasks=len(start_parameters)) as pool:
+        return _optimize_starts(pool, start_parameters, prune_nfev, prune_factor, max_nfev)
+
+
+def sample_parameter(parameter: ParameterGroup,
+                     n: int,
+                     sampling: str = 'latin_hypercube',
+                     bounds: typing.Dict[str, typing.Tuple[float, float]] = None,
+                     seed: int = None,
+                     ) -> typing.List[ParameterGroup]:
+    """Samples copies of a parameter group with the values of the varying parameters spread
+    within their bounds.
+
+    Parameters
+    ----------
+    parameter :
+        The parameter group.
+    n :
+        The number of samples.
+    sampling :
+        Either `latin_hypercube` or `sobol`.
+    bounds :
+        A dictionary with sampling bounds for parameters, overriding their `min` and `max`.
+    seed :
+        The seed for the sampling.
+    """
+    bounds = bounds or {}
+    labels = [label for label, p in parameter.all() if p.vary and not p.expr]
+    lower = np.empty(len(labels))
+    upper = np.empty(len(labels))
+    logarithmic = np.zeros(len(labels), dtype=bool)
+    for i, label in enumerate(labels):
+        p = parameter.get(label)
+        lower[i], upper[i] = bounds.get(label, (p.min, p.max))
+        if not (np.isfinite(lower[i]) and np.isfinite(upper[i])) or lower[i] >= upper[i]:
+            raise ValueError(f"Parameter '{label}' needs finite bounds with min < max for "
+                             f"sampling, got [{lower[i]}, {upper[i]}]")
+        logarithmic[i] = p.non_neg and lower[i] > 0
+    lower[logarithmic] = np.log(lower[logarithmic])
+    upper[logarithmic] = np.log(upper[logarithmic])
+
+    if sampling == 'latin_hypercube':
+        unit = _latin_hypercube(n, len(labels), np.random.RandomState(seed))
+    elif sampling == 'sobol':
+        try:
+            from scipy.stats import qmc
+        except ImportError:
+            raise Exception("Sobol sampling requires scipy 1.7 or newer")
+        # the scrambled sequence is only balanced for powers of 2
+        unit = qmc.Sobol(len(labels), seed=seed).random(1 << max(n - 1, 0).bit_length())[:n]
+    else:
+        raise ValueError(f"Unknown sampling '{sampling}', supported samplings are "
+                         f"{_SAMPLINGS}")
+
+    values = lower + unit * (upper - lower)
+    values[:, logarithmic] = np.exp(values[:, logarithmic])
+
+    samples = []
+    for row in values:
+        sample = warm_start_parameter(parameter, parameter)
+        for label, value in zip(labels, row):
+            sample.get(label).value = value
+        samples.append(sample)
+    return samples
+
+
+def _latin_hypercube(n: int, dimensions: int, random_state: np.random.RandomState) -> np.ndarray:
+    """Samples `n` points in the unit hypercube with exactly one point in every of the `n`
+    strata of every dimension."""
+    strata = np.argsort(random_state.random_sample((dimensions, n)), axis=1).T
+    return (strata + random_state.random_sample((n, dimensions))) / n
+
+
+def _optimize_starts(pool: WorkerPool,
+                     start_parameters: typing.List[ParameterGroup],
+                     prune_nfev: typing.Optional[int],
+                     prune_factor: float,
+                     max_nfev: typing.Optional[int]) -> typing.List[Result]:
+    """Runs the pruning phase and the optimizations to convergence in a worker pool."""
+    parameters = start_parameters
+    if prune_nfev is not None:
+        phase = list(pool.map(_optimize_start, [(start, prune_nfev) for start in parameters]))
+        _check_failures(phase, 'pruning')
+        chisqr = np.array([np.inf if isinstance(result, Exception) else result.chisqr
+                           for result in phase])
+        kept = chisqr <= prune_factor * np.min(chisqr)
+        parameters = [warm_start_parameter(start, result.optimized_parameter)
+                      for start, result, keep in zip(start_parameters, phase, kept) if keep]
+        start_parameters = [start for start, keep in zip(start_parameters, kept) if keep]
+
+    results = list(pool.map(_optimize_start, [(start, max_nfev) for start in parameters]))
+    _check_failures(results, 'convergence')
+    converged = []
+    for start, result in zip(start_parameters, results):
+        if isinstance(result, Exception):
+            continue
+        # the second phase starts from where the pruning phase stopped, the result keeps the
+        # sampled start
+        result._initial_parameter = start
+        converged.append(result)
+    return sorted(converged, key=lambda result: result.chisqr)
+
+
+def _check_failures(results: typing.List[typing.Union[Result, Exception]], phase: str):
+    """Raises an exception if all optimizations of a phase failed and warns if some failed."""
+    errors = [result for result in results if isinstance(result, Exception)]
+    if errors and len(errors) == len(results):
+        raise Exception(f"All {len(results)} starts failed to optimize in the {phase} phase: "
+                        f"{errors[0]}") from errors[0]
+    if errors:
+        warnings.warn(UserWarning(
+            f"{len(errors)} of {len(results)} starts failed to optimize in the {phase} phase, "
+            f"the first with: {errors[0]}"))
+
+
+def _optimize_start(state: typing.Dict[str, typing.Any],
+                    start: typing.Tuple[ParameterGroup, typing.Optional[int]]
+                    ) -> typing.Union[Result, Exception]:
+    """Optimizes the data from one starting point for at most `max_nfev` evaluations."""
+    parameter, max_nfev = start
+    try:
+        result = Result(state['model'], state['data'], parameter, state['nnls'],
+                        atol=state['group_atol'])
+        optimize(result, verbose=False, max_nfev=max_nfev)
+        return result
+    except Exception as e:
+        return e
@@ -3,6 +3,7 @@ least-squares method."""
 
 import typing
 import numpy as np
+from scipy.linalg import get_lapack_funcs
 from scipy.optimize import nnls
 
 
@@ -19,6 +20,88 @@ def residual_nnls(matrix: np.ndarray, data: np.ndarray) \
         The data to analyze.
     """
 
-    clp, _ = nnls(matrix, data)
+    clp = solve_nnls(matrix, data).astype(data.dtype, copy=False)
     residual = data - np.dot(matrix, clp)
     return clp, residual
+
+
+def residual_nnls_batch(matrix: np.ndarray, data: np.ndarray) \
+        -> typing.Tuple[np.ndarray, np.ndarray]:
+    """Calculates the conditionaly linear parameters and residual with the non-negative
+    least-squares method for several data columns sharing the same matrix.
+
+    The matrix is decomposed once and the unconstrained solution is calculated for all columns
+    at once, only columns with negative parameters are solved with the active set method. The
+    conditionaly linear parameters and the residual have the dtype of the data.
+
+    Parameters
+    ----------
+    matrix :
+        The model matrix with shape (m, n).
+    data : np.ndarray
+        The data with shape (m, k).
+    """
+
+    reduced = _reduce(matrix, data)
+    if reduced is None:
+        clp = np.stack([nnls(matrix, column)[0] for column in data.T], axis=1)
+    else:
+        r, reduced_data, clp = reduced
+        for i in np.flatnonzero(np.any(clp < 0, axis=0)):
+            clp[:, i] = nnls(r, reduced_data[:, i])[0]
+    clp = clp.astype(data.dtype, copy=False)
+    residual = data - np.dot(matrix, clp)
+    return clp, residual
+
+
+def solve_nnls(matrix: np.ndarray, data: np.ndarray) -> np.ndarray:
+    """Solves :math:`\\min ||Ax - b||` subject to :math:`x \\geq 0`.
+
+    The problem is reduced with a QR decomposition :math:`A = QR` to the equivalent problem
+    :math:`\\min ||Rx - Q^Tb||` with a small triangular matrix :math:`R`. If its unconstrained
+    solution is non-negative, it is returned without further work. Otherwise the reduced problem
+    is solved with the active set method of :func:`scipy.optimize.nnls`.
+
+    Parameters
+    ----------
+    matrix :
+        The matrix :math:`A`.
+    data :
+        The vector :math:`b`.
+    """
+    reduced = _reduce(matrix, data)
+    if reduced is None:
+        return nnls(matrix, data)[0]
+    r, reduced_data, clp = reduced
+    if np.all(clp >= 0):
+        return clp
+    return nnls(r, reduced_data)[0]
+
+
+def _reduce(matrix: np.ndarray, data: np.ndarray) \
+        -> typing.Optional[typing.Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Returns the triangular factor, the reduced data and the unconstrained solution or `None`
+    if the matrix is numerically rank deficient.
+
+    The LAPACK routines are chosen for the common dtype of the matrix and the data, so single
+    precision problems are decomposed in single precision.
+    """
+    m, n = matrix.shape
+    if m < n:
+        return None
+    geqrf, ormqr, trtrs = get_lapack_funcs(('geqrf', 'ormqr', 'trtrs'), (matrix, data))
+    qr, tau, _, info = geqrf(matrix)
+    if info != 0:
+        return None
+    # a small diagonal of the triangular factor means a numerically rank deficient matrix
+    diagonal = np.abs(np.diag(qr[:n]))
+    if n and diagonal.min() <= max(m, n) * np.finfo(qr.dtype).eps * diagonal.max():
+        return None
+    lwork = max(1, n, data.shape[1] if data.ndim == 2 else 1)
+    reduced_data, _, info = ormqr("L", "T", qr, tau, data, lwork, overwrite_c=0)
+    if info != 0:
+        return None
+    clp, info = trtrs(qr, reduced_data)
+    if info != 0:
+        return None
+    return np.triu(qr[:n]), reduced_data[:n], clp[:n]
@@ -8,12 +8,21 @@ import xarray as xr
 import glotaran
 from glotaran.parameter import ParameterGroup
 
+from .compression import create_compressed_result
 from .grouping import calculate_group_item
-from .nnls import residual_nnls
+from .jacobian import create_jacobian_sparsity
+from .nnls import residual_nnls, residual_nnls_batch
+from .progress import ProgressRecord, ProgressReporter
 from .variable_projection import residual_variable_projection
 
 
-def optimize(result: 'glotaran.analysis.Result', verbose: bool = True, max_nfev: int = None):
+def optimize(result: 'glotaran.analysis.Result',
+             verbose: bool = True,
+             max_nfev: int = None,
+             iteration_callback: typing.Callable[[ProgressRecord], None] = None,
+             iteration_interval: float = 0,
+             svd_components: int = None,
+             sparse_jacobian: bool = False):
     """Optimizes the parameter.
 
     Parameters
@@ -24,22 +33,73 @@ def optimize(result: 'glotaran.analysis.Result', verbose: bool = True, max_nfev:
         If `True` feedback is printed at every iteration.
     max_nfev :
         Maximum number of function evaluations. `None` for unlimited.
+    iteration_callback :
+        A function receiving a :class:`glotaran.analysis.progress.ProgressRecord` after
+        function evaluations, e.g. a :class:`glotaran.analysis.progress.JsonLinesSink`. If the
+        result is instrumented, the records contain the stage timings.
+    iteration_interval :
+        The minimum time in seconds between two calls of `iteration_callback`.
+    svd_components :
+        If not `None`, the data is projected onto this number of right singular vectors and
+        the optimization runs in the reduced space. The full resolution data is calculated
+        once with the optimized parameter. Only valid for models with a matrix independent of
+        the index on the global axis. The covariance and the standard errors of the parameters
+        are not available.
+    sparse_jacobian :
+        If `True`, the sparsity structure of the jacobian is derived from the parameters
+        referenced by the datasets and passed to the optimizer. Parameters which only affect
+        the residual of some groups are then estimated together with fewer function
+        evaluations. Only effective if the datasets are in different groups.
     """
     parameter = result.initial_parameter.as_parameter_dict()
+    fit_result = result if svd_components is None \
+        else create_compressed_result(result, svd_components)
+
+    iter_cb = ProgressReporter(iteration_callback, iteration_interval,
+                               instrumentation=result.instrumentation) \
+        if callable(iteration_callback) else None
+
     minimizer = lmfit.Minimizer(
         calculate_residual,
         parameter,
-        fcn_args=[result],
+        fcn_args=[fit_result],
         fcn_kws=None,
-        iter_cb=None,
+        iter_cb=iter_cb,
         scale_covar=True,
         nan_policy='omit',
         reduce_fcn=None,
         **{})
     verbose = 2 if verbose else 0
+    options = {}
+    if sparse_jacobian:
+        sparsity = create_jacobian_sparsity(
+            fit_result, parameter, calculate_group_residuals(parameter, fit_result))
+        if sparsity is not None:
+            options['jac_sparsity'] = sparsity
+    if result.dtype != np.float64:
+        # the default finite difference step drowns the jacobian in the rounding errors of the
+        # single precision residual
+        options['diff_step'] = np.cbrt(np.finfo(result.dtype).eps)
     lm_result = minimizer.minimize(method='least_squares',
                                    verbose=verbose,
-                                   max_nfev=max_nfev)
+                                   max_nfev=max_nfev,
+                                   **options)
+
+    if fit_result is not result:
+        # calculate the full resolution residual and clp with the optimized parameter
+        residual = calculate_residual(lm_result.params, result)
+        lm_result.residual = residual
+        lm_result.ndata = residual.size
+        lm_result.nfree = lm_result.ndata - lm_result.nvarys
+        lm_result.chisqr = float(np.dot(residual, residual))
+        lm_result.redchi = lm_result.chisqr / max(lm_result.nfree, 1)
+        # the covariance of the reduced problem is scaled with its reduced chi-square and does
+        # not belong to the full resolution statistics
+        lm_result.covar = None
+        lm_result.errorbars = False
+        for p in lm_result.params.values():
+            p.stderr = None
+            p.correl = None
 
     result.finalize(lm_result)
 
@@ -56,58 +116,160 @@ def calculate_residual(parameter: typing.Union[ParameterGroup, lmfit.Parameters]
         The global analysis result.
     """
 
-    if not isinstance(parameter, ParameterGroup):
-        parameter = ParameterGroup.from_parameter_dict(parameter)
+    # the chi-square is accumulated by the optimizer in double precision
+    residual = np.concatenate(calculate_group_residuals(parameter, result))
+    return residual.astype(np.float64, copy=False)
+
+
+def calculate_group_residuals(parameter: typing.Union[ParameterGroup, lmfit.Parameters],
+                              result: 'glotaran.analysis.Result') -> typing.List[np.ndarray]:
+    """Calculates the residuals of the groups, including their penalties, and fills the global
+    analysis result with data.
+
+    Parameters
+    ----------
+    parameter :
+        The parameter for optimization.
+    result :
+        The global analysis result.
+    """
+
+    instrumentation = result.instrumentation
+    instrumentation.count('calculate_residual')
+    result.model.prepare(result.global_axis)
+
+    with instrumentation.stage('parameter'):
+        if not isinstance(parameter, ParameterGroup):
+            parameter = ParameterGroup.from_parameter_dict(parameter)
+        result.parameter_expressions.evaluate(parameter)
+
+    # without index dependence and weights the groups of the same datasets share their matrix,
+    # so their non-negative least squares problems are solved together
+    solutions = _solve_nnls_batches(result, parameter) \
+        if result.nnls and not result.model.index_dependent() and \
+        all(weight is None for weight in result.weight_groups.values()) else {}
 
     penalty = []
     for index, item in result.groups.items():
-        clp_labels, matrix = calculate_group_item(item, result.model, parameter, result.data)
-
-        for i, row in enumerate(matrix.T):
-            if not np.isfinite(matrix).all():
-                raise Exception(f"Matrix is not finite at clp {clp_labels[i]}"
-                                f"\n\nCurrent Parameter:\n\n{parameter}")
-
-        clp = None
-        residual = None
-        if result.nnls:
-            clp, residual = residual_nnls(
-                    matrix,
-                    result.data_groups[index]
-                )
+        if index in solutions:
+            clp_labels, matrix, clp, residual = solutions[index]
         else:
-            clp, residual = residual_variable_projection(
-                    matrix,
-                    result.data_groups[index]
-                )
-
-        result.global_clp[index] = xr.DataArray(clp, coords=[('clp_label', clp_labels)])
-
-        start = 0
-        for i, dataset in item:
-            dataset = result._data[dataset.label]
-            if 'residual' not in dataset:
-                dataset['residual'] = dataset.data.copy()
-            end = dataset.coords[result.model.matrix_dimension].size + start
-            dataset.residual.loc[{result.model.global_dimension: i}] = residual[start:end]
-            start = end
-
-            if 'clp' not in dataset:
-                dim1 = dataset.coords[result.model.global_dimension].size
-                dim2 = dataset.coords['clp_label'].size
-                dataset['clp'] = (
-                    (result.model.global_dimension, 'clp_label'),
-                    np.zeros((dim1, dim2), dtype=np.float64)
-                )
-            dataset.clp.loc[{result.model.global_dimension: i}] = \
-                np.array([clp[clp_labels.index(i)] if i in clp_labels else None
-                          for i in dataset.coords['clp_label'].values])
+            clp_labels, matrix = calculate_group_item(item, result.model, parameter, result.data,
+                                                      weight=result.weight_groups[index],
+                                                      instrumentation=instrumentation)
+            _check_finite(clp_labels, matrix, parameter)
+
+            data = result.data_groups[index]
+            with instrumentation.stage('solve'):
+                if result.solver_dtype != matrix.dtype:
+                    matrix = matrix.astype(result.solver_dtype)
+                    data = data.astype(result.solver_dtype)
+                if result.nnls:
+                    clp, residual = residual_nnls(matrix, data)
+                else:
+                    clp, residual = residual_variable_projection(matrix, data)
+            instrumentation.add_shape('solve', matrix.shape)
+
+        with instrumentation.stage('residual_write'):
+            _write_residual(result, index, item, clp_labels, clp, residual)
 
         if callable(result.model._additional_penalty_function):
-            additionals = result.model._additional_penalty_function(
-                parameter, clp_labels, clp, matrix, parameter)
+            with instrumentation.stage('penalty'):
+                additionals = result.model._additional_penalty_function(
+                    parameter, clp_labels, clp, matrix, index)
             residual = np.concatenate((residual, additionals))
 
         penalty.append(residual)
 
-    return np.concatenate(penalty)
+    return penalty
+
+
+def _solve_nnls_batches(result: 'glotaran.analysis.Result',
+                        parameter: ParameterGroup,
+                        ) -> typing.Dict[typing.Any, typing.Tuple[typing.List[str], np.ndarray,
+                                                                  np.ndarray, np.ndarray]]:
+    """Solves the groups of an index independent model with non-negative least squares, batched
+    over the groups containing the same datasets.
+
+    The matrix of a batch is calculated once and copied into the concentrations of the other
+    indices. Returns the clp labels, the matrix, the clp and the residual for every group.
+    """
+    instrumentation = result.instrumentation
+    batches = {}
+    for index, item in result.groups.items():
+        key = tuple(dataset_descriptor.label for _, dataset_descriptor in item)
+        batches.setdefault(key, []).append(index)
+
+    solutions = {}
+    for indices in batches.values():
+        clp_labels, matrix = calculate_group_item(result.groups[indices[0]], result.model,
+                                                  parameter, result.data,
+                                                  instrumentation=instrumentation)
+        _check_finite(clp_labels, matrix, parameter)
+        with instrumentation.stage('concentration_write'):
+            _copy_concentration(result, indices)
+
+        data = np.stack([result.data_groups[index] for index in indices], axis=1)
+        with instrumentation.stage('solve'):
+            if result.solver_dtype != matrix.dtype:
+                matrix = matrix.astype(result.solver_dtype)
+            clp, residual = residual_nnls_batch(matrix, data.astype(matrix.dtype, copy=False))
+        instrumentation.add_shape('solve', matrix.shape)
+
+        for i, index in enumerate(indices):
+            solutions[index] = (clp_labels, matrix, clp[:, i], residual[:, i])
+    return solutions
+
+
+def _copy_concentration(result: 'glotaran.analysis.Result', indices: typing.List[typing.Any]):
+    """Copies the concentrations written for the first group of a batch to the other groups."""
+    global_dimension = result.model.global_dimension
+    for position, (index, dataset_descriptor) in enumerate(result.groups[indices[0]]):
+        others = [result.groups[i][position][0] for i in indices[1:]]
+        if not others:
+            continue
+        concentration = result.data[dataset_descriptor.label].concentration
+        matrix = concentration.sel({global_dimension: index}).values
+        concentration.loc[{global_dimension: others}] = \
+            np.broadcast_to(matrix, (len(others),) + matrix.shape)
+
+
+def _check_finite(clp_labels: typing.List[str], matrix: np.ndarray, parameter: ParameterGroup):
+    """Raises an exception if the matrix is not finite."""
+    for i, row in enumerate(matrix.T):
+        if not np.isfinite(row).all():
+            raise Exception(f"Matrix is not finite at clp {clp_labels[i]}"
+                            f"\n\nCurrent Parameter:\n\n{parameter}")
+
+
+def _write_residual(result: 'glotaran.analysis.Result',
+                    index: typing.Any,
+                    item: 'glotaran.analysis.grouping.GroupItem',
+                    clp_labels: typing.List[str],
+                    clp: np.ndarray,
+                    residual: np.ndarray):
+    """Writes the residual and the clp of a group item into the result datasets."""
+
+    result.global_clp[index] = xr.DataArray(clp, coords=[('clp_label', clp_labels)])
+
+    start = 0
+    for i, dataset in item:
+        dataset = result._data[dataset.label]
+        # the residual of weighted data is unweighted in finalize
+        residual_name = 'weighted_residual' if 'weight' in dataset else 'residual'
+        if residual_name not in dataset:
+            dataset[residual_name] = dataset.data.copy()
+        end = dataset.coords[result.model.matrix_dimension].size + start
+        dataset[residual_name].loc[{result.model.global_dimension: i}] = residual[start:end]
+        start = end
+
+        if 'clp' not in dataset:
+            dim1 = dataset.coords[result.model.global_dimension].size
+            dim2 = dataset.coords['clp_label'].size
+            dataset['clp'] = (
+                (result.model.global_dimension, 'clp_label'),
+                np.zeros((dim1, dim2), dtype=dataset.data.dtype)
+            )
+        dataset.clp.loc[{result.model.global_dimension: i}] = \
+            np.array([clp[clp_labels.index(i)] if i in clp_labels else None
+                      for i in dataset.coords['clp_label'].values])
@@ -0,0 +1,144 @@
+"""Helpers for running analysis tasks in a pool of worker processes."""
+
+import collections
+import concurrent.futures
+import functools
+import os
+import typing
+
+from glotaran.parameter import ParameterGroup
+
+
+_worker_state = None
+
+
+class WorkerPool:
+    """Runs tasks sharing a state in a pool of worker processes or in the calling process.
+
+    The state, e.g. the model, the parameter and the data, is sent once to every worker process.
+    A task is a module level function which is called with the state and one item and returns
+    the result for the item.
+
+    The pool is used as context manager::
+
+        with WorkerPool(workers, state) as pool:
+            results = list(pool.map(task, items))
+    """
+
+    def __init__(self, workers: typing.Optional[int], state: typing.Any, tasks: int = None):
+        """
+        Parameters
+        ----------
+        workers :
+            The number of worker processes. If `None` the number of processors is used. With `1`
+            the tasks run in the calling process.
+        state :
+            The state passed to every task.
+        tasks :
+            The number of tasks if known, no more worker processes than tasks are started.
+        """
+        self._in_process = workers == 1
+        self._workers = workers or os.cpu_count() or 1
+        if tasks is not None:
+            self._workers = max(min(self._workers, tasks), 1)
+        self._state = state
+        self._executor = None
+
+    @property
+    def workers(self) -> int:
+        """The number of worker processes, `1` if the tasks run in the calling process."""
+        return 1 if self._in_process else self._workers
+
+    def __enter__(self) -> 'WorkerPool':
+        if not self._in_process:
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self._workers,
+                initializer=_initialize_worker,
+                initargs=(self._state,))
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def map(self,
+            task: typing.Callable[[typing.Any, typing.Any], typing.Any],
+            items: typing.Iterable[typing.Any]) -> typing.Iterator[typing.Any]:
+        """Runs the task for all items at once and yields the results in the order of the
+        items.
+
+        Parameters
+        ----------
+        task :
+            The task, called with the state and an item.
+        items :
+            The items.
+        """
+        if self._executor is None:
+            return (task(self._state, item) for item in items)
+        return self._executor.map(functools.partial(_run_task, task), items)
+
+    def imap(self,
+             task: typing.Callable[[typing.Any, typing.Any], typing.Any],
+             items: typing.Iterable[typing.Any],
+             max_pending: int = None) -> typing.Iterator[typing.Any]:
+        """Yields the results of the task in the order of the items, while keeping at most
+        `max_pending` items in flight.
+
+        The items are consumed lazily, so lazily loaded items are not all loaded at once and
+        the results can be processed while the remaining items are running.
+
+        Parameters
+        ----------
+        task :
+            The task, called with the state and an item.
+        items :
+            The items.
+        max_pending :
+            The maximum number of items in flight. If `None` two per worker process.
+        """
+        if self._executor is None:
+            for item in items:
+                yield task(self._state, item)
+            return
+
+        max_pending = max_pending or 2 * self._workers
+        pending = collections.deque()
+        for item in items:
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+            pending.append(self._executor.submit(_run_task, task, item))
+        while pending:
+            yield pending.popleft().result()
+
+
+def warm_start_parameter(initial: ParameterGroup, optimized: ParameterGroup) -> ParameterGroup:
+    """Returns a copy of the initial parameter with the values of the optimized parameter.
+
+    The bounds, the options and the expressions of the initial parameter are kept.
+
+    Parameters
+    ----------
+    initial :
+        The initial parameter.
+    optimized :
+        The parameter with the values to start from.
+    """
+    parameter = ParameterGroup.from_parameter_dict(initial.as_parameter_dict())
+    for label, p in parameter.all():
+        p.value = optimized.get(label).value
+        p.expr = initial.get(label).expr
+    return parameter
+
+
+def _initialize_worker(state: typing.Any):
+    """Stores the state in the worker process."""
+    global _worker_state
+    _worker_state = state
+
+
+def _run_task(task: typing.Callable[[typing.Any, typing.Any], typing.Any],
+              item: typing.Any) -> typing.Any:
+    """Runs a task with the state of the worker process."""
+    return task(_worker_state, item)
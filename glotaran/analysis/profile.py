@@ -0,0 +1,226 @@
+"""Functions for profile-likelihood confidence intervals of the parameters."""
+
+import typing
+
+import numpy as np
+import pandas as pd
+from scipy.special import erf
+from scipy.stats import f as f_distribution
+
+import glotaran  # noqa F01
+
+from .optimize import calculate_residual, optimize
+from .parallel import WorkerPool, warm_start_parameter
+
+
+class ProfileResult(typing.NamedTuple):
+    """The profile-likelihood confidence intervals and the chi-square profiles."""
+
+    intervals: pd.DataFrame
+    """The confidence intervals with the parameter labels as index. The column `best` contains
+    the optimized values, the columns `lower_<sigma>` and `upper_<sigma>` the bounds of the
+    intervals. A bound is `NaN` if the profile does not reach the level within its grid."""
+
+    profiles: typing.Dict[str, pd.DataFrame]
+    """The profiles with the parameter labels as keys. Every profile contains the columns
+    `value`, `chisqr` and `probability`, the probability that the difference in chi-square is
+    not due to chance. The chi-square is `NaN` for failed optimizations."""
+
+
+def profile_likelihood(result: 'glotaran.analysis.Result',
+                       labels: typing.List[str] = None,
+                       sigmas: typing.Sequence[float] = (1, 2, 3),
+                       points: int = 11,
+                       width: float = 4,
+                       bounds: typing.Dict[str, typing.Tuple[float, float]] = None,
+                       workers: int = None,
+                       max_nfev: int = None,
+                       ) -> ProfileResult:
+    """Calculates profile-likelihood confidence intervals of parameters.
+
+    Every selected parameter is fixed to the values of a grid around its optimized value, while
+    the other parameters are optimized again. The grid is walked outwards from the optimized
+    value on both sides, every point starts from the parameters optimized at its inner neighbour.
+    The walks are distributed across a pool of worker processes.
+
+    The probability of a grid point is calculated with an F-test of its chi-square against the
+    optimal chi-square, as in `lmfit.conf_interval`, and the bounds are linearly interpolated
+    where the probability crosses the levels of the sigmas.
+
+    Notes
+    -----
+    The standard errors of the parameters are only available if the optimizer estimated the
+    covariance, otherwise pass `bounds` for parameters with an uncertainty far from 10%.
+
+    Parameters
+    ----------
+    result :
+        The optimized global analysis result.
+    labels :
+        The labels of the parameters to profile. If `None` all varying parameters are profiled.
+    sigmas :
+        The confidence levels in standard deviations of a normal distribution.
+    points :
+        The number of grid points per parameter.
+    width :
+        The half width of the grid in standard errors of the parameter. If a parameter has no
+        standard error, 10% of its value is used.
+    bounds :
+        A dictionary with the grid bounds for parameters, overriding `width`.
+    workers :
+        The number of worker processes. If `None` the number of processors is used. With `1`
+        the profiles are calculated in the calling process.
+    max_nfev :
+        Maximum number of function evaluations per grid point. `None` for unlimited.
+    """
+    initial = result.initial_parameter
+    optimized = result.optimized_parameter
+    if labels is None:
+        labels = [label for label, p in initial.all() if p.vary and not p.expr]
+    for label in labels:
+        if not initial.has(label):
+            raise ValueError(f"Unknown parameter '{label}'")
+        p = initial.get(label)
+        if not p.vary or p.expr:
+            raise ValueError(f"Parameter '{label}' is not varying and cannot be profiled")
+    if points < 3:
+        raise ValueError(f"A profile needs at least 3 points, got {points}")
+    bounds = bounds or {}
+
+    walks = []
+    for label in labels:
+        grid = _grid(optimized.get(label), points, width, bounds.get(label))
+        best = optimized.get(label).value
+        walks.append((label, grid[grid < best][::-1]))
+        walks.append((label, grid[grid > best]))
+
+    state = {
+        'model': result.model,
+        'parameter': warm_start_parameter(initial, optimized),
+        'data': {label: dataset[['data', 'weight'] if 'weight' in dataset else ['data']]
+                 for label, dataset in result.data.items()},
+        'nnls': result.nnls,
+        'atol': result._atol,
+        'dtype': result.dtype,
+        'solver_dtype': result.solver_dtype,
+        'max_nfev': max_nfev,
+    }
+
+    with WorkerPool(workers, state, tasks=len(walks)) as pool:
+        chisqrs = list(pool.map(_profile_walk, walks))
+
+    levels = erf(np.asarray(sigmas, dtype=np.float64) / np.sqrt(2))
+    profiles = {}
+    intervals = []
+    for i, label in enumerate(labels):
+        lower, upper = walks[2 * i][1], walks[2 * i + 1][1]
+        lower_chisqr, upper_chisqr = chisqrs[2 * i], chisqrs[2 * i + 1]
+        best = optimized.get(label).value
+
+        value = np.concatenate([lower[::-1], [best], upper])
+        chisqr = np.concatenate([lower_chisqr[::-1], [result.chisqr], upper_chisqr])
+        probability = _f_test(chisqr, result.chisqr, result.nfree)
+        profiles[label] = pd.DataFrame(
+            {'value': value, 'chisqr': chisqr, 'probability': probability})
+
+        interval = {'best': best}
+        for sigma, level in zip(sigmas, levels):
+            interval[f'lower_{sigma:g}'] = _crossing(
+                best, lower, lower_chisqr, result.chisqr, result.nfree, level)
+            interval[f'upper_{sigma:g}'] = _crossing(
+                best, upper, upper_chisqr, result.chisqr, result.nfree, level)
+        intervals.append(interval)
+
+    columns = [f'lower_{sigma:g}' for sigma in sorted(sigmas, reverse=True)] + ['best'] + \
+        [f'upper_{sigma:g}' for sigma in sorted(sigmas)]
+    intervals = pd.DataFrame(intervals, index=pd.Index(labels, name='label'), columns=columns)
+    return ProfileResult(intervals=intervals, profiles=profiles)
+
+
+def _grid(p: 'glotaran.parameter.Parameter',
+          points: int,
+          width: float,
+          bounds: typing.Optional[typing.Tuple[float, float]]) -> np.ndarray:
+    """Creates the grid of a parameter, always containing its optimized value."""
+    value = p.value
+    if bounds is None:
+        stderr = p.stderr
+        if stderr is not None and np.isfinite(stderr) and stderr > 0:
+            # the standard error of a non-negative parameter is estimated for its logarithm
+            stderr = value * stderr if p.non_neg else stderr
+        else:
+            stderr = 0.1 * abs(value) if value != 0 else 0.1
+        bounds = (value - width * stderr, value + width * stderr)
+    minimum = max(bounds[0], p.min)
+    maximum = min(bounds[1], p.max)
+    if p.non_neg:
+        minimum = max(minimum, np.nextafter(0, 1))
+
+    # the optimized value splits the points on both sides in proportion to the distances
+    lower = int(round((points - 1) * (value - minimum) / max(maximum - minimum, 1e-300)))
+    return np.concatenate([np.linspace(minimum, value, lower + 1),
+                           np.linspace(value, maximum, points - lower)[1:]])
+
+
+def _f_test(chisqr: np.ndarray, best_chisqr: float, nfree: int) -> np.ndarray:
+    """The probability that the increase of the chi-square with one fixed parameter is
+    significant."""
+    return f_distribution.cdf(_f_statistic(chisqr, best_chisqr, nfree), 1, nfree - 1)
+
+
+def _f_statistic(chisqr: np.ndarray, best_chisqr: float, nfree: int) -> np.ndarray:
+    """The F statistic of the increase of the chi-square with one fixed parameter."""
+    return np.maximum(np.asarray(chisqr) / best_chisqr - 1, 0) * (nfree - 1)
+
+
+def _crossing(best: float,
+              values: np.ndarray,
+              chisqr: np.ndarray,
+              best_chisqr: float,
+              nfree: int,
+              level: float) -> float:
+    """Interpolates where the probability of a walk from the optimum crosses the level.
+
+    The interpolation is linear in the square root of the F statistic, which is linear in the
+    distance from the optimum for a quadratic chi-square profile.
+    """
+    statistic = np.sqrt(_f_statistic(chisqr, best_chisqr, nfree))
+    threshold = np.sqrt(f_distribution.ppf(level, 1, nfree - 1))
+    previous_value, previous_statistic = best, 0
+    for value, stat in zip(values, statistic):
+        if np.isnan(stat):
+            break
+        if stat >= threshold:
+            return float(np.interp(threshold, [previous_statistic, stat],
+                                   [previous_value, value]))
+        previous_value, previous_statistic = value, stat
+    return np.nan
+
+
+def _profile_walk(state: typing.Dict[str, typing.Any],
+                  walk: typing.Tuple[str, np.ndarray]) -> np.ndarray:
+    """Optimizes the parameters with one parameter fixed to the values of a walk and returns
+    the chi-squares."""
+    from .result import Result
+
+    label, values = walk
+    previous = state['parameter']
+    chisqr = np.full(len(values), np.nan)
+    for i, value in enumerate(values):
+        parameter = warm_start_parameter(state['parameter'], previous)
+        fixed = parameter.get(label)
+        fixed.value = value
+        fixed.vary = False
+        try:
+            result = Result(state['model'], state['data'], parameter, state['nnls'],
+                            atol=state['atol'], dtype=state['dtype'],
+                            solver_dtype=state['solver_dtype'])
+            if any(p.vary and not p.expr for _, p in parameter.all()):
+                optimize(result, verbose=False, max_nfev=state['max_nfev'])
+                chisqr[i] = result.chisqr
+            else:
+                chisqr[i] = np.sum(np.square(calculate_residual(parameter, result)))
+        except Exception:
+            continue
+        previous = result.optimized_parameter
+    return chisqr
@@ -0,0 +1,124 @@
+"""Structured progress reporting for the optimization."""
+
+import json
+import time
+import typing
+
+import lmfit
+import numpy as np
+
+import glotaran  # noqa F01
+
+
+ProgressRecord = typing.Dict[str, typing.Any]
+"""A progress record is a dictionary with the keys `iteration`, `nfev`, `cost`, `chisqr`,
+`parameter` and `elapsed`, and `timings` if the analysis is instrumented.
+
+The `iteration` is the number of function evaluations which lowered the cost, i.e. the steps
+of the optimizer, and `nfev` the number of function evaluations, including those for the
+jacobian."""
+
+
+class ProgressReporter:
+
+    def __init__(self,
+                 callback: typing.Callable[[ProgressRecord], None],
+                 interval: float = 0,
+                 instrumentation: 'glotaran.analysis.instrumentation.Instrumentation' = None):
+        """Creates progress records during an optimization and passes them to a callback.
+
+        An instance can be used as `iter_cb` of :class:`lmfit.Minimizer`.
+
+        Parameters
+        ----------
+        callback :
+            The function receiving the progress records.
+        interval :
+            The minimum time in seconds between two records. The first function evaluation is
+            always reported. With `0` every function evaluation is reported.
+        instrumentation :
+            If enabled, a copy of its stage timings is added to the records.
+        """
+        self._callback = callback
+        self._interval = interval
+        self._instrumentation = instrumentation
+        self._start = time.perf_counter()
+        self._last = None
+        self._iteration = 0
+        self._best = np.inf
+
+    def __call__(self, parameter: lmfit.Parameters, nfev: int, residual: np.ndarray,
+                 *args, **kwargs):
+        # every evaluation is checked for a lower cost, so that the throttling does not change
+        # the iteration count
+        chisqr = float(np.dot(residual, residual))
+        if chisqr < self._best:
+            self._best = chisqr
+            self._iteration += 1
+
+        now = time.perf_counter()
+        if self._last is not None and now - self._last < self._interval:
+            return
+        self._last = now
+        record = {
+            'iteration': self._iteration,
+            'nfev': int(nfev),
+            'cost': chisqr / 2,
+            'chisqr': chisqr,
+            'parameter': _varying_parameter_values(parameter),
+            'elapsed': now - self._start,
+        }
+        if self._instrumentation is not None and self._instrumentation.enabled:
+            record['timings'] = dict(self._instrumentation.timings)
+        self._callback(record)
+
+
+class JsonLinesSink:
+
+    def __init__(self, file: typing.Union[str, typing.TextIO]):
+        """Writes progress records as JSON lines to a file.
+
+        Every record is written as one line and the file is flushed after every record, so the
+        progress can be followed while the optimization is running.
+
+        Parameters
+        ----------
+        file :
+            The path to the file or an open file object. A file opened from a path is closed
+            with :meth:`close`.
+        """
+        if isinstance(file, str):
+            self._file = open(file, mode='w')
+            self._owns_file = True
+        else:
+            self._file = file
+            self._owns_file = False
+
+    def __call__(self, record: ProgressRecord):
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def close(self):
+        """Closes the file if it was opened by the sink."""
+        if self._owns_file:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+        return False
+
+
+def _varying_parameter_values(parameter: lmfit.Parameters) -> typing.Dict[str, float]:
+    """Returns the values of the varying parameters by their full label."""
+    values = {}
+    for p in parameter.values():
+        if not p.vary:
+            continue
+        value = float(p.value)
+        if p.user_data['non_neg']:
+            value = float(np.exp(value))
+        values[p.user_data['full_label']] = value
+    return values
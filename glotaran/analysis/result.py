@@ -1,16 +1,22 @@
 """The result class for global analysis."""
 
+import importlib.util
+import os
 import typing
+import warnings
 
 import numpy as np
 import xarray as xr
 import lmfit
+import yaml
 
 import glotaran  # noqa F01
 from glotaran.parameter import ParameterGroup
+from glotaran.parameter.parameter_expression import ParameterExpressions
 
 
-from .grouping import create_group, create_data_group
+from .grouping import create_group, create_data_group, create_weight_group
+from .instrumentation import Instrumentation
 from .optimize import calculate_residual
 
 
@@ -22,6 +28,9 @@ class Result:
                  initital_parameter: ParameterGroup,
                  nnls: bool,
                  atol: float = 0,
+                 instrument: bool = False,
+                 dtype: typing.Union[str, np.dtype] = np.float64,
+                 solver_dtype: typing.Union[str, np.dtype] = None,
                  ):
         """The result of a global analysis.
 
@@ -39,7 +48,28 @@ class Result:
         atol :
             (default = 0)
             The tolerance for grouping datasets along the global axis.
+        instrument :
+            (default = False)
+            If `True` wall times, call counts and matrix shapes of the analysis stages are
+            recorded, see :attr:`timings` and :attr:`counters`. The progress records of the
+            optimization then contain the stage `timings`.
+        dtype :
+            (default = np.float64)
+            The floating point type of the data, the model matrices and the stored results.
+            Single precision (`np.float32`) halves the memory and bandwidth for large datasets.
+        solver_dtype :
+            (default = None)
+            The floating point type the linear problems are solved in. If `None` the `dtype` is
+            used.
         """
+        dtype = np.dtype(dtype)
+        if dtype.kind != 'f':
+            raise ValueError(f"The dtype must be a floating point type, got '{dtype}'")
+        solver_dtype = dtype if solver_dtype is None else np.dtype(solver_dtype)
+        if solver_dtype.kind != 'f':
+            raise ValueError(f"The solver dtype must be a floating point type, got "
+                             f"'{solver_dtype}'")
+
         self._model = model
         self._data = {}
         for label, dataset in data.items():
@@ -54,18 +84,31 @@ class Result:
             if isinstance(dataset, xr.DataArray):
                 dataset = dataset.to_dataset(name="data")
 
+            dataset = dataset.copy()
+            for name in ['data', 'weight', 'weighted_data']:
+                if name in dataset and dataset[name].dtype != dtype:
+                    dataset[name] = dataset[name].astype(dtype)
+
             if 'weight' in dataset and 'weighted_data' not in dataset:
                 dataset['weighted_data'] = np.multiply(dataset.data, dataset.weight)
             self._data[label] = dataset.transpose(model.matrix_dimension, model.global_dimension,
                                                   *[dim for dim in dataset.dims
-                                                    if dim is not model.matrix_dimension and
-                                                    dim is not model.global_dimension])
+                                                    if dim != model.matrix_dimension and
+                                                    dim != model.global_dimension])
         self._initial_parameter = initital_parameter
+        self._parameter_expressions = ParameterExpressions(initital_parameter)
         self._nnls = nnls
-        self._group = create_group(model, self._data, atol)
-        self._data_group = create_data_group(model, self._group, self._data)
+        self._atol = atol
+        self._dtype = dtype
+        self._solver_dtype = solver_dtype
+        self._group = None
+        self._global_axis = None
+        self._data_group = None
+        self._weight_group = None
         self._lm_result = None
+        self._optimized_parameter = None
         self._global_clp = {}
+        self._instrumentation = Instrumentation(enabled=instrument)
 
     @classmethod
     def from_parameter(cls,
@@ -74,6 +117,9 @@ class Result:
                        parameter: ParameterGroup,
                        nnls: bool,
                        atol: float = 0,
+                       instrument: bool = False,
+                       dtype: typing.Union[str, np.dtype] = np.float64,
+                       solver_dtype: typing.Union[str, np.dtype] = None,
                        ) -> 'Result':
         """Creates a :class:`Result` from parameters without optimization.
 
@@ -89,8 +135,16 @@ class Result:
             If `True` non-linear least squaes optimizing is used instead of variable projection.
         atol :
             The tolerance for grouping datasets along the global axis.
+        instrument :
+            If `True` the analysis stages are recorded, see :attr:`timings`.
+        dtype :
+            The floating point type of the data, the model matrices and the stored results.
+        solver_dtype :
+            The floating point type the linear problems are solved in. If `None` the `dtype` is
+            used.
         """
-        cls = cls(model, data, parameter, nnls, atol=atol)
+        cls = cls(model, data, parameter, nnls, atol=atol, instrument=instrument, dtype=dtype,
+                  solver_dtype=solver_dtype)
         calculate_residual(parameter, cls)
         cls.finalize()
         return cls
@@ -106,6 +160,16 @@ class Result:
         projection."""
         return self._nnls
 
+    @property
+    def dtype(self) -> np.dtype:
+        """The floating point type of the data, the model matrices and the stored results."""
+        return self._dtype
+
+    @property
+    def solver_dtype(self) -> np.dtype:
+        """The floating point type the linear problems are solved in."""
+        return self._solver_dtype
+
     @property
     def data(self) -> typing.Dict[str, xr.Dataset]:
         """The resulting data as a dictionary of :xarraydoc:`Dataset`.
@@ -169,36 +233,100 @@ class Result:
     def covar(self) -> np.ndarray:
         """Covariance matrix from minimization, with rows and columns
         corresponding to :attr:`var_names`."""
-        return self._lm_result.covar if self._lm_result else None
+        return getattr(self._lm_result, 'covar', None)
 
     @property
     def optimized_parameter(self) -> ParameterGroup:
-        """The optimized parameters."""
+        """The optimized parameters.
+
+        Notes
+        -----
+        The parameter group is created once from the optimization result and shared between all
+        calls. It is read-only, a copy can be modified.
+        """
         if self._lm_result is None:
             return self.initial_parameter
-        return ParameterGroup.from_parameter_dict(self._lm_result.params)
+        if self._optimized_parameter is None:
+            parameter = ParameterGroup.from_parameter_dict(self._lm_result.params)
+            self._parameter_expressions.evaluate(parameter)
+            for label in self._parameter_expressions.labels:
+                parameter.get(label).expr = self._initial_parameter.get(label).expr
+            parameter.set_read_only()
+            self._optimized_parameter = parameter
+        return self._optimized_parameter
 
     @property
     def initial_parameter(self) -> ParameterGroup:
         """The initital fit parameter"""
         return self._initial_parameter
 
+    @property
+    def parameter_expressions(self) -> ParameterExpressions:
+        """The compiled expressions of the parameters defined by an expression."""
+        return self._parameter_expressions
+
     @property
     def global_clp(self) -> typing.Dict[typing.Any, xr.DataArray]:
         """A dictonary of the global condionally linear parameter with the index on the global
         dimension as keys."""
         return self._global_clp
 
+    @property
+    def global_axis(self) -> np.ndarray:
+        """The sorted union of the indices on the global axis of all datasets."""
+        if self._global_axis is None:
+            self._global_axis = np.unique(np.concatenate(
+                [dataset.coords[self.model.global_dimension].values
+                 for dataset in self._data.values()]))
+        return self._global_axis
+
     @property
     def data_groups(self) -> typing.Dict[typing.Any, np.ndarray]:
         """A dictonary of the data groups along the global axis."""
+        if self._data_group is None:
+            self._data_group = create_data_group(self.model, self.groups, self._data)
         return self._data_group
 
+    @property
+    def weight_groups(self) -> typing.Dict[typing.Any, typing.Optional[np.ndarray]]:
+        """A dictonary of the weight vectors of the data groups along the global axis. The
+        weight vector is `None` for unweighted groups."""
+        if self._weight_group is None:
+            self._weight_group = create_weight_group(self.model, self.groups, self._data)
+        return self._weight_group
+
     @property
     def groups(self) -> typing.Dict[typing.Any, typing.List[typing.Tuple[typing.Any, str]]]:
         """A dictonary of the dataset_descriptor groups along the global axis."""
+        if self._group is None:
+            self._group = create_group(self.model, self._data, self._atol)
         return self._group
 
+    @property
+    def instrumentation(self) -> Instrumentation:
+        """The instrumentation recording the analysis stages."""
+        return self._instrumentation
+
+    @property
+    def timings(self) -> typing.Dict[str, float]:
+        """The accumulated wall times in seconds of the analysis stages.
+
+        Notes
+        -----
+        Only recorded if the result was created with `instrument=True`.
+        """
+        return dict(self._instrumentation.timings)
+
+    @property
+    def counters(self) -> typing.Dict[str, int]:
+        """The call counts of the analysis stages.
+
+        Notes
+        -----
+        Only recorded if the result was created with `instrument=True`.
+        """
+        return dict(self._instrumentation.counters)
+
     def get_dataset(self, dataset_label: str) -> xr.Dataset:
         """Returns the result dataset for the given dataset label.
 
@@ -229,31 +357,227 @@ class Result:
 
         if lm_result:
             self._lm_result = lm_result
+            self._optimized_parameter = None
+
+        instrumentation = self._instrumentation
+        with instrumentation.stage('finalize'):
+            for label in self.model.dataset:
+                dataset = self._data[label]
+
+                if 'weight' in dataset:
+                    dataset['residual'] = dataset.weighted_residual / dataset.weight
+
+                with instrumentation.stage('finalize_svd'):
+                    l, v, r = np.linalg.svd(dataset.residual)
+
+                dataset['residual_left_singular_vectors'] = \
+                    ((self.model.matrix_dimension, 'left_singular_value_index'), l)
+
+                dataset['residual_right_singular_vectors'] = \
+                    (('right_singular_value_index', self.model.global_dimension), r)
 
-        for label in self.model.dataset:
-            dataset = self._data[label]
+                dataset['residual_singular_values'] = \
+                    ((self.model.global_dimension, 'singular_value_index'), r)
 
-            if 'weight' in dataset:
-                dataset['weighted_residual'] = dataset.residual
-                dataset.residual = np.multiply(dataset.weighted_residual, dataset.weight**-1)
+                # reconstruct fitted data
+
+                dataset['fitted_data'] = dataset.data - dataset.residual
+
+            if callable(self.model._finalize_result):
+                with instrumentation.stage('finalize_model'):
+                    self.model._finalize_result(self)
+
+    def bootstrap(self,
+                  n: int,
+                  workers: int = None,
+                  seed: int = None,
+                  method: str = 'residual',
+                  quantiles: typing.Sequence[float] = (0.025, 0.5, 0.975),
+                  max_nfev: int = None,
+                  ) -> 'glotaran.analysis.bootstrap.BootstrapResult':
+        """Estimates the uncertainties of the optimized parameters by optimizing bootstrap
+        replicates of the data in a pool of worker processes.
+
+        See :func:`glotaran.analysis.bootstrap.bootstrap`.
+
+        Parameters
+        ----------
+        n :
+            The number of replicates.
+        workers :
+            The number of worker processes. If `None` the number of processors is used.
+        seed :
+            The seed of the random noise. The statistics do not depend on the number of workers.
+        method :
+            Either `residual` for resampling the residual or `parametric` for normal noise.
+        quantiles :
+            The quantiles of the parameters to estimate.
+        max_nfev :
+            Maximum number of function evaluations per replicate. `None` for unlimited.
+        """
+        from .bootstrap import bootstrap
+        return bootstrap(self, n, workers=workers, seed=seed, method=method,
+                         quantiles=quantiles, max_nfev=max_nfev)
+
+    def profile_likelihood(self,
+                           labels: typing.List[str] = None,
+                           sigmas: typing.Sequence[float] = (1, 2, 3),
+                           points: int = 11,
+                           width: float = 4,
+                           bounds: typing.Dict[str, typing.Tuple[float, float]] = None,
+                           workers: int = None,
+                           max_nfev: int = None,
+                           ) -> 'glotaran.analysis.profile.ProfileResult':
+        """Calculates profile-likelihood confidence intervals of the optimized parameters in a
+        pool of worker processes.
+
+        See :func:`glotaran.analysis.profile.profile_likelihood`.
 
-            l, v, r = np.linalg.svd(dataset.residual)
+        Parameters
+        ----------
+        labels :
+            The labels of the parameters to profile. If `None` all varying parameters are
+            profiled.
+        sigmas :
+            The confidence levels in standard deviations of a normal distribution.
+        points :
+            The number of grid points per parameter.
+        width :
+            The half width of the grid in standard errors of the parameter.
+        bounds :
+            A dictionary with the grid bounds for parameters, overriding `width`.
+        workers :
+            The number of worker processes. If `None` the number of processors is used.
+        max_nfev :
+            Maximum number of function evaluations per grid point. `None` for unlimited.
+        """
+        from .profile import profile_likelihood
+        return profile_likelihood(self, labels=labels, sigmas=sigmas, points=points,
+                                  width=width, bounds=bounds, workers=workers,
+                                  max_nfev=max_nfev)
+
+    def save(self,
+             path: str,
+             file_format: str = 'netcdf',
+             compression: bool = True,
+             chunks: typing.Dict[str, int] = None,
+             overwrite: bool = False):
+        """Saves the result to a folder.
+
+        The datasets are written as NetCDF or Zarr files, the initial and optimized parameter as
+        CSV files and the fit statistics as YAML file. The result can be loaded again with
+        :meth:`Result.load`.
 
-            dataset['residual_left_singular_vectors'] = \
-                ((self.model.matrix_dimension, 'left_singular_value_index'), l)
+        Parameters
+        ----------
+        path :
+            The path to the folder.
+        file_format :
+            The format for the datasets, either `netcdf` or `zarr`. Compressed NetCDF needs
+            `netCDF4` or `h5netcdf` (`pip install glotaran[netcdf]`), without them the datasets
+            are written uncompressed as NetCDF3 with scipy. Zarr needs `zarr`
+            (`pip install glotaran[zarr]`).
+        compression :
+            If `True`, the datasets are written compressed.
+        chunks :
+            A dictionary with chunk sizes for the dimensions of the datasets. Dimensions not in
+            `chunks` are not chunked.
+        overwrite :
+            If `True`, an existing result in the folder will be overwritten.
+        """
 
-            dataset['residual_right_singular_vectors'] = \
-                (('right_singular_value_index', self.model.global_dimension), r)
+        if file_format not in _RESULT_FILE_FORMATS:
+            raise ValueError(f"Unknown file format '{file_format}', supported formats are "
+                             f"{list(_RESULT_FILE_FORMATS)}")
+        if file_format == 'zarr' and not _has_module('zarr'):
+            raise Exception("Saving results in Zarr format requires the 'zarr' package, "
+                            "install it with `pip install glotaran[zarr]`")
+        result_file = os.path.join(path, _RESULT_FILE)
+        if os.path.exists(result_file) and not overwrite:
+            raise Exception(f"Result already exists in '{path}'")
+        os.makedirs(path, exist_ok=True)
+
+        datasets = {}
+        for label, dataset in self.data.items():
+            filename = f"{label}{_RESULT_FILE_FORMATS[file_format]}"
+            _write_dataset(dataset, os.path.join(path, filename), file_format,
+                           compression, chunks)
+            datasets[label] = filename
+
+        self.initial_parameter.to_csv(os.path.join(path, _INITIAL_PARAMETER_FILE))
+        self.optimized_parameter.to_csv(os.path.join(path, _OPTIMIZED_PARAMETER_FILE))
+
+        covar = self.covar
+        statistics = {
+            'nnls': self.nnls,
+            'atol': float(self._atol),
+            'dtype': self.dtype.name,
+            'solver_dtype': self.solver_dtype.name,
+            'file_format': file_format,
+            'datasets': datasets,
+            'nfev': int(self.nfev),
+            'nvars': None if self.nvars is None else int(self.nvars),
+            'ndata': None if self.ndata is None else int(self.ndata),
+            'nfree': None if self.nfree is None else int(self.nfree),
+            'chisqr': float(self.chisqr),
+            'red_chisqr': float(self.red_chisqr),
+            'var_names': list(self._lm_result.var_names) if self._lm_result else None,
+            'covar': None if covar is None else np.asarray(covar).tolist(),
+        }
+        with open(result_file, mode='w') as f:
+            yaml.safe_dump(statistics, f, default_flow_style=False)
 
-            dataset['residual_singular_values'] = \
-                ((self.model.global_dimension, 'singular_value_index'), r)
+    @classmethod
+    def load(cls, path: str, model: typing.Type["glotaran.model.Model"]) -> 'Result':
+        """Loads a result saved with :meth:`Result.save`.
 
-            # reconstruct fitted data
+        The datasets are opened lazily, data variables are only read from disk when they are
+        accessed.
 
-            dataset['fitted_data'] = dataset.data - dataset.residual
+        Parameters
+        ----------
+        path :
+            The path to the folder.
+        model :
+            The model used to create the result.
+        """
 
-        if callable(self.model._finalize_result):
-            self.model._finalize_result(self)
+        result_file = os.path.join(path, _RESULT_FILE)
+        if not os.path.isfile(result_file):
+            raise Exception(f"No result found in '{path}'")
+        with open(result_file) as f:
+            statistics = yaml.safe_load(f)
+
+        data = {label: _open_dataset(os.path.join(path, filename), statistics['file_format'])
+                for label, filename in statistics['datasets'].items()}
+
+        initial_parameter = \
+            ParameterGroup.from_csv(os.path.join(path, _INITIAL_PARAMETER_FILE))
+        optimized_parameter = \
+            ParameterGroup.from_csv(os.path.join(path, _OPTIMIZED_PARAMETER_FILE))
+
+        result = cls(model, data, initial_parameter, statistics['nnls'],
+                     atol=statistics['atol'],
+                     dtype=statistics.get('dtype', 'float64'),
+                     solver_dtype=statistics.get('solver_dtype'))
+        # the saved datasets are already finalized and must keep their dimension order
+        result._data = data
+        if statistics['var_names'] is not None:
+            covar = statistics['covar']
+            result._lm_result = lmfit.minimizer.MinimizerResult(
+                params=optimized_parameter.as_parameter_dict(),
+                nfev=statistics['nfev'],
+                nvarys=statistics['nvars'],
+                ndata=statistics['ndata'],
+                nfree=statistics['nfree'],
+                chisqr=statistics['chisqr'],
+                redchi=statistics['red_chisqr'],
+                var_names=statistics['var_names'],
+                covar=None if covar is None else np.asarray(covar),
+            )
+            optimized_parameter.set_read_only()
+            result._optimized_parameter = optimized_parameter
+        return result
 
     def markdown(self, with_model=True) -> str:
         """Formats the model as a markdown text.
@@ -306,3 +630,67 @@ class Result:
 
     def __str__(self):
         return self.markdown(with_model=False)
+
+
+_RESULT_FILE = 'result.yml'
+_INITIAL_PARAMETER_FILE = 'initial_parameter.csv'
+_OPTIMIZED_PARAMETER_FILE = 'optimized_parameter.csv'
+_RESULT_FILE_FORMATS = {
+    'netcdf': '.nc',
+    'zarr': '.zarr',
+}
+
+
+def _write_dataset(dataset: xr.Dataset,
+                   filename: str,
+                   file_format: str,
+                   compression: bool,
+                   chunks: typing.Dict[str, int]):
+
+    engine = _netcdf_engine() if file_format == 'netcdf' else None
+    if engine == 'scipy':
+        if compression or chunks:
+            warnings.warn(UserWarning(
+                "Neither 'netCDF4' nor 'h5netcdf' is installed, the datasets are written "
+                "uncompressed and unchunked as NetCDF3. Install them with "
+                "`pip install glotaran[netcdf]`."))
+        dataset.to_netcdf(filename, mode='w', engine=engine)
+        return
+
+    encoding = {}
+    for name, variable in dataset.data_vars.items():
+        var_encoding = {}
+        if chunks:
+            var_encoding['chunksizes' if file_format == 'netcdf' else 'chunks'] = \
+                tuple(min(chunks.get(dim, size), size)
+                      for dim, size in zip(variable.dims, variable.shape))
+        if file_format == 'netcdf':
+            if compression and variable.dtype.kind in 'iuf':
+                var_encoding['zlib'] = True
+        elif not compression:
+            var_encoding['compressor'] = None
+        encoding[name] = var_encoding
+
+    if file_format == 'netcdf':
+        dataset.to_netcdf(filename, mode='w', engine=engine, encoding=encoding)
+    else:
+        dataset.to_zarr(filename, mode='w', encoding=encoding)
+
+
+def _has_module(name: str) -> bool:
+    return importlib.util.find_spec(name) is not None
+
+
+def _netcdf_engine() -> str:
+    """Returns the xarray engine for writing NetCDF files, `scipy` if neither `netCDF4` nor
+    `h5netcdf` is installed."""
+    for module, engine in [('netCDF4', 'netcdf4'), ('h5netcdf', 'h5netcdf')]:
+        if _has_module(module):
+            return engine
+    return 'scipy'
+
+
+def _open_dataset(filename: str, file_format: str) -> xr.Dataset:
+    if file_format == 'netcdf':
+        return xr.open_dataset(filename)
+    return xr.open_zarr(filename, chunks=None)
@@ -1,9 +1,11 @@
 """Functions for simulating a global analysis model."""
 
+import inspect
 import typing
 import numpy as np
 import xarray as xr
 
+import glotaran  # noqa F01
 from glotaran.parameter import ParameterGroup
 
 
@@ -38,55 +40,189 @@ def simulate(model: typing.Type['glotaran.model.Model'],
         The seed for the noise simulation.
     """
 
+    matrix_axis = axes[model.matrix_dimension]
+    global_axis = axes[model.global_dimension]
+    clp = _clp_array(model, axes, clp)
+
+    result = _simulate_data(model, parameter, dataset, matrix_axis, global_axis, clp, True)
+
+    if noise:
+        random_state = np.random if noise_seed is None else np.random.RandomState(noise_seed)
+        result = random_state.normal(result, noise_std_dev)
+    data = xr.DataArray(result, coords=[
+        (model.matrix_dimension, matrix_axis), (model.global_dimension, global_axis)
+    ])
+
+    return data.to_dataset(name="data")
+
+
+def simulate_batch(model: typing.Type['glotaran.model.Model'],
+                   parameters: typing.Sequence[ParameterGroup],
+                   dataset: str,
+                   axes: typing.Dict[str, np.ndarray],
+                   clp: typing.Union[np.ndarray, xr.DataArray] = None,
+                   noise: bool = False,
+                   noise_std_dev: float = 1.0,
+                   seed: int = None,
+                   index_dependent: bool = None,
+                   path: str = None,
+                   chunk_size: int = 100,
+                   ) -> xr.Dataset:
+    """Simulates a dataset of a model for a stack of parameter sets.
+
+    Parameters
+    ----------
+    model :
+        The model to simulate.
+    parameters :
+        The parameter sets, one sample is simulated for every parameter set.
+    dataset :
+        Label of the dataset to simulate.
+    axes :
+        A dictory with axes for simulation.
+    clp :
+        Conditionaly linear parameter for all samples. Will be used instead of
+        `model.global_matrix` if given.
+    noise :
+        Add normal distributed noise to the simulation.
+    noise_std_dev :
+        The standard devition for noise simulation.
+    seed :
+        The seed for the noise simulation. Sample `i` uses the seed `(seed, i)`, so a sample
+        does not depend on the chunking or on the other samples.
+    index_dependent :
+        If `False` the model matrix is calculated once per sample instead of for every index on
+        the global axis. If `None` it is taken from `model.index_dependent()`.
+    path :
+        If given, the chunks are written to a Zarr store at this path as they are simulated
+        and the store is returned opened lazily, so the samples never need to fit into memory.
+    chunk_size :
+        The number of samples simulated and written together.
+
+    Returns
+    -------
+    data :
+        A dataset with the variable `data` with the dimensions `sample`, the matrix dimension and
+        the global dimension.
+    """
+    if chunk_size < 1:
+        raise ValueError(f"The chunk size must be positive, got {chunk_size}")
+    matrix_axis = axes[model.matrix_dimension]
+    global_axis = axes[model.global_dimension]
+    clp = _clp_array(model, axes, clp)
+    if index_dependent is None:
+        index_dependent = model.index_dependent()
+    if path is not None and \
+            'append_dim' not in inspect.signature(xr.Dataset.to_zarr).parameters:
+        raise Exception("Writing simulations to Zarr requires xarray 0.12.2 or newer")
+    if noise and seed is None:
+        seed = int(np.random.randint(np.iinfo(np.int32).max))
+
+    dims = ('sample', model.matrix_dimension, model.global_dimension)
+    coords = {model.matrix_dimension: matrix_axis, model.global_dimension: global_axis}
+    chunks = []
+    for start in range(0, len(parameters), chunk_size):
+        samples = range(start, min(start + chunk_size, len(parameters)))
+        data = np.empty((len(samples), matrix_axis.size, global_axis.size), dtype=np.float64)
+        for i, sample in enumerate(samples):
+            data[i] = _simulate_data(model, parameters[sample], dataset, matrix_axis,
+                                     global_axis, clp, index_dependent)
+            if noise:
+                data[i] += np.random.RandomState([seed, sample]).normal(
+                    0, noise_std_dev, data[i].shape)
+        chunk = xr.Dataset({'data': (dims, data)},
+                           coords={'sample': np.asarray(samples), **coords})
+
+        if path is None:
+            chunks.append(chunk)
+        elif start == 0:
+            chunk.to_zarr(path, mode='w', encoding={
+                'data': {'chunks': (chunk_size, matrix_axis.size, global_axis.size)}})
+        else:
+            chunk.to_zarr(path, append_dim='sample')
+
+    if path is not None:
+        return xr.open_zarr(path)
+    return chunks[0] if len(chunks) == 1 else xr.concat(chunks, 'sample')
+
+
+def _clp_array(model: typing.Type['glotaran.model.Model'],
+               axes: typing.Dict[str, np.ndarray],
+               clp: typing.Optional[typing.Union[np.ndarray, xr.DataArray]],
+               ) -> typing.Optional[xr.DataArray]:
+    """Validates the given clp and returns them as array with the global dimension first."""
+
     if model.global_matrix is None and clp is None:
         raise Exception("Cannot simulate models without implementation for global matrix"
                         " and no clp given.")
+    if clp is None:
+        return None
 
-    filled_dataset = model.dataset[dataset].fill(model, parameter)
+    global_axis = axes[model.global_dimension]
+    if clp.shape[0] != global_axis.size:
+        raise ValueError(f"Size of dimension 0 of clp ({clp.shape[0]}) != size of axis"
+                         f" '{model.global_dimension}' ({global_axis.size})")
+    if isinstance(clp, xr.DataArray):
+        if model.global_dimension not in clp.coords:
+            raise ValueError(f"Missing coordinate '{model.global_dimension}' in clp.")
+        if 'clp_label' not in clp.coords:
+            raise ValueError("Missing coordinate 'clp_label' in clp.")
+        return clp.transpose(model.global_dimension, 'clp_label')
+    if 'clp_label' not in axes:
+        raise ValueError("Missing axis 'clp_label'")
+    return xr.DataArray(clp, coords=[(model.global_dimension, global_axis),
+                                     ('clp_label', axes['clp_label'])])
 
-    matrix_dimension = axes[model.matrix_dimension]
-
-    global_dimension = axes[model.global_dimension]
-
-    matrix = [model.matrix(filled_dataset, index, matrix_dimension) for index in global_dimension]
-    if callable(model._constrain_matrix_function):
-        matrix = [model._constrain_matrix_function(parameter, clp, mat, global_dimension[i])
-                  for i, (clp, mat) in enumerate(matrix)]
-    matrix = [xr.DataArray(mat, coords=[(model.matrix_dimension, matrix_dimension),
-                                        ('clp_label', clp_label)])
-              for clp_label, mat in matrix]
-
-    if clp:
-        if clp.shape[0] != global_dimension.size:
-            raise ValueError(f"Size of dimension 0 of clp ({clp.shape[0]}) != size of axis"
-                             f" '{model.global_dimension}' ({global_dimension.size})")
-        if isinstance(clp, xr.DataArray):
-            if model.global_dimension not in clp.coords:
-                raise ValueError(f"Missing coordinate '{model.global_dimension}' in clp.")
-            if 'clp_label' not in clp.coords:
-                raise ValueError(f"Missing coordinate 'clp_label' in clp.")
-        else:
-            if 'clp_label' not in axes:
-                raise ValueError("Missing axis 'clp_label'")
-            clp = xr.DataArray(clp, coords=[(model.global_dimension, global_dimension),
-                                            ('clp_label', axes['clp_label'])])
-    else:
-        clp_labels, clp = model.global_matrix(filled_dataset, global_dimension)
-        clp = xr.DataArray(clp, coords=[(model.global_dimension, global_dimension),
-                                        ('clp_label', clp_labels)])
 
-    dim1 = matrix_dimension.size
-    dim2 = global_dimension.size
-    result = np.empty((dim1, dim2), dtype=np.float64)
-    for i in range(dim2):
-        result[:, i] = np.dot(matrix[i], clp[i])
+def _calculate_matrices(model: typing.Type['glotaran.model.Model'],
+                        parameter: ParameterGroup,
+                        filled_dataset: 'glotaran.model.DatasetDescriptor',
+                        matrix_axis: np.ndarray,
+                        indices: np.ndarray,
+                        ) -> typing.Tuple[typing.List[str], np.ndarray]:
+    """Calculates the (constrained) matrices at the indices, stacked along the first axis with
+    the columns of the union of their clp labels."""
+    model.prepare(indices)
+    matrices = []
+    labels = {}
+    for index in indices:
+        clp_labels, matrix = model.matrix(filled_dataset, index, matrix_axis)
+        if callable(model._constrain_matrix_function):
+            clp_labels, matrix = \
+                model._constrain_matrix_function(parameter, clp_labels, matrix, index)
+        matrices.append((clp_labels, matrix))
+        labels.update((label, len(labels)) for label in clp_labels if label not in labels)
 
-    if noise:
-        if noise_seed is not None:
-            np.random.seed(noise_seed)
-        result = np.random.normal(result, noise_std_dev)
-    data = xr.DataArray(result, coords=[
-        (model.matrix_dimension, matrix_dimension), (model.global_dimension, global_dimension)
-    ])
+    stacked = np.zeros((len(matrices), matrix_axis.size, len(labels)), dtype=np.float64)
+    for i, (clp_labels, matrix) in enumerate(matrices):
+        stacked[i][:, [labels[label] for label in clp_labels]] = matrix
+    return list(labels), stacked
 
-    return data.to_dataset(name="data")
+
+def _simulate_data(model: typing.Type['glotaran.model.Model'],
+                   parameter: ParameterGroup,
+                   dataset: str,
+                   matrix_axis: np.ndarray,
+                   global_axis: np.ndarray,
+                   clp: typing.Optional[xr.DataArray],
+                   index_dependent: bool,
+                   ) -> np.ndarray:
+    """Simulates the data of a dataset as product of the matrices and the clp."""
+    filled_dataset = model.dataset[dataset].fill(model, parameter)
+    labels, matrix = _calculate_matrices(
+        model, parameter, filled_dataset, matrix_axis,
+        global_axis if index_dependent else global_axis[:1])
+
+    if clp is None:
+        clp_labels, clp = model.global_matrix(filled_dataset, global_axis)
+        clp = xr.DataArray(clp, coords=[(model.global_dimension, global_axis),
+                                        ('clp_label', clp_labels)])
+    available = set(clp.coords['clp_label'].values.tolist())
+    missing = [label for label in labels if label not in available]
+    if missing:
+        raise ValueError(f"Missing clp for the labels {missing} of the matrix")
+    clp = clp.sel(clp_label=labels).values
+
+    if index_dependent:
+        return np.einsum('gmc,gc->mg', matrix, clp)
+    return matrix[0] @ clp.T
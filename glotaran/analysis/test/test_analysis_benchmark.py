@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from glotaran.analysis.grouping import create_group
+from glotaran.analysis.optimize import calculate_residual
+from glotaran.analysis.result import Result
+
+from .test_fitting import DecayModel, MultichannelMulticomponentDecay
+
+
+def _simulate(e_axis, noise_seed=42):
+    suite = MultichannelMulticomponentDecay
+    return suite.sim_model.simulate('dataset1', suite.wanted,
+                                    {'e': e_axis, 'c': suite.c_axis},
+                                    noise=True, noise_std_dev=1e-2, noise_seed=noise_seed)
+
+
+@pytest.mark.benchmark(group='residual')
+@pytest.mark.parametrize("nr_groups", [1, 10, 1000])
+def test_calculate_residual_benchmark(benchmark, nr_groups):
+    suite = MultichannelMulticomponentDecay
+    e_axis = np.linspace(12820, 15120, nr_groups)
+    result = Result(suite.model, {'dataset1': _simulate(e_axis)}, suite.initial, False)
+
+    assert len(result.groups) == nr_groups
+    benchmark.pedantic(calculate_residual, args=(suite.initial, result),
+                       rounds=5, iterations=1, warmup_rounds=1)
+
+
+@pytest.mark.benchmark(group='grouping')
+@pytest.mark.parametrize("atol", [0, 2])
+def test_create_group_benchmark(benchmark, atol):
+    model = DecayModel.from_dict({
+        'compartment': ["s1", "s2", "s3", "s4"],
+        'dataset': {
+            label: {
+                'initial_concentration': [],
+                'megacomplex': [],
+                'kinetic': ['k.1', 'k.2', 'k.3', 'k.4']
+            } for label in ['dataset1', 'dataset2']
+        }
+    })
+    e_axis = np.linspace(12820, 15120, 200)
+    data = {
+        'dataset1': _simulate(e_axis),
+        'dataset2': _simulate(e_axis + 1, noise_seed=43),
+    }
+
+    group = benchmark.pedantic(create_group, args=(model, data, atol),
+                               rounds=3, iterations=1)
+    assert len(group) == (200 if atol else 400)
@@ -0,0 +1,37 @@
+import types
+
+import numpy as np
+import pytest
+
+from glotaran.analysis.result import Result
+from glotaran.analysis.simulation import simulate
+
+from .test_fitting import MultichannelMulticomponentDecay
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_optimize_batch(workers):
+    suite = MultichannelMulticomponentDecay
+    datasets = [
+        {'dataset1': simulate(suite.sim_model, suite.wanted, 'dataset1',
+                              {'e': suite.e_axis, 'c': suite.c_axis},
+                              noise=True, noise_std_dev=1e-3, noise_seed=seed)}
+        for seed in range(3)
+    ]
+    # a dataset with missing dimension fails without affecting the others
+    datasets.insert(1, {'dataset1': datasets[0]['dataset1'].rename({'c': 'x'})})
+
+    results = suite.model.optimize_batch(suite.initial, iter(datasets), workers=workers,
+                                         max_pending=2)
+    assert isinstance(results, types.GeneratorType)
+    results = list(results)
+
+    assert len(results) == len(datasets)
+    assert isinstance(results[1], Exception)
+    for i in [0, 2, 3]:
+        result = results[i]
+        assert isinstance(result, Result)
+        expected = suite.model.optimize(suite.initial, datasets[i], verbose=False)
+        assert np.allclose(result.chisqr, expected.chisqr)
+        for label, param in expected.optimized_parameter.all():
+            assert np.allclose(result.optimized_parameter.get(label).value, param.value)
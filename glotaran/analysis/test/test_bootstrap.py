@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from glotaran.analysis import bootstrap as bootstrap_module
+from glotaran.analysis.bootstrap import StreamingStatistics
+from glotaran.analysis.simulation import simulate
+
+from .test_fitting import OneCompartmentDecay
+
+
+def test_streaming_statistics():
+    values = np.random.RandomState(1).normal([0, 10], [1, 3], (5000, 2))
+    statistics = StreamingStatistics(2, quantiles=[0.05, 0.5, 0.95])
+    for row in values:
+        statistics.update(row)
+
+    assert statistics.count == 5000
+    assert np.allclose(statistics.mean, values.mean(axis=0))
+    assert np.allclose(statistics.std, values.std(axis=0, ddof=1))
+    assert np.array_equal(statistics.minimum, values.min(axis=0))
+    assert np.array_equal(statistics.maximum, values.max(axis=0))
+    for q, estimate in statistics.quantiles.items():
+        assert np.allclose(estimate, np.quantile(values, q, axis=0), atol=0.1)
+
+
+def test_streaming_statistics_few_values():
+    statistics = StreamingStatistics(1, quantiles=[0.5])
+    assert np.isnan(statistics.quantiles[0.5]).all()
+    for value in [3, 1, 2]:
+        statistics.update([value])
+    assert statistics.quantiles[0.5] == [2]
+
+    with pytest.raises(ValueError):
+        StreamingStatistics(1, quantiles=[1.5])
+
+
+def test_bootstrap():
+    suite = OneCompartmentDecay
+    dataset = simulate(suite.sim_model, suite.wanted, 'dataset1',
+                       {'e': suite.e_axis, 'c': suite.c_axis},
+                       noise=True, noise_std_dev=1e-2, noise_seed=0)
+    result = suite.model.optimize(suite.initial, {'dataset1': dataset}, verbose=False)
+
+    serial = result.bootstrap(8, workers=1, seed=42)
+    assert serial.labels == ['1']
+    assert serial.n == 8
+    assert serial.failed == 0
+    assert np.all(serial.std > 0)
+    assert np.all(serial.minimum <= serial.quantiles[0.5])
+    assert np.all(serial.quantiles[0.5] <= serial.maximum)
+    optimized = result.optimized_parameter.get_many(serial.labels)
+    assert np.allclose(serial.mean, optimized, rtol=0.1)
+
+    parallel = result.bootstrap(8, workers=2, seed=42)
+    assert np.array_equal(parallel.mean, serial.mean)
+    assert np.array_equal(parallel.quantiles[0.975], serial.quantiles[0.975])
+
+    parametric = result.bootstrap(4, workers=1, seed=42, method='parametric')
+    assert parametric.n == 4
+
+    with pytest.raises(ValueError):
+        result.bootstrap(1, method='jackknife')
+
+
+def test_bootstrap_failures(monkeypatch):
+    suite = OneCompartmentDecay
+    dataset = simulate(suite.sim_model, suite.wanted, 'dataset1',
+                       {'e': suite.e_axis, 'c': suite.c_axis},
+                       noise=True, noise_std_dev=1e-2, noise_seed=0)
+    result = suite.model.optimize(suite.initial, {'dataset1': dataset}, verbose=False)
+
+    optimize = bootstrap_module.optimize
+    calls = []
+
+    def failing_optimize(*args, **kwargs):
+        calls.append(None)
+        if len(calls) % 2:
+            raise ValueError("replicate error")
+        optimize(*args, **kwargs)
+
+    monkeypatch.setattr(bootstrap_module, 'optimize', failing_optimize)
+    with pytest.warns(UserWarning, match="2 of 4 .* replicate error"):
+        partial = result.bootstrap(4, workers=1, seed=42)
+    assert partial.n == 2
+    assert partial.failed == 2
+
+    def broken_optimize(*args, **kwargs):
+        raise ValueError("broken setup")
+
+    monkeypatch.setattr(bootstrap_module, 'optimize', broken_optimize)
+    with pytest.raises(Exception, match="All 4 .* broken setup"):
+        result.bootstrap(4, workers=1, seed=42)
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+from glotaran.analysis.compression import create_compressed_result
+from glotaran.analysis.result import Result
+from glotaran.models.spectral_temporal import KineticModel
+from glotaran.models.spectral_temporal.test.test_kinetic_model import IrfDispersion, \
+    ThreeComponentSequential
+
+
+def test_svd_compressed_optimization():
+    suite = ThreeComponentSequential
+    dataset = suite.sim_model.simulate('dataset1', suite.wanted, suite.axis)
+
+    result = suite.model.optimize(suite.initial, {'dataset1': dataset}, svd_components=3,
+                                  verbose=False)
+
+    for label, param in result.optimized_parameter.all():
+        assert np.allclose(param.value, suite.wanted.get(label).value, rtol=1e-1)
+
+    resultdata = result.data['dataset1']
+    assert resultdata.fitted_data.shape == dataset.data.shape
+    assert resultdata.clp.shape == (suite.spectral.size, 3)
+    assert np.allclose(dataset.data, resultdata.fitted_data, rtol=1e-2)
+    assert result.ndata == dataset.data.size
+    assert np.allclose(result.chisqr, np.sum(resultdata.residual.values**2))
+
+    # the uncertainties of the reduced problem do not match the full resolution statistics
+    assert result.covar is None
+    assert all(param.stderr is None for _, param in result.optimized_parameter.all())
+
+
+def test_svd_compressed_result():
+    suite = ThreeComponentSequential
+    dataset = suite.sim_model.simulate('dataset1', suite.wanted, suite.axis)
+    result = Result(suite.model, {'dataset1': dataset}, suite.initial, False)
+
+    compressed = create_compressed_result(result, 3)
+    data = compressed.data['dataset1']
+    assert data.data.shape == (suite.time.size, 3)
+    assert len(compressed.groups) == 3
+
+    with pytest.raises(ValueError):
+        create_compressed_result(result, suite.spectral.size + 1)
+
+    result = Result(suite.model, {'dataset1': dataset}, suite.initial, True)
+    with pytest.raises(Exception, match='non-negative'):
+        create_compressed_result(result, 3)
+
+
+def test_svd_compression_index_dependent():
+    suite = IrfDispersion
+    dataset = suite.sim_model.simulate('dataset1', suite.wanted, suite.axis)
+    result = Result(suite.model, {'dataset1': dataset}, suite.initial, False)
+
+    with pytest.raises(Exception, match='does not depend on the index'):
+        create_compressed_result(result, 3)
+
+
+def test_svd_compression_interval_constraint():
+    suite = ThreeComponentSequential
+    dataset = suite.sim_model.simulate('dataset1', suite.wanted, suite.axis)
+    assert not suite.model.index_dependent()
+
+    # a constraint active only in the middle of the spectral axis
+    model = KineticModel.from_dict({
+        'initial_concentration': {
+            'j1': {'compartments': ['s1', 's2', 's3'], 'parameters': ['j.1', 'j.0', 'j.0']},
+        },
+        'megacomplex': {'mc1': {'k_matrix': ['k1']}},
+        'k_matrix': {
+            "k1": {'matrix': {
+                ("s2", "s1"): 'kinetic.1',
+                ("s3", "s2"): 'kinetic.2',
+                ("s3", "s3"): 'kinetic.3',
+            }}
+        },
+        'irf': {
+            'irf1': {'type': 'gaussian', 'center': ['irf.center'], 'width': ['irf.width']},
+        },
+        'spectral_constraints': [
+            {'type': 'zero', 'compartment': 's3', 'interval': [(660, 680)]},
+        ],
+        'dataset': {
+            'dataset1': {'initial_concentration': 'j1', 'irf': 'irf1', 'megacomplex': ['mc1']},
+        },
+    })
+    assert model.index_dependent()
+    result = Result(model, {'dataset1': dataset}, suite.initial, False)
+
+    with pytest.raises(Exception, match='does not depend on the index'):
+        create_compressed_result(result, 3)
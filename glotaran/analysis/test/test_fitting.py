@@ -1,6 +1,7 @@
 import pytest
 from typing import List
 import numpy as np
+import xarray as xr
 
 from glotaran.analysis.simulation import simulate
 from glotaran.analysis.optimize import optimize
@@ -225,3 +226,73 @@ def test_fitting(suite):
     assert dataset.data.shape == resultdata.data.shape
     print(dataset.data[0, 0], resultdata.data[0, 0])
     assert np.allclose(dataset.data, resultdata.data)
+
+
+def test_fitting_weighted():
+    suite = MultichannelMulticomponentDecay
+    dataset = simulate(suite.sim_model, suite.wanted, 'dataset1',
+                       {'e': suite.e_axis, 'c': suite.c_axis})
+    dataset = dataset.to_dataset(name='data') if isinstance(dataset, xr.DataArray) else dataset
+    dataset['weight'] = xr.full_like(dataset.data, 0.5)
+    dataset['weight'].loc[{'c': slice(None, 10)}] = 2
+
+    result = Result(suite.model, {'dataset1': dataset}, suite.initial, False)
+    optimize(result, verbose=False)
+
+    for _, param in result.optimized_parameter.all():
+        assert np.allclose(param.value, suite.wanted.get(param.full_label).value,
+                           rtol=1e-1)
+
+    resultdata = result.data['dataset1']
+    assert np.allclose(resultdata.weighted_data, resultdata.data * resultdata.weight)
+    assert np.allclose(resultdata.residual, resultdata.weighted_residual / resultdata.weight)
+    assert np.allclose(resultdata.fitted_data, resultdata.data - resultdata.residual)
+
+    residual = resultdata.residual.copy()
+    result.finalize()
+    assert np.allclose(result.data['dataset1'].residual, residual)
+
+
+@pytest.mark.parametrize("solver_dtype", [None, np.float64])
+def test_fitting_float32(solver_dtype):
+    suite = MultichannelMulticomponentDecay
+    dataset = simulate(suite.sim_model, suite.wanted, 'dataset1',
+                       {'e': suite.e_axis, 'c': suite.c_axis})
+
+    result = Result(suite.model, {'dataset1': dataset}, suite.initial, False,
+                    dtype=np.float32, solver_dtype=solver_dtype)
+    optimize(result, verbose=False)
+
+    for _, param in result.optimized_parameter.all():
+        assert np.allclose(param.value, suite.wanted.get(param.full_label).value,
+                           rtol=1e-1)
+
+    resultdata = result.data['dataset1']
+    assert dataset.data.dtype == np.float64
+    for name in ['data', 'residual', 'clp', 'fitted_data']:
+        assert resultdata[name].dtype == np.float32
+    assert np.allclose(resultdata.fitted_data, dataset.data, rtol=1e-3, atol=1e-3)
+    assert isinstance(result.chisqr, float)
+
+    with pytest.raises(ValueError):
+        Result(suite.model, {'dataset1': dataset}, suite.initial, False, dtype=np.int32)
+
+
+def test_fitting_expression():
+    suite = TwoCompartmentDecay
+    dataset = simulate(suite.sim_model, suite.wanted, 'dataset1',
+                       {'e': suite.e_axis, 'c': suite.c_axis})
+    initial = ParameterGroup.from_yaml("""
+    - 1e-3
+    - [0, {expr: "$1 * 0.2"}]
+    """)
+
+    result = Result(suite.model, {'dataset1': dataset}, initial, False)
+    optimize(result, verbose=False)
+
+    optimized = result.optimized_parameter
+    assert result.nvars == 1
+    assert np.allclose(optimized.get('1').value, suite.wanted.get('1').value)
+    assert np.allclose(optimized.get('2').value, suite.wanted.get('2').value)
+    assert optimized.get('2').expr == "$1 * 0.2"
+    assert np.allclose(dataset.data, result.data['dataset1'].fitted_data)
@@ -1,7 +1,8 @@
 import numpy as np
 import xarray as xr
 
-from glotaran.analysis.grouping import create_group, calculate_group_item, create_data_group
+from glotaran.analysis.grouping import create_group, calculate_group_item, create_data_group, \
+    create_weight_group
 from glotaran.parameter import ParameterGroup
 
 from .mock import MockModel
@@ -151,3 +152,43 @@ def test_multi_dataset_overlap():
     assert data[0].shape[0] == 2
     assert data[1].shape[0] == 6
     assert data[9].shape[0] == 4
+
+
+def test_weight_group():
+    model = MockModel.from_dict({
+        "dataset": {
+            "dataset1": {
+                "megacomplex": [],
+            },
+            "dataset2": {
+                "megacomplex": [],
+            },
+        }
+    })
+    parameter = ParameterGroup.from_list([1, 10])
+
+    data = {
+        'dataset1': xr.DataArray(
+            np.ones((4, 2)),
+            coords=[('e', [0, 1, 2, 3]), ('c', [5, 7])]
+        ).to_dataset(name="data"),
+        'dataset2': xr.DataArray(
+            np.ones((4, 4)),
+            coords=[('e', [1.4, 2.4, 3.4, 9]), ('c', [5, 7, 9, 12])]
+        ).to_dataset(name="data"),
+    }
+    data['dataset2']['weight'] = xr.full_like(data['dataset2'].data, 0.5)
+    data['dataset2']['weight'].loc[{'e': 9}] = 2
+
+    group = create_group(model, data, atol=5e-1)
+    weight = create_weight_group(model, group, data)
+
+    assert weight[0] is None
+    assert np.array_equal(weight[1], [1, 1, 0.5, 0.5, 0.5, 0.5])
+    assert np.array_equal(weight[9], [2, 2, 2, 2])
+
+    clp, matrix = calculate_group_item(group[1], model, parameter, data)
+    weighted_clp, weighted_matrix = \
+        calculate_group_item(group[1], model, parameter, data, weight=weight[1])
+    assert weighted_clp == clp
+    assert np.array_equal(weighted_matrix, matrix * weight[1][:, np.newaxis])
@@ -0,0 +1,60 @@
+from glotaran.analysis.instrumentation import Instrumentation
+from glotaran.analysis.simulation import simulate
+
+from .test_fitting import MultichannelMulticomponentDecay
+
+
+def test_instrumentation_disabled():
+    instrumentation = Instrumentation()
+    with instrumentation.stage('stage'):
+        pass
+    instrumentation.count('counter')
+    instrumentation.add_shape('stage', (2, 3))
+
+    assert instrumentation.timings == {}
+    assert instrumentation.counters == {}
+    assert instrumentation.shapes == {}
+
+
+def test_instrumentation_enabled():
+    instrumentation = Instrumentation(enabled=True)
+    for _ in range(3):
+        with instrumentation.stage('stage'):
+            pass
+    instrumentation.count('counter', 2)
+    instrumentation.add_shape('stage', (2, 3))
+
+    assert instrumentation.timings['stage'] >= 0
+    assert instrumentation.counters == {'stage': 3, 'counter': 2}
+    assert instrumentation.shapes == {'stage': {(2, 3)}}
+
+    instrumentation.reset()
+    assert instrumentation.timings == {}
+
+
+def test_optimize_instrumentation():
+    suite = MultichannelMulticomponentDecay
+    dataset = simulate(suite.sim_model, suite.wanted, 'dataset1',
+                       {'e': suite.e_axis, 'c': suite.c_axis})
+
+    records = []
+    result = suite.model.optimize(suite.initial, {'dataset1': dataset}, verbose=False,
+                                  instrument=True, iteration_callback=records.append)
+
+    for stage in ['fill', 'matrix', 'solve', 'residual_write', 'finalize']:
+        assert result.timings[stage] > 0
+    assert result.counters['calculate_residual'] >= result.nfev
+    assert result.counters['matrix'] == result.counters['calculate_residual'] * suite.e_axis.size
+    assert result.instrumentation.shapes['matrix'] == {(suite.c_axis.size, 4)}
+
+    assert len(records) == result.counters['calculate_residual']
+    assert [record['nfev'] for record in records] == list(range(1, len(records) + 1))
+    assert all(record['chisqr'] >= 0 for record in records)
+    assert records[-1]['timings']['matrix'] > 0
+
+    records = []
+    result = suite.model.optimize(suite.initial, {'dataset1': dataset}, verbose=False,
+                                  iteration_callback=records.append)
+    assert result.timings == {}
+    assert result.counters == {}
+    assert all('timings' not in record for record in records)
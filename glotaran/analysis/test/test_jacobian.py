@@ -0,0 +1,112 @@
+import numpy as np
+
+from glotaran.analysis.jacobian import create_jacobian_sparsity
+from glotaran.analysis.optimize import calculate_group_residuals
+from glotaran.analysis.result import Result
+from glotaran.models.spectral_temporal import KineticModel
+from glotaran.parameter import ParameterGroup
+
+
+def _create_model(with_shapes):
+    model = {
+        'initial_concentration': {
+            'j1': {'compartments': ['s1'], 'parameters': ['j.1']},
+        },
+        'megacomplex': {
+            'mc1': {'k_matrix': ['k1']},
+            'mc2': {'k_matrix': ['k2']},
+        },
+        'k_matrix': {
+            'k1': {'matrix': {('s1', 's1'): 'kinetic.1'}},
+            'k2': {'matrix': {('s1', 's1'): 'kinetic.2'}},
+        },
+        'irf': {
+            'irf1': {'type': 'gaussian', 'center': ['irf.center1'], 'width': ['irf.width']},
+            'irf2': {'type': 'gaussian', 'center': ['irf.center2'], 'width': ['irf.width']},
+        },
+        'dataset': {
+            'dataset1': {'initial_concentration': 'j1', 'irf': 'irf1', 'megacomplex': ['mc1']},
+            'dataset2': {'initial_concentration': 'j1', 'irf': 'irf2', 'megacomplex': ['mc2']},
+        },
+    }
+    if with_shapes:
+        model['shape'] = {'sh1': ['one']}
+        for dataset in model['dataset'].values():
+            dataset['shape'] = {'s1': 'sh1'}
+    return KineticModel.from_dict(model)
+
+
+class TwoIndependentDatasets:
+    model = _create_model(False)
+    sim_model = _create_model(True)
+    wanted = ParameterGroup.from_dict({
+        'kinetic': [0.1, 0.05],
+        'irf': [['center1', 0.3], ['center2', 0.5], ['width', 0.1]],
+        'j': [[1, {'vary': False}]],
+    })
+    initial = ParameterGroup.from_dict({
+        'kinetic': [0.09, 0.06],
+        'irf': [['center1', 0.25], ['center2', 0.45], ['width', 0.12]],
+        'j': [[1, {'vary': False}]],
+    })
+    time = np.arange(-1, 20, 0.1)
+    axes = {
+        'dataset1': {'time': time, 'spectral': np.arange(0, 5.0)},
+        'dataset2': {'time': time, 'spectral': np.arange(10, 15.0)},
+    }
+
+
+def _simulate(suite):
+    return {label: suite.sim_model.simulate(label, suite.wanted, axes)
+            for label, axes in suite.axes.items()}
+
+
+def test_jacobian_sparsity():
+    suite = TwoIndependentDatasets
+    result = Result(suite.model, _simulate(suite), suite.initial, False)
+    parameter = suite.initial.as_parameter_dict()
+    group_residuals = calculate_group_residuals(parameter, result)
+
+    sparsity = create_jacobian_sparsity(result, parameter, group_residuals)
+
+    time = suite.time.size
+    assert sparsity.shape == (2 * 5 * time, 5)
+    columns = [name for name, p in parameter.items() if p.vary]
+    assert columns == ['_kinetic_1', '_kinetic_2', '_irf_center1', '_irf_center2',
+                       '_irf_width']
+    sparsity = sparsity.toarray()
+    assert np.all(sparsity[:5 * time] == [1, 0, 1, 0, 1])
+    assert np.all(sparsity[5 * time:] == [0, 1, 0, 1, 1])
+
+
+def test_jacobian_sparsity_expression():
+    suite = TwoIndependentDatasets
+    initial = ParameterGroup.from_parameter_dict(suite.initial.as_parameter_dict())
+    initial['irf'].get('center2').expr = '$irf.center1 + 0.2'
+    result = Result(suite.model, _simulate(suite), initial, False)
+    parameter = initial.as_parameter_dict()
+
+    sparsity = create_jacobian_sparsity(
+        result, parameter, calculate_group_residuals(parameter, result)).toarray()
+    assert np.all(sparsity[-1] == [0, 1, 1, 1])
+
+
+def test_jacobian_sparsity_dense():
+    suite = TwoIndependentDatasets
+    # with overlapping global axes the datasets are grouped and the jacobian is dense
+    data = {label: suite.sim_model.simulate(label, suite.wanted, suite.axes['dataset1'])
+            for label in suite.axes}
+    result = Result(suite.model, data, suite.initial, False)
+    parameter = suite.initial.as_parameter_dict()
+
+    assert create_jacobian_sparsity(
+        result, parameter, calculate_group_residuals(parameter, result)) is None
+
+
+def test_fitting_sparse_jacobian():
+    suite = TwoIndependentDatasets
+    result = suite.model.optimize(suite.initial, _simulate(suite), sparse_jacobian=True,
+                                  verbose=False)
+
+    for label, param in result.optimized_parameter.all():
+        assert np.allclose(param.value, suite.wanted.get(label).value, rtol=1e-2)
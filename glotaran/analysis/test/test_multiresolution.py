@@ -0,0 +1,66 @@
+import numpy as np
+import xarray as xr
+
+from glotaran.analysis.multiresolution import ResolutionLevel, bin_dataset
+from glotaran.models.spectral_temporal.test.test_kinetic_model import IrfDispersion
+
+
+def test_bin_dataset():
+    model = IrfDispersion.model
+    time = np.arange(100.0)
+    spectral = np.arange(10.0)
+    data = xr.DataArray(np.outer(time, np.ones(spectral.size)) + spectral,
+                        coords=[('time', time), ('spectral', spectral)])
+
+    binned = bin_dataset(model, data, global_bin=4)
+    assert binned.data.shape == (100, 3)
+    assert np.allclose(binned.spectral, [1.5, 5.5, 8.5])
+    assert np.allclose(binned.data.sel(time=10), 10 + binned.spectral)
+    # the weights of unweighted data grow with the square root of the bin size
+    assert np.allclose(binned.weight.isel(time=0), np.sqrt([4, 4, 2]))
+
+    binned = bin_dataset(model, data, matrix_bins=20)
+    time = binned.coords['time'].values
+    assert time.size <= 20
+    assert np.all(np.diff(time) > 0)
+    assert np.diff(time)[-1] > np.diff(time)[0]
+    assert np.allclose(binned.data.sel(spectral=0), time)
+
+    weighted = data.to_dataset(name='data')
+    weighted['weight'] = xr.full_like(data, 2)
+    binned = bin_dataset(model, weighted, global_bin=2, matrix_bins=20)
+    # the binned points contribute to the chi-square as much as the points in the bins
+    assert np.allclose(np.sum(binned.weight**2), np.sum(weighted.weight**2))
+    assert binned.weight.isel(time=-1, spectral=0) > binned.weight.isel(time=0, spectral=0)
+    assert np.allclose(bin_dataset(model, weighted).weight, 2)
+    assert 'weight' not in bin_dataset(model, data)
+
+
+def test_bin_dataset_time_zero():
+    model = IrfDispersion.model
+    time = np.arange(-50.0, 150.0)
+    data = xr.DataArray(np.outer(time, np.ones(2)), coords=[('time', time), ('spectral', [0, 1])])
+
+    binned = bin_dataset(model, data, matrix_bins=40, time_zero=0)
+    time = binned.coords['time'].values
+    width = np.diff(time)
+    before, after = width[time[1:] < 0], width[time[:-1] > 0]
+    # linear bins before the time zero, the finest bins right after it
+    assert np.allclose(before, before[0])
+    assert after[0] < before[0]
+    assert np.all(np.diff(after) >= 0)
+    assert np.allclose(binned.data.sel(spectral=0), time)
+
+
+def test_optimize_multiresolution():
+    suite = IrfDispersion
+    dataset = suite.sim_model.simulate('dataset1', suite.wanted, suite.axis)
+    schedule = [ResolutionLevel(global_bin=4, matrix_bins=50), ResolutionLevel(global_bin=2)]
+
+    result = suite.model.optimize_multiresolution(suite.initial, {'dataset1': dataset},
+                                                  schedule=schedule, verbose=False)
+
+    for label, param in result.optimized_parameter.all():
+        assert np.allclose(param.value, suite.wanted.get(label).value, rtol=1e-1)
+    assert result.data['dataset1'].fitted_data.shape == dataset.data.shape
+    assert np.allclose(dataset.data, result.data['dataset1'].fitted_data, rtol=1e-2)
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from glotaran.analysis import multistart as multistart_module
+from glotaran.analysis.multistart import sample_parameter
+from glotaran.analysis.simulation import simulate
+from glotaran.parameter import ParameterGroup
+
+from .test_fitting import OneCompartmentDecay
+
+
+def test_sample_parameter_latin_hypercube():
+    parameter = ParameterGroup.from_dict({
+        'k': [[0.1, {'min': 1e-3, 'max': 10, 'non-negative': True}]],
+        'a': [[1, {'min': -1, 'max': 3}], [5, {'vary': False}]],
+    })
+    samples = sample_parameter(parameter, 8, seed=0)
+
+    assert len(samples) == 8
+    rates = np.array([sample.get('k.1').value for sample in samples])
+    amplitudes = np.array([sample.get('a.1').value for sample in samples])
+    # one sample in every stratum, logarithmic for non-negative parameters
+    assert np.array_equal(np.sort(np.floor((np.log10(rates) + 3) / 4 * 8)), np.arange(8))
+    assert np.array_equal(np.sort(np.floor((amplitudes + 1) / 4 * 8)), np.arange(8))
+    for sample in samples:
+        assert sample.get('a.2').value == 5
+        assert sample.get('k.1').non_neg
+        assert np.isclose(sample.get('k.1').max, 10)
+    assert parameter.get('k.1').value == 0.1
+
+    again = sample_parameter(parameter, 8, seed=0)
+    assert [s.get('k.1').value for s in again] == rates.tolist()
+
+
+def test_sample_parameter_sobol():
+    pytest.importorskip('scipy.stats.qmc')
+    parameter = ParameterGroup.from_list([[0.5, {'min': 0, 'max': 1}]])
+    samples = sample_parameter(parameter, 5, sampling='sobol', seed=0)
+    values = [sample.get('1').value for sample in samples]
+    assert len(set(values)) == 5
+    assert all(0 <= value <= 1 for value in values)
+
+
+def test_sample_parameter_invalid():
+    with pytest.raises(ValueError, match="finite bounds"):
+        sample_parameter(ParameterGroup.from_list([0.5]), 4)
+    sample_parameter(ParameterGroup.from_list([0.5]), 4, bounds={'1': (0, 1)})
+    with pytest.raises(ValueError, match="Unknown sampling"):
+        sample_parameter(ParameterGroup.from_list([0.5]), 4, sampling='grid',
+                         bounds={'1': (0, 1)})
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_optimize_multistart(workers):
+    suite = OneCompartmentDecay
+    dataset = simulate(suite.sim_model, suite.wanted, 'dataset1',
+                       {'e': suite.e_axis, 'c': suite.c_axis})
+    data = {'dataset1': dataset}
+    initial = ParameterGroup.from_list([[1e-3, {'min': 1e-4, 'max': 1, 'non-negative': True}]])
+
+    results = suite.model.optimize_multistart(initial, data, starts=4, prune_nfev=None,
+                                              workers=workers, seed=1)
+    assert len(results) == 5
+    chisqr = [result.chisqr for result in results]
+    assert chisqr == sorted(chisqr)
+    assert np.allclose(results[0].optimized_parameter.get('1').value,
+                       suite.wanted.get('1').value)
+
+    pruned = suite.model.optimize_multistart(initial, data, starts=4, prune_nfev=2,
+                                             prune_factor=1, workers=workers, seed=1)
+    assert len(pruned) == 1
+    assert np.allclose(pruned[0].optimized_parameter.get('1').value,
+                       suite.wanted.get('1').value)
+    # the result keeps its sampled start, not the warm start of the second phase
+    starts = [initial] + sample_parameter(initial, 4, seed=1)
+    assert pruned[0].initial_parameter.get('1').value in \
+        [start.get('1').value for start in starts]
+
+
+def test_optimize_multistart_failures(monkeypatch):
+    suite = OneCompartmentDecay
+    dataset = simulate(suite.sim_model, suite.wanted, 'dataset1',
+                       {'e': suite.e_axis, 'c': suite.c_axis})
+    data = {'dataset1': dataset}
+    initial = ParameterGroup.from_list([[1e-3, {'min': 1e-4, 'max': 1, 'non-negative': True}]])
+
+    optimize = multistart_module.optimize
+    calls = []
+
+    def failing_optimize(*args, **kwargs):
+        calls.append(None)
+        if len(calls) == 1:
+            raise ValueError("start error")
+        optimize(*args, **kwargs)
+
+    monkeypatch.setattr(multistart_module, 'optimize', failing_optimize)
+    with pytest.warns(UserWarning, match="1 of 3 starts .* pruning phase.* start error"):
+        results = suite.model.optimize_multistart(initial, data, starts=2, prune_nfev=2,
+                                                  workers=1, seed=1)
+    assert len(results) >= 1
+
+    def broken_optimize(*args, **kwargs):
+        raise ValueError("broken setup")
+
+    monkeypatch.setattr(multistart_module, 'optimize', broken_optimize)
+    with pytest.raises(Exception, match="All 3 starts .* pruning phase: broken setup"):
+        suite.model.optimize_multistart(initial, data, starts=2, prune_nfev=2, workers=1)
+    with pytest.raises(Exception, match="All 3 starts .* convergence phase"):
+        suite.model.optimize_multistart(initial, data, starts=2, prune_nfev=None, workers=1)
@@ -0,0 +1,96 @@
+import numpy as np
+from scipy.optimize import nnls
+
+from glotaran.analysis import optimize
+from glotaran.analysis.nnls import residual_nnls, residual_nnls_batch, solve_nnls
+from glotaran.analysis.optimize import calculate_residual
+from glotaran.analysis.result import Result
+from glotaran.models.spectral_temporal.test.test_kinetic_model import ThreeComponentSequential
+
+
+def test_solve_nnls():
+    random = np.random.RandomState(42)
+    for _ in range(200):
+        matrix = random.normal(size=(random.randint(1, 30), random.randint(1, 6)))
+        data = random.normal(size=matrix.shape[0])
+
+        wanted, _ = nnls(matrix, data)
+        clp = solve_nnls(matrix, data)
+
+        assert np.all(clp >= 0)
+        assert np.allclose(clp, wanted)
+
+
+def test_residual_nnls_unconstrained():
+    matrix = np.array([[1.0, 0], [0, 1], [1, 1]])
+    clp = np.array([1.0, 2.0])
+    data = matrix @ clp
+
+    result, residual = residual_nnls(matrix, data)
+
+    assert np.allclose(result, clp)
+    assert np.allclose(residual, 0)
+
+
+def test_residual_nnls_batch():
+    random = np.random.RandomState(42)
+    matrix = random.normal(size=(30, 4))
+    data = random.normal(size=(30, 20))
+
+    clp, residual = residual_nnls_batch(matrix, data)
+
+    for i in range(data.shape[1]):
+        wanted, _ = nnls(matrix, data[:, i])
+        assert np.allclose(clp[:, i], wanted)
+    assert np.allclose(residual, data - matrix @ clp)
+
+
+def test_residual_nnls_batch_single_precision():
+    random = np.random.RandomState(42)
+    matrix = random.normal(size=(30, 4))
+    data = random.normal(size=(30, 20))
+
+    clp, residual = residual_nnls_batch(matrix.astype(np.float32), data.astype(np.float32))
+
+    assert clp.dtype == np.float32
+    assert residual.dtype == np.float32
+    wanted, _ = residual_nnls_batch(matrix, data)
+    assert np.allclose(clp, wanted, atol=1e-4)
+
+
+def test_residual_nnls_batch_rank_deficient():
+    random = np.random.RandomState(42)
+    matrix = random.normal(size=(30, 3))
+    matrix = np.concatenate([matrix, matrix[:, :1]], axis=1)
+    data = random.normal(size=(30, 5))
+
+    clp, residual = residual_nnls_batch(matrix, data)
+
+    for i in range(data.shape[1]):
+        wanted, norm = nnls(matrix, data[:, i])
+        assert np.all(clp[:, i] >= 0)
+        assert np.isclose(np.linalg.norm(residual[:, i]), norm)
+
+
+def test_batched_nnls_residual(monkeypatch):
+    suite = ThreeComponentSequential
+    dataset = suite.sim_model.simulate('dataset1', suite.wanted, suite.axis, noise=True,
+                                       noise_std_dev=0.1, noise_seed=0)
+    assert not suite.model.index_dependent()
+
+    def unbatched(matrix, data):
+        raise AssertionError("index independent groups are solved in a batch")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(optimize, 'residual_nnls', unbatched)
+        batched = Result(suite.model, {'dataset1': dataset}, suite.initial, True)
+        batched_residual = calculate_residual(suite.initial, batched)
+
+    # the unbatched path solves every index on its own
+    monkeypatch.setattr(suite.model, 'index_dependent', lambda: True)
+    single = Result(suite.model, {'dataset1': dataset}, suite.initial, True)
+    single_residual = calculate_residual(suite.initial, single)
+
+    assert np.allclose(batched_residual, single_residual)
+    for name in ['concentration', 'clp', 'residual']:
+        assert np.allclose(batched.data['dataset1'][name], single.data['dataset1'][name])
@@ -0,0 +1,44 @@
+import time
+
+import pytest
+
+from glotaran.analysis.parallel import WorkerPool, warm_start_parameter
+from glotaran.parameter import ParameterGroup
+
+
+def _scale(state, item):
+    # later items finish first, the results must still be in order
+    time.sleep(0.01 * (4 - item))
+    return state['factor'] * item
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_worker_pool(workers):
+    consumed = []
+
+    def items():
+        for item in range(5):
+            consumed.append(item)
+            yield item
+
+    with WorkerPool(workers, {'factor': 3}, tasks=5) as pool:
+        assert pool.workers == workers
+        assert list(pool.map(_scale, range(5))) == [0, 3, 6, 9, 12]
+
+        results = pool.imap(_scale, items(), max_pending=2)
+        assert next(results) == 0
+        # the items are consumed lazily
+        assert len(consumed) <= 2 + 1
+        assert list(results) == [3, 6, 9, 12]
+
+
+def test_warm_start_parameter():
+    initial = ParameterGroup.from_list([[1, {'min': 0, 'max': 5}], [2, {'expr': '$1 * 2'}]])
+    optimized = ParameterGroup.from_list([3, 6])
+
+    parameter = warm_start_parameter(initial, optimized)
+
+    assert parameter.get('1').value == 3
+    assert parameter.get('1').max == 5
+    assert parameter.get('2').expr == '$1 * 2'
+    assert initial.get('1').value == 1
@@ -0,0 +1,77 @@
+import copy
+
+import numpy as np
+import pytest
+
+from glotaran.analysis.optimize import calculate_residual
+from glotaran.analysis.simulation import simulate
+
+from .test_fitting import MultichannelMulticomponentDecay, OneCompartmentDecay
+
+
+def _optimized_result():
+    suite = OneCompartmentDecay
+    dataset = simulate(suite.sim_model, suite.wanted, 'dataset1',
+                       {'e': suite.e_axis, 'c': suite.c_axis},
+                       noise=True, noise_std_dev=1e-2, noise_seed=0)
+    return suite.model.optimize(suite.initial, {'dataset1': dataset}, verbose=False)
+
+
+def _standard_error(result):
+    parameter = copy.deepcopy(result.optimized_parameter)
+    value = parameter.get('1').value
+    step = value * 1e-6
+    residual = calculate_residual(parameter, result)
+    parameter.get('1').value = value + step
+    jacobian = (calculate_residual(parameter, result) - residual) / step
+    parameter.get('1').value = value
+    calculate_residual(parameter, result)
+    return np.sqrt(result.red_chisqr / np.dot(jacobian, jacobian))
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_profile_likelihood(workers):
+    result = _optimized_result()
+    best = result.optimized_parameter.get('1')
+
+    profile = result.profile_likelihood(sigmas=[1, 2], points=9, workers=workers)
+
+    intervals = profile.intervals
+    assert list(intervals.index) == ['1']
+    assert list(intervals.columns) == ['lower_2', 'lower_1', 'best', 'upper_1', 'upper_2']
+    row = intervals.loc['1']
+    assert row.best == best.value
+    assert row.lower_2 < row.lower_1 < row.best < row.upper_1 < row.upper_2
+    # for a single parameter the 1 sigma interval matches the linearized standard error
+    assert np.allclose(row.upper_1 - row.lower_1, 2 * _standard_error(result), rtol=0.05)
+
+    curve = profile.profiles['1']
+    assert len(curve) == 9
+    assert np.all(np.diff(curve.value) > 0)
+    assert curve.chisqr.min() == result.chisqr
+    assert curve.probability[curve.value == best.value].item() == 0
+
+
+def test_profile_likelihood_invalid():
+    result = _optimized_result()
+    with pytest.raises(ValueError, match="Unknown parameter"):
+        result.profile_likelihood(labels=['2'])
+    with pytest.raises(ValueError, match="at least 3 points"):
+        result.profile_likelihood(points=2)
+
+
+def test_profile_likelihood_reoptimization():
+    suite = MultichannelMulticomponentDecay
+    dataset = simulate(suite.sim_model, suite.wanted, 'dataset1',
+                       {'e': suite.e_axis, 'c': suite.c_axis},
+                       noise=True, noise_std_dev=1e-3, noise_seed=0)
+    result = suite.model.optimize(suite.initial, {'dataset1': dataset}, verbose=False)
+    best = result.optimized_parameter.get('k.4').value
+
+    profile = result.profile_likelihood(labels=['k.4'], points=3, workers=1,
+                                        bounds={'k.4': (0.9 * best, 1.1 * best)})
+
+    curve = profile.profiles['k.4']
+    assert np.allclose(curve.value, [0.9 * best, best, 1.1 * best])
+    assert np.all(curve.chisqr >= result.chisqr)
+    assert np.all(curve.probability[[0, 2]] > 0)
@@ -0,0 +1,72 @@
+import io
+import json
+
+import numpy as np
+
+from glotaran.analysis.progress import JsonLinesSink, ProgressReporter
+from glotaran.analysis.simulation import simulate
+
+from .test_fitting import MultichannelMulticomponentDecay
+
+
+def test_progress_reporter_interval():
+    suite = MultichannelMulticomponentDecay
+    parameter = suite.initial.as_parameter_dict()
+    residual = np.ones(4)
+
+    records = []
+    reporter = ProgressReporter(records.append, interval=3600)
+    for nfev in range(3, 7):
+        reporter(parameter, nfev, residual)
+
+    assert len(records) == 1
+    record = records[0]
+    assert record['iteration'] == 1
+    assert record['nfev'] == 3
+    assert record['chisqr'] == 4
+    assert record['cost'] == 2
+    assert record['elapsed'] >= 0
+    assert set(record['parameter']) == {label for label, _ in suite.initial.all()}
+
+
+def test_optimize_json_lines_sink():
+    suite = MultichannelMulticomponentDecay
+    dataset = simulate(suite.sim_model, suite.wanted, 'dataset1',
+                       {'e': suite.e_axis, 'c': suite.c_axis})
+
+    stream = io.StringIO()
+    with JsonLinesSink(stream) as sink:
+        result = suite.model.optimize(suite.initial, {'dataset1': dataset}, verbose=False,
+                                      iteration_callback=sink)
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    # the jacobian evaluations are reported too
+    assert len(records) >= result.nfev
+    assert [record['nfev'] for record in records] == list(range(1, len(records) + 1))
+    # the iterations count the evaluations lowering the cost, not the jacobian evaluations
+    iterations = [record['iteration'] for record in records]
+    assert iterations[0] == 1
+    assert iterations == sorted(iterations)
+    assert iterations[-1] < records[-1]['nfev']
+    chisqr = [record['chisqr'] for record in records]
+    assert all(iterations[i] > iterations[i - 1] for i in range(1, len(records))
+               if chisqr[i] < min(chisqr[:i]))
+    assert min(record['chisqr'] for record in records) < records[0]['chisqr']
+    for label, param in result.optimized_parameter.all():
+        assert label in records[-1]['parameter']
+
+
+def test_progress_reporter_iterations(monkeypatch):
+    suite = MultichannelMulticomponentDecay
+    parameter = suite.initial.as_parameter_dict()
+    clock = iter([0, 0, 1, 2, 3, 4])
+    monkeypatch.setattr('glotaran.analysis.progress.time.perf_counter', lambda: next(clock))
+
+    records = []
+    reporter = ProgressReporter(records.append, interval=2)
+    for nfev, chisqr in enumerate([4, 1, 2, 0.5, 3], 1):
+        reporter(parameter, nfev, np.sqrt([chisqr]))
+
+    # the throttled evaluations still count as iterations if they lowered the cost
+    assert [record['nfev'] for record in records] == [1, 3, 5]
+    assert [record['iteration'] for record in records] == [1, 2, 3]
@@ -0,0 +1,91 @@
+import copy
+
+import numpy as np
+import pytest
+
+from glotaran.analysis import result as result_module
+from glotaran.analysis.simulation import simulate
+from glotaran.analysis.result import Result
+
+from .test_fitting import MultichannelMulticomponentDecay
+
+
+@pytest.mark.parametrize("file_format", ["netcdf", "zarr"])
+def test_result_save_load(tmp_path, file_format):
+    pytest.importorskip('netCDF4' if file_format == 'netcdf' else 'zarr')
+
+    suite = MultichannelMulticomponentDecay
+    model = suite.model
+    dataset = simulate(suite.sim_model, suite.wanted, 'dataset1',
+                       {'e': suite.e_axis, 'c': suite.c_axis})
+    result = model.optimize(suite.initial, {'dataset1': dataset}, verbose=False)
+
+    path = str(tmp_path / "result")
+    result.save(path, file_format=file_format, chunks={'e': 10})
+    with pytest.raises(Exception):
+        result.save(path, file_format=file_format)
+
+    loaded = Result.load(path, model)
+
+    assert loaded.nnls == result.nnls
+    assert loaded.nfev == result.nfev
+    assert loaded.nvars == result.nvars
+    assert loaded.ndata == result.ndata
+    assert loaded.nfree == result.nfree
+    assert np.allclose(loaded.chisqr, result.chisqr)
+    assert np.allclose(loaded.red_chisqr, result.red_chisqr)
+    assert loaded.var_names == result.var_names
+    if result.covar is not None:
+        assert np.allclose(loaded.covar, result.covar)
+
+    for label, param in result.optimized_parameter.all():
+        assert np.allclose(loaded.optimized_parameter.get(label).value, param.value)
+    for label, param in result.initial_parameter.all():
+        assert np.allclose(loaded.initial_parameter.get(label).value, param.value)
+
+    for label, resultdata in result.data.items():
+        loaded_data = loaded.data[label]
+        for name in ['data', 'residual', 'fitted_data', 'concentration',
+                     'residual_left_singular_vectors', 'clp']:
+            assert np.allclose(loaded_data[name], resultdata[name])
+
+
+def test_result_save_without_optional_dependencies(tmp_path, monkeypatch):
+    suite = MultichannelMulticomponentDecay
+    dataset = simulate(suite.sim_model, suite.wanted, 'dataset1',
+                       {'e': suite.e_axis, 'c': suite.c_axis})
+    result = suite.model.optimize(suite.initial, {'dataset1': dataset}, verbose=False)
+    monkeypatch.setattr(result_module, '_has_module', lambda name: False)
+
+    path = str(tmp_path / "result")
+    with pytest.warns(UserWarning, match="uncompressed"):
+        result.save(path)
+    loaded = Result.load(path, suite.model)
+    assert np.allclose(loaded.data['dataset1'].residual, result.data['dataset1'].residual)
+
+    with pytest.raises(Exception, match="requires the 'zarr' package"):
+        result.save(str(tmp_path / "zarr"), file_format='zarr')
+
+
+def test_result_optimized_parameter_cached():
+
+    suite = MultichannelMulticomponentDecay
+    dataset = simulate(suite.sim_model, suite.wanted, 'dataset1',
+                       {'e': suite.e_axis, 'c': suite.c_axis})
+    result = suite.model.optimize(suite.initial, {'dataset1': dataset}, verbose=False)
+
+    optimized_parameter = result.optimized_parameter
+    assert result.optimized_parameter is optimized_parameter
+
+    # the shared group is read-only, copies are writable
+    label, param = next(iter(optimized_parameter.all()))
+    with pytest.raises(Exception, match="read-only"):
+        param.value = param.value + 1
+    copied = copy.deepcopy(optimized_parameter)
+    copied.get(label).value = param.value + 1
+    assert result.optimized_parameter.get(label).value == param.value
+
+    result.finalize(result._lm_result)
+    assert result.optimized_parameter is not optimized_parameter
+    for label, param in optimized_parameter.all():
+        assert result.optimized_parameter.get(label).value == param.value
@@ -1,7 +1,10 @@
-
 import numpy as np
+import pytest
+import xarray as xr
 
 from glotaran.analysis.simulation import simulate
+from glotaran.models.spectral_temporal import KineticModel
+from glotaran.models.spectral_temporal.test.test_kinetic_model import ThreeComponentSequential
 from glotaran.parameter import ParameterGroup
 
 from .mock import MockModel
@@ -35,3 +38,131 @@ def test_simulate_dataset():
         [6, 16, 26],
         [8, 22, 36],
     ]).T)
+
+
+def _mock_model():
+    return MockModel.from_dict({
+        "dataset": {
+            "dataset1": {
+                "megacomplex": [],
+            },
+        }
+    })
+
+
+def test_simulate_dataset_clp():
+    model = _mock_model()
+    axes = {'e': np.arange(4), 'c': np.arange(3)}
+    clp = xr.DataArray(np.ones((4, 2)), coords=[('e', axes['e']), ('clp_label', ['s2', 's1'])])
+    clp.loc[{'clp_label': 's2'}] = 2
+
+    data = simulate(model, ParameterGroup.from_list([]), 'dataset1', axes, clp=clp)
+
+    # the clp are matched to the matrix columns by label
+    _, matrix = model.matrix(None, 0, axes['c'])
+    assert np.allclose(data.data, (matrix @ [1, 2])[:, None] * np.ones(4))
+
+    with pytest.raises(ValueError, match="Missing clp"):
+        simulate(model, ParameterGroup.from_list([]), 'dataset1', axes,
+                 clp=clp.sel(clp_label=['s1']))
+
+
+@pytest.mark.parametrize("index_dependent", [None, True, False])
+def test_simulate_batch(index_dependent):
+    model = _mock_model()
+    parameters = [ParameterGroup.from_list([i, 1]) for i in range(5)]
+    axes = {'e': np.arange(4.0), 'c': np.arange(3.0)}
+
+    batch = model.simulate_batch('dataset1', parameters, axes, noise=True, noise_std_dev=0.1,
+                                 seed=3, index_dependent=index_dependent, chunk_size=2)
+
+    assert batch.data.dims == ('sample', 'c', 'e')
+    assert batch.data.shape == (5, 3, 4)
+    assert np.array_equal(batch.sample, np.arange(5))
+    noiseless = simulate(model, parameters[0], 'dataset1', axes)
+    assert not np.allclose(batch.data[0], noiseless.data)
+    assert np.allclose(batch.data[0], noiseless.data, atol=1)
+
+    # every sample has its own noise stream, independent of the chunking
+    again = model.simulate_batch('dataset1', parameters[3:], axes, noise=True,
+                                 noise_std_dev=0.1, seed=3, chunk_size=5)
+    assert not np.array_equal(again.data[0], batch.data[3])
+    single = model.simulate_batch('dataset1', parameters, axes, noise=True, noise_std_dev=0.1,
+                                  seed=3, chunk_size=5)
+    assert np.array_equal(single.data, batch.data)
+
+
+def test_simulate_noise_global_seed():
+    model = _mock_model()
+    axes = {'e': np.arange(4.0), 'c': np.arange(3.0)}
+    parameter = ParameterGroup.from_list([1, 1])
+
+    np.random.seed(1)
+    first = simulate(model, parameter, 'dataset1', axes, noise=True)
+    np.random.seed(1)
+    second = simulate(model, parameter, 'dataset1', axes, noise=True)
+    assert np.array_equal(first.data, second.data)
+
+
+def test_simulate_batch_interval_relation():
+    suite = ThreeComponentSequential
+    model = KineticModel.from_dict({
+        'initial_concentration': {
+            'j1': {'compartments': ['s1', 's2', 's3'], 'parameters': ['j.1', 'j.0', 'j.0']},
+        },
+        'megacomplex': {'mc1': {'k_matrix': ['k1']}},
+        'k_matrix': {
+            "k1": {'matrix': {
+                ("s2", "s1"): 'kinetic.1',
+                ("s3", "s2"): 'kinetic.2',
+                ("s3", "s3"): 'kinetic.3',
+            }}
+        },
+        'irf': {
+            'irf1': {'type': 'gaussian', 'center': ['irf.center'], 'width': ['irf.width']},
+        },
+        'spectral_relations': [
+            {'compartment': 's1', 'target': 's2', 'parameter': 'rel.1',
+             'interval': [(660, 680)]},
+        ],
+        'dataset': {
+            'dataset1': {'initial_concentration': 'j1', 'irf': 'irf1', 'megacomplex': ['mc1']},
+        },
+    })
+    parameters = [ParameterGroup.from_dict({
+        'kinetic': [rate, 202e-4, 105e-5],
+        'irf': [['center', 1.3], ['width', 7.8]],
+        'j': [['1', 1], ['0', 0]],
+        'rel': [2],
+    }) for rate in [0.5, 0.2]]
+    clp = xr.DataArray(np.ones((suite.spectral.size, 3)),
+                       coords=[('spectral', suite.spectral), ('clp_label', ['s1', 's2', 's3'])])
+
+    # the relation is only active in the middle of the axis
+    batch = model.simulate_batch('dataset1', parameters, suite.axis, clp=clp)
+    for i, parameter in enumerate(parameters):
+        expected = simulate(model, parameter, 'dataset1', suite.axis, clp=clp)
+        assert np.allclose(batch.data[i], expected.data)
+
+
+def test_simulate_batch_to_disk(tmp_path):
+    pytest.importorskip('zarr')
+    model = _mock_model()
+    parameters = [ParameterGroup.from_list([i, 1]) for i in range(5)]
+    axes = {'e': np.arange(4.0), 'c': np.arange(3.0)}
+    path = str(tmp_path / 'simulation.zarr')
+
+    written = model.simulate_batch('dataset1', parameters, axes, path=path, chunk_size=2)
+    expected = model.simulate_batch('dataset1', parameters, axes)
+
+    assert np.array_equal(written.data.values, expected.data.values)
+    assert np.array_equal(written.sample, np.arange(5))
+    assert np.array_equal(xr.open_zarr(path).c, axes['c'])
+
+
+@pytest.mark.benchmark(group='simulation')
+def test_simulate_batch_benchmark(benchmark):
+    model = _mock_model()
+    parameters = [ParameterGroup.from_list([i, 1]) for i in range(20)]
+    axes = {'e': np.arange(500.0), 'c': np.arange(200.0)}
+    benchmark(model.simulate_batch, 'dataset1', parameters, axes)
@@ -17,23 +17,29 @@ def residual_variable_projection(matrix: np.ndarray, data: np.ndarray) \
         The model matrix.
     data : np.ndarray
         The data to analyze.
+
+    Notes
+    -----
+
+    The LAPACK routines are chosen by the dtype of the matrix and the data, single precision
+    input is solved in single precision.
     """
     # TODO: Reference Kaufman paper
 
+    geqrf, ormqr, trtrs = lapack.get_lapack_funcs(('geqrf', 'ormqr', 'trtrs'), (matrix, data))
+
     # Kaufman Q2 step 3
-    qr, tau, _, _ = lapack.dgeqrf(matrix)
+    qr, tau, _, _ = geqrf(matrix)
 
     # Kaufman Q2 step 4
-    temp, _, _ = lapack.dormqr("L", "T", qr, tau, data, max(1, matrix.shape[1]),
-                               overwrite_c=0)
+    temp, _, _ = ormqr("L", "T", qr, tau, data, max(1, matrix.shape[1]), overwrite_c=0)
 
-    clp, _ = lapack.dtrtrs(qr, temp)
+    clp, _ = trtrs(qr, temp)
 
     for i in range(matrix.shape[1]):
         temp[i] = 0
 
     # Kaufman Q2 step 5
 
-    residual, _, _ = lapack.dormqr("L", "N", qr, tau, temp, max(1, matrix.shape[1]),
-                                   overwrite_c=0)
+    residual, _, _ = ormqr("L", "N", qr, tau, temp, max(1, matrix.shape[1]), overwrite_c=0)
     return clp[:matrix.shape[1]], residual
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+import xarray as xr
+
+from glotaran.io.sdt_file_reader import read_sdt
+from glotaran.io.wavelength_time_explicit_file import read_ascii_time_trace, \
+    write_ascii_time_trace
+
+from . import TEMPORAL_DATA
+
+
+@pytest.fixture(scope='module')
+def ascii_data():
+    time = np.arange(-10, 100, 0.1)
+    spectral = np.arange(400, 800, 2.0)
+    return xr.DataArray(np.random.RandomState(42).rand(time.size, spectral.size),
+                        coords=[('time', time), ('spectral', spectral)])
+
+
+@pytest.mark.benchmark(group='io')
+@pytest.mark.parametrize("file_format", ["TimeExplicit", "WavelengthExplicit"])
+def test_write_ascii_time_trace_benchmark(benchmark, tmp_path, ascii_data, file_format):
+    filename = str(tmp_path / "data.ascii")
+    benchmark(write_ascii_time_trace, filename, ascii_data, overwrite=True,
+              file_format=file_format)
+
+
+@pytest.mark.benchmark(group='io')
+@pytest.mark.parametrize("file_format", ["TimeExplicit", "WavelengthExplicit"])
+def test_read_ascii_time_trace_benchmark(benchmark, tmp_path, ascii_data, file_format):
+    filename = str(tmp_path / "data.ascii")
+    write_ascii_time_trace(filename, ascii_data, file_format=file_format)
+    benchmark(read_ascii_time_trace, filename)
+
+
+@pytest.mark.benchmark(group='io')
+def test_read_sdt_benchmark(benchmark):
+    benchmark(read_sdt, file_path=TEMPORAL_DATA["sdt"], index=[1])
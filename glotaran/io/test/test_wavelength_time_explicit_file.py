@@ -0,0 +1,42 @@
+import numpy as np
+import xarray as xr
+import pytest
+
+from glotaran.io.wavelength_time_explicit_file import read_ascii_time_trace, \
+    write_ascii_time_trace
+
+
+@pytest.mark.parametrize("file_format", ["TimeExplicit", "WavelengthExplicit"])
+@pytest.mark.parametrize("chunk_size", [1, 3, 512])
+def test_write_read_ascii_time_trace(tmp_path, file_format, chunk_size):
+
+    time = np.arange(0, 10, 0.5)
+    spectral = np.arange(600, 607)
+    data = xr.DataArray(np.random.rand(time.size, spectral.size),
+                        coords=[('time', time), ('spectral', spectral)])
+
+    filename = str(tmp_path / "data.ascii")
+    write_ascii_time_trace(filename, data, file_format=file_format, chunk_size=chunk_size)
+    with pytest.raises(Exception):
+        write_ascii_time_trace(filename, data, file_format=file_format)
+
+    result = read_ascii_time_trace(filename)
+    assert np.allclose(result.time, time)
+    assert np.allclose(result.spectral, spectral)
+    assert np.allclose(result.data, data, rtol=1e-9)
+
+
+def test_write_ascii_time_trace_variable(tmp_path):
+
+    time = np.arange(0, 10, 0.5)
+    spectral = np.arange(600, 607)
+    dataset = xr.Dataset({
+        'data': (('time', 'spectral'), np.random.rand(time.size, spectral.size)),
+        'residual': (('spectral', 'time'), np.random.rand(spectral.size, time.size)),
+    }, coords={'time': time, 'spectral': spectral})
+
+    filename = str(tmp_path / "residual.ascii")
+    write_ascii_time_trace(filename, dataset, variable='residual')
+
+    result = read_ascii_time_trace(filename)
+    assert np.allclose(result.data, dataset.residual.T, rtol=1e-9)
@@ -2,11 +2,15 @@ from enum import Enum
 import os.path
 import csv
 import re
+import typing
 import numpy as np
 import xarray as xr
 
 from .prepare_dataset import prepare_dataset
 
+DEFAULT_CHUNK_SIZE = 512
+"""The default number of rows formatted and written at once."""
+
 
 class DataFileType(Enum):
     time_explicit = "Time explicit"
@@ -27,9 +31,10 @@ class ExplicitFile(object):
         self._comment = ""
         absfilepath = os.path.realpath(filepath)
         if dataset is not None:
-            self._observations = np.array(dataset.values).T
-            self._times = np.array(dataset.coords['time'])
-            self._spectral_indices = np.array(dataset.coords['spectral'])
+            dataset = dataset.transpose('time', 'spectral')
+            self._observations = np.asarray(dataset.values).T
+            self._times = np.asarray(dataset.coords['time'])
+            self._spectral_indices = np.asarray(dataset.coords['spectral'])
             self._file = filepath
         elif os.path.isfile(filepath):
             self._file = filepath
@@ -89,8 +94,7 @@ class ExplicitFile(object):
         f.close()
 
     def write(self, overwrite=False, comment="",
-              file_format="TimeExplicit", number_format="%.10e"):
-        # TODO: write a more elegant method
+              file_format="TimeExplicit", number_format="%.10e", chunk_size=DEFAULT_CHUNK_SIZE):
 
         if os.path.isfile(self._file) and not overwrite:
             print('File {} already exists'.format(os.path.isfile(self._file)))
@@ -102,17 +106,21 @@ class ExplicitFile(object):
             wav = '\t'.join([repr(num) for num in self._spectral_indices])
             header = comments + "Wavelength explicit\nIntervalnr {}" \
                                 "".format(len(self._spectral_indices)) + "\n" + wav
-            raw_data = np.vstack((self._times.T, self._observations)).T
+            row_axis = self._times
+            # observations are stored as (spectral, time), rows are time points
+            rows = self._observations.T
         elif file_format == "TimeExplicit":
             tim = '\t'.join([repr(num) for num in self._times])
             header = comments + "Time explicit\nIntervalnr {}" \
                                 "".format(len(self._times)) + "\n" + tim
-            raw_data = np.vstack((self._spectral_indices.T, self._observations.T)).T
+            row_axis = self._spectral_indices
+            rows = self._observations
         else:
             raise NotImplementedError
 
-        np.savetxt(self._file, raw_data, fmt=number_format, delimiter='\t', newline='\n',
-                   header=header, footer='', comments='')
+        with open(self._file, mode='w') as f:
+            f.write(header + '\n')
+            write_rows(f, row_axis, rows, number_format=number_format, chunk_size=chunk_size)
 
     def read(self):
         if not os.path.isfile(self._file):
@@ -250,6 +258,48 @@ class TimeExplicitFile(ExplicitFile):
         return DataFileType.time_explicit
 
 
+def write_rows(f: typing.TextIO,
+               row_axis: np.ndarray,
+               rows: np.ndarray,
+               number_format: str = "%.10e",
+               delimiter: str = '\t',
+               chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Writes rows prepended with their axis value to a file in chunks.
+
+    Each chunk of rows is formatted with a single string formatting operation, so neither the
+    full table nor a stacked copy of axis and rows has to be held in memory.
+
+    Parameters
+    ----------
+    f :
+        The file to write to.
+    row_axis :
+        The axis values, one for each row.
+    rows :
+        The rows to write with shape (len(row_axis), n).
+    number_format :
+        The format for a single number.
+    delimiter :
+        The delimiter between the columns.
+    chunk_size :
+        The number of rows to write at once.
+    """
+
+    row_axis = np.asarray(row_axis)
+    rows = np.asarray(rows)
+    if rows.ndim != 2 or rows.shape[0] != row_axis.size:
+        raise ValueError(f"Shape of rows {rows.shape} does not match axis size {row_axis.size}")
+
+    row_format = delimiter.join([number_format] * (rows.shape[1] + 1)) + '\n'
+    block = np.empty((min(chunk_size, rows.shape[0]), rows.shape[1] + 1), dtype=np.float64)
+    for start in range(0, rows.shape[0], chunk_size):
+        end = min(start + chunk_size, rows.shape[0])
+        n = end - start
+        block[:n, 0] = row_axis[start:end]
+        block[:n, 1:] = rows[start:end]
+        f.write((row_format * n) % tuple(block[:n].ravel().tolist()))
+
+
 def get_interval_number(line):
     interval_number = None
     match = re.search(r"intervalnr\s(.*)", line.strip().lower())
@@ -310,15 +360,44 @@ def read_ascii_time_trace(fname: str) -> xr.Dataset:
 
 
 def write_ascii_time_trace(filename: str,
-                           dataset: xr.DataArray,
+                           dataset: typing.Union[xr.DataArray, xr.Dataset],
                            overwrite=False,
                            comment="",
                            file_format="TimeExplicit",
-                           number_format="%.10e"):
+                           number_format="%.10e",
+                           variable: str = 'data',
+                           chunk_size: int = DEFAULT_CHUNK_SIZE):
+    """Writes a dataset to an ascii file in wavelength- or time-explicit format.
+
+    Parameters
+    ----------
+    filename :
+        Name of the ascii file.
+    dataset :
+        The data to write. If a :xarraydoc:`Dataset` is given, the data variable with the label
+        `variable` will be written, e.g. `fitted_data` or `residual` of a result dataset.
+    overwrite :
+        If `True`, an existing file will be overwritten.
+    comment :
+        A comment for the file.
+    file_format :
+        Either `TimeExplicit` or `WavelengthExplicit`.
+    number_format :
+        The format for a single number.
+    variable :
+        The variable to write if `dataset` is a :xarraydoc:`Dataset`.
+    chunk_size :
+        The number of rows written at once.
+    """
+    if isinstance(dataset, xr.Dataset):
+        if variable not in dataset:
+            raise Exception(f"Missing variable '{variable}' in dataset")
+        dataset = dataset[variable]
     data_file = \
         TimeExplicitFile(filepath=filename, dataset=dataset) if file_format == "TimeExplicit" \
         else WavelengthExplicitFile(filepath=filename, dataset=dataset)
     data_file.write(overwrite=overwrite,
                     comment=comment,
                     file_format=file_format,
-                    number_format=number_format)
+                    number_format=number_format,
+                    chunk_size=chunk_size)
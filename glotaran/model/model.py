@@ -5,8 +5,11 @@ import typing
 import numpy as np
 import xarray as xr
 
+from glotaran.analysis.batch import optimize_batch
+from glotaran.analysis.multiresolution import ResolutionLevel, optimize_multiresolution
+from glotaran.analysis.multistart import optimize_multistart
 from glotaran.analysis.result import Result
-from glotaran.analysis.simulation import simulate
+from glotaran.analysis.simulation import simulate, simulate_batch
 from glotaran.analysis.optimize import optimize
 from glotaran.parameter import ParameterGroup
 
@@ -38,9 +41,10 @@ class Model:
                 set = getattr(model, f'set_{name}')
 
                 # we retrieve the actual class from the signature
+                attribute_cls = set.__func__.__annotations__['item']
+                is_typed = hasattr(attribute_cls, "_glotaran_model_attribute_typed")
                 for label, item in attribute.items():
-                    item_cls = set.__func__.__annotations__['item']
-                    is_typed = hasattr(item_cls, "_glotaran_model_attribute_typed")
+                    item_cls = attribute_cls
                     if isinstance(item, dict):
                         if is_typed:
                             if 'type' not in item:
@@ -76,9 +80,10 @@ class Model:
                 add = getattr(model, f'add_{name}')
 
                 # we retrieve the actual class from the signature
+                attribute_cls = add.__func__.__annotations__['item']
+                is_typed = hasattr(attribute_cls, "_glotaran_model_attribute_typed")
                 for item in attribute:
-                    item_cls = add.__func__.__annotations__['item']
-                    is_typed = hasattr(item_cls, "_glotaran_model_attribute_typed")
+                    item_cls = attribute_cls
                     if isinstance(item, dict):
                         if is_typed:
                             if 'type' not in item:
@@ -113,6 +118,31 @@ class Model:
         """The type of the model as human readable string."""
         return self._model_type
 
+    def index_dependent(self) -> bool:
+        """Returns `True` if the constrained matrix of the model can depend on the index on the
+        global axis.
+
+        The result is derived from the model definition, models without an index dependent
+        function are always considered index dependent.
+        """
+        if self._index_dependent_function is None:
+            return True
+        return self._index_dependent_function()
+
+    def prepare(self, global_axis: np.ndarray):
+        """Prepares the model for calculating the matrices at the indices of a global axis.
+
+        Called once before the matrices of every residual evaluation and simulation are
+        calculated, so changes of the model definition take effect at the next call.
+
+        Parameters
+        ----------
+        global_axis :
+            The indices on the global axis.
+        """
+        if self._prepare_function is not None:
+            self._prepare_function(global_axis)
+
     def simulate(self,
                  dataset: str,
                  parameter: ParameterGroup,
@@ -144,6 +174,51 @@ class Model:
         return simulate(self, parameter, dataset, axes=axes, clp=clp, noise=noise,
                         noise_std_dev=noise_std_dev, noise_seed=noise_seed)
 
+    def simulate_batch(self,
+                       dataset: str,
+                       parameters: typing.Sequence[ParameterGroup],
+                       axes: typing.Dict[str, np.ndarray],
+                       clp: typing.Union[np.ndarray, xr.DataArray] = None,
+                       noise: bool = False,
+                       noise_std_dev: float = 1.0,
+                       seed: int = None,
+                       index_dependent: bool = None,
+                       path: str = None,
+                       chunk_size: int = 100,
+                       ) -> xr.Dataset:
+        """Simulates the model for a stack of parameter sets.
+
+        See :func:`glotaran.analysis.simulation.simulate_batch`.
+
+        Parameters
+        ----------
+        dataset :
+            Label of the dataset to simulate.
+        parameters :
+            The parameter sets, one sample is simulated for every parameter set.
+        axes :
+            A dictory with axes for simulation.
+        clp :
+            Conditionaly linear parameter. Will be used instead of `model.global_matrix` if given.
+        noise :
+            If `True` noise is added to the simulated data.
+        noise_std_dev :
+            The standart deviation of the noise.
+        seed :
+            Seed for the noise, every sample draws from its own stream.
+        index_dependent :
+            If `False` the model matrix is calculated once per sample. If `None` it is taken from
+            :meth:`index_dependent`.
+        path :
+            If given, the samples are written in chunks to a Zarr store at this path.
+        chunk_size :
+            The number of samples simulated and written together.
+        """
+        return simulate_batch(self, parameters, dataset, axes, clp=clp, noise=noise,
+                              noise_std_dev=noise_std_dev, seed=seed,
+                              index_dependent=index_dependent, path=path,
+                              chunk_size=chunk_size)
+
     def optimize(self,
                  parameter: ParameterGroup,
                  data: typing.Dict[str, typing.Union[xr.Dataset, xr.DataArray]],
@@ -151,6 +226,13 @@ class Model:
                  verbose: bool = True,
                  max_nfev: int = None,
                  group_atol: int = 0,
+                 instrument: bool = False,
+                 iteration_callback: typing.Callable[[typing.Dict[str, typing.Any]], None] = None,
+                 iteration_interval: float = 0,
+                 svd_components: int = None,
+                 dtype: typing.Union[str, np.dtype] = np.float64,
+                 solver_dtype: typing.Union[str, np.dtype] = None,
+                 sparse_jacobian: bool = False,
                  ) -> Result:
         """Optimizes the parameter for this model.
 
@@ -168,15 +250,193 @@ class Model:
             Maximum number of function evaluations. `None` for unlimited.
         group_atol :
             The tolerance for grouping datasets along the global dimension.
+        instrument :
+            If `True` wall times and call counts of the analysis stages are recorded, see
+            :attr:`glotaran.analysis.Result.timings`.
+        iteration_callback :
+            A function called during the optimization with a progress record containing the
+            `iteration`, `nfev`, `cost`, `chisqr`, the varying `parameter` values and the
+            `elapsed` time, and with `instrument` the stage `timings`, e.g. a
+            :class:`glotaran.analysis.progress.JsonLinesSink`.
+        iteration_interval :
+            The minimum time in seconds between two calls of `iteration_callback`.
+        svd_components :
+            If not `None`, the data is projected onto this number of its right singular vectors
+            and the optimization runs in the reduced space. The clp and the residual are
+            calculated with full resolution after the optimization. The covariance and the
+            standard errors of the parameters are not available.
+            Only valid without `nnls` and for models with a matrix independent of the global
+            index, i.e. without dispersion or index dependent constraints.
+        dtype :
+            The floating point type of the data, the model matrices and the stored results,
+            e.g. `np.float32` for large datasets.
+        solver_dtype :
+            The floating point type the linear problems are solved in. If `None` the `dtype` is
+            used.
+        sparse_jacobian :
+            If `True`, the sparsity structure of the jacobian is derived from the parameters
+            referenced by the datasets, so that parameters of datasets in different groups are
+            estimated with fewer function evaluations.
         """
-        result = Result(self, data, parameter, nnls, atol=group_atol)
-        optimize(result, verbose=verbose, max_nfev=max_nfev)
+        result = Result(self, data, parameter, nnls, atol=group_atol, instrument=instrument,
+                        dtype=dtype, solver_dtype=solver_dtype)
+        optimize(result, verbose=verbose, max_nfev=max_nfev,
+                 iteration_callback=iteration_callback, iteration_interval=iteration_interval,
+                 svd_components=svd_components, sparse_jacobian=sparse_jacobian)
         return result
 
+    def optimize_multiresolution(self,
+                                 parameter: ParameterGroup,
+                                 data: typing.Dict[str, typing.Union[xr.Dataset, xr.DataArray]],
+                                 schedule: typing.List[ResolutionLevel] = None,
+                                 nnls: bool = False,
+                                 verbose: bool = True,
+                                 max_nfev: int = None,
+                                 group_atol: float = 0,
+                                 time_zero: float = None,
+                                 ) -> Result:
+        """Optimizes the parameter for this model coarse-to-fine on binned data.
+
+        Every level of the schedule is optimized on binned data starting from the optimized
+        parameter of the previous level, the last optimization runs on the full resolution data.
+
+        Parameters
+        ----------
+        parameter : glotaran.model.ParameterGroup
+            The initial parameter.
+        data :
+            A dictonary containing all datasets with their labels as keys.
+        schedule :
+            A list of :class:`glotaran.analysis.multiresolution.ResolutionLevel` from coarsest
+            to finest. If `None` the default schedule is used.
+        nnls :
+            If `True` non-linear least squaes optimizing is used instead of variable projection.
+        verbose :
+            If `True` feedback is printed at every iteration.
+        max_nfev :
+            Maximum number of function evaluations at full resolution. `None` for unlimited.
+        group_atol :
+            The tolerance for grouping datasets along the global dimension.
+        time_zero :
+            The point on the model axis where the logarithmic binning starts. If `None` it is
+            derived from a gaussian IRF or the start of the axis is used.
+        """
+        return optimize_multiresolution(self, parameter, data, schedule=schedule, nnls=nnls,
+                                        verbose=verbose, max_nfev=max_nfev,
+                                        group_atol=group_atol, time_zero=time_zero)
+
+    def optimize_batch(self,
+                       parameter: ParameterGroup,
+                       datasets: typing.Iterable[typing.Dict[str, typing.Union[xr.Dataset,
+                                                                               xr.DataArray]]],
+                       workers: int = None,
+                       nnls: bool = False,
+                       max_nfev: int = None,
+                       group_atol: float = 0,
+                       max_pending: int = None,
+                       ) -> typing.Iterator[typing.Union[Result, Exception]]:
+        """Optimizes the parameter for this model independently for many data dictionaries in
+        a pool of worker processes.
+
+        See :func:`glotaran.analysis.batch.optimize_batch`.
+
+        Parameters
+        ----------
+        parameter : glotaran.model.ParameterGroup
+            The initial parameter for every optimization.
+        datasets :
+            An iterable of dictonaries, each containing the datasets for one optimization with
+            their labels as keys.
+        workers :
+            The number of worker processes. If `None` the number of processors is used. With `1`
+            the optimizations run in the calling process.
+        nnls :
+            If `True` non-linear least squaes optimizing is used instead of variable projection.
+        max_nfev :
+            Maximum number of function evaluations. `None` for unlimited.
+        group_atol :
+            The tolerance for grouping datasets along the global dimension.
+        max_pending :
+            The maximum number of datasets in flight. If `None` two per worker process.
+
+        Yields
+        ------
+        result :
+            The results in the order of `datasets` as they complete. If an optimization fails,
+            its entry is the raised exception instead of a :class:`glotaran.analysis.Result`.
+        """
+        return optimize_batch(self, parameter, datasets, workers=workers, nnls=nnls,
+                              max_nfev=max_nfev, group_atol=group_atol, max_pending=max_pending)
+
+    def optimize_multistart(self,
+                            parameter: ParameterGroup,
+                            data: typing.Dict[str, typing.Union[xr.Dataset, xr.DataArray]],
+                            starts: int = 16,
+                            sampling: str = 'latin_hypercube',
+                            bounds: typing.Dict[str, typing.Tuple[float, float]] = None,
+                            include_initial: bool = True,
+                            prune_nfev: typing.Optional[int] = 10,
+                            prune_factor: float = 10,
+                            workers: int = None,
+                            seed: int = None,
+                            nnls: bool = False,
+                            max_nfev: int = None,
+                            group_atol: float = 0,
+                            ) -> typing.List[Result]:
+        """Optimizes the parameter for this model from many starting points sampled within the
+        bounds of the parameters in a pool of worker processes.
+
+        See :func:`glotaran.analysis.multistart.optimize_multistart`.
+
+        Parameters
+        ----------
+        parameter : glotaran.model.ParameterGroup
+            The initial parameter, the varying parameters need finite `min` and `max`.
+        data :
+            A dictonary containing all datasets with their labels as keys.
+        starts :
+            The number of sampled starting points.
+        sampling :
+            The sampling of the starting points, either `latin_hypercube` or `sobol`.
+        bounds :
+            A dictionary with sampling bounds for parameters, overriding their `min` and `max`.
+        include_initial :
+            If `True`, the values of `parameter` are used as an additional start.
+        prune_nfev :
+            The number of function evaluations after which starts far above the best
+            chi-square are pruned. If `None`, all starts are optimized to convergence.
+        prune_factor :
+            The factor of the best chi-square above which starts are pruned.
+        workers :
+            The number of worker processes. If `None` the number of processors is used. With `1`
+            the optimizations run in the calling process.
+        seed :
+            The seed for sampling the starting points.
+        nnls :
+            If `True` non-linear least squaes optimizing is used instead of variable projection.
+        max_nfev :
+            Maximum number of function evaluations. `None` for unlimited.
+        group_atol :
+            The tolerance for grouping datasets along the global dimension.
+
+        Returns
+        -------
+        results :
+            The results ranked by their chi-square.
+        """
+        return optimize_multistart(self, parameter, data, starts=starts, sampling=sampling,
+                                   bounds=bounds, include_initial=include_initial,
+                                   prune_nfev=prune_nfev, prune_factor=prune_factor,
+                                   workers=workers, seed=seed, nnls=nnls, max_nfev=max_nfev,
+                                   group_atol=group_atol)
+
     def result_from_parameter(self,
                               parameter: ParameterGroup,
                               data: typing.Dict[str, typing.Union[xr.DataArray, xr.Dataset]],
-                              nnls: bool = False, group_atol: float = 0.0
+                              nnls: bool = False, group_atol: float = 0.0,
+                              instrument: bool = False,
+                              dtype: typing.Union[str, np.dtype] = np.float64,
+                              solver_dtype: typing.Union[str, np.dtype] = None,
                               ) -> Result:
         """Loads a result from parameters without optimization.
 
@@ -190,9 +450,18 @@ class Model:
             If `True` non-linear least squaes optimizing is used instead of variable projection.
         group_atol :
             The tolerance for grouping datasets along the global axes.
-
+        instrument :
+            If `True` wall times and call counts of the analysis stages are recorded, see
+            :attr:`glotaran.analysis.Result.timings`.
+        dtype :
+            The floating point type of the data, the model matrices and the stored results.
+        solver_dtype :
+            The floating point type the linear problems are solved in. If `None` the `dtype` is
+            used.
         """
-        return Result.from_parameter(self, data, parameter, nnls, group_atol)
+        return Result.from_parameter(self, data, parameter, nnls, group_atol,
+                                     instrument=instrument, dtype=dtype,
+                                     solver_dtype=solver_dtype)
 
     def problem_list(self, parameter: ParameterGroup = None) -> typing.List[str]:
         """
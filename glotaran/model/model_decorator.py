@@ -36,6 +36,13 @@ PenaltyFunction = typing.Callable[
     np.ndarray]
 """A `PenaltyFunction` calculates additional penalties for the optimization."""
 
+IndexDependentFunction = typing.Callable[[typing.Type[Model]], bool]
+"""An `IndexDependentFunction` determines if the matrix of a model depends on the index on the
+global axis."""
+
+PrepareFunction = typing.Callable[[typing.Type[Model], np.ndarray], None]
+"""A `PrepareFunction` prepares a model for calculating the matrices on a global axis."""
+
 
 def model(model_type: str,
           attributes: typing.Dict[str, typing.Any] = {},
@@ -48,6 +55,8 @@ def model(model_type: str,
           constrain_matrix_function: ConstrainMatrixFunction = None,
           additional_penalty_function: PenaltyFunction = None,
           finalize_result_function: FinalizeFunction = None,
+          index_dependent_function: IndexDependentFunction = None,
+          prepare_function: PrepareFunction = None,
           allow_grouping: bool = True,
           ) -> typing.Callable:
     """The `@model` decorator is intended to be used on subclasses of :class:`glotaran.model.Model`.
@@ -82,6 +91,13 @@ def model(model_type: str,
         A function to calculate additional penalties when optimizing the model.
     finalize_result_function :
         A function to finalize a result after optimization.
+    index_dependent_function :
+        A function which determines from the model definition if the constrained matrix depends
+        on the index on the global axis. Without it the matrix of the model is assumed to depend
+        on the index.
+    prepare_function :
+        A function called with the global axis before the matrices of a residual evaluation or
+        a simulation are calculated, e.g. to evaluate the model definition on the whole axis.
     allow_grouping :
         If `True`, datasets can can be grouped along the global dimension.
     """
@@ -94,6 +110,8 @@ def model(model_type: str,
                 constrain_matrix_function)
         setattr(cls, '_additional_penalty_function',
                 additional_penalty_function)
+        setattr(cls, '_index_dependent_function', index_dependent_function)
+        setattr(cls, '_prepare_function', prepare_function)
         setattr(cls, '_allow_grouping', allow_grouping)
 
         if matrix:
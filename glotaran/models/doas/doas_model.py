@@ -4,7 +4,9 @@ from glotaran.model import model
 from glotaran.models.spectral_temporal import KineticModel, SpectralTemporalDatasetDescriptor
 from glotaran.models.spectral_temporal.kinetic_model import (
     apply_kinetic_model_constraints,
-    spectral_constraint_penalty
+    kinetic_model_index_dependent,
+    prepare_spectral_constraint_plans,
+    spectral_constraint_penalty,
 )
 
 from .doas_result import finalize_doas_result
@@ -28,6 +30,8 @@ from .oscillation import Oscillation
     finalize_result_function=finalize_doas_result,
     constrain_matrix_function=apply_kinetic_model_constraints,
     additional_penalty_function=spectral_constraint_penalty,
+    index_dependent_function=kinetic_model_index_dependent,
+    prepare_function=prepare_spectral_constraint_plans,
 )
 class DOASModel(KineticModel):
     """Extends the kinetic model with damped oscillations."""
@@ -9,10 +9,11 @@ def finalize_doas_result(model, result: Result):
 
     finalize_kinetic_result(model, result)
 
+    parameter = result.optimized_parameter
     for label in result.model.dataset:
         dataset = result.data[label]
 
-        dataset_descriptor = result.model.dataset[label].fill(model, result.optimized_parameter)
+        dataset_descriptor = result.model.dataset[label].fill(model, parameter)
 
         # get_doas
 
@@ -3,6 +3,7 @@
 import numpy as np
 
 from glotaran.models.spectral_temporal.spectral_matrix import calculate_spectral_matrix
+from glotaran.models.spectral_temporal.spectral_shape import calculate_shape_matrix
 
 from .doas_matrix import _collect_oscillations
 
@@ -10,24 +11,24 @@ from .doas_matrix import _collect_oscillations
 def calculate_doas_spectral_matrix(dataset, axis):
 
     oscillations = _collect_oscillations(dataset)
-    all_oscillations = []
+    clp = []
+    shapes = []
     for osc in oscillations:
-        all_oscillations.append(osc)
-        all_oscillations.append(osc)
-    matrix = np.ones((axis.size, len(all_oscillations)), dtype=np.float64)
-    for i, osc in enumerate(all_oscillations):
+        # the same labels as the columns of the doas matrix
+        clp.append(f'{osc.label}_sin')
+        clp.append(f'{osc.label}_cos')
         if osc.label not in dataset.shape:
             raise Exception(f'No shape for oscillation "{osc.label}"')
-        shapes = dataset.shape[osc.label]
-        if not isinstance(shapes, list):
-            shapes = [shapes]
-        for shape in shapes:
-            matrix[:, i] *= shape.calculate(axis)
+        osc_shapes = dataset.shape[osc.label]
+        shapes.append(osc_shapes if isinstance(osc_shapes, list) else [osc_shapes])
+
+    # the sin and cos columns of an oscillation share the product of its shapes
+    matrix = np.repeat(calculate_shape_matrix(shapes, axis, reduce=np.multiply), 2, axis=1)
 
     spectral_clp, spectral_matrix = calculate_spectral_matrix(dataset, axis)
 
     if spectral_matrix is not None:
         matrix = np.concatenate((matrix, spectral_matrix), axis=1)
-        all_oscillations += spectral_clp
+        clp += spectral_clp
 
-    return all_oscillations, matrix
+    return clp, matrix
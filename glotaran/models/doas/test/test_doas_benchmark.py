@@ -1,10 +1,14 @@
 import numpy as np
+import pytest
 
 from glotaran import ParameterGroup
 from glotaran.models.doas import DOASModel
 from glotaran.models.doas.doas_matrix import calculate_doas_matrix
 
+from .test_doas_model import OneOscillation
 
+
+@pytest.mark.benchmark(group='doas_matrix')
 def test_doas_matrix_benchmark(benchmark):
     model = DOASModel.from_dict({
         'initial_concentration': {
@@ -48,3 +52,12 @@ def test_doas_matrix_benchmark(benchmark):
     dataset = model.dataset['dataset1'].fill(model, parameter)
 
     benchmark(calculate_doas_matrix, dataset, 0, time)
+
+
+@pytest.mark.benchmark(group='doas_matrix')
+def test_doas_matrix_no_irf_benchmark(benchmark):
+    suite = OneOscillation
+    time = np.arange(0, 6, 0.001)
+    dataset = suite.model.dataset['dataset1'].fill(suite.model, suite.parameter)
+
+    benchmark(calculate_doas_matrix, dataset, 0, time)
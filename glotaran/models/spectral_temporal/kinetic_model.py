@@ -7,12 +7,11 @@ from glotaran.model import model, Model
 from glotaran.parameter import ParameterGroup
 
 from .initial_concentration import InitialConcentration
-from .irf import Irf
+from .irf import Irf, IrfGaussian, IrfMeasured
 from .k_matrix import KMatrix
 from .kinetic_result import finalize_kinetic_result
 from .kinetic_megacomplex import KineticMegacomplex
-from .spectral_constraints import (
-    SpectralConstraint, OnlyConstraint, ZeroConstraint, EqualAreaConstraint)
+from .spectral_constraints import SpectralConstraint, EqualAreaConstraint
 from .spectral_relations import SpectralRelation
 from .spectral_shape import SpectralShape
 from .spectral_temporal_dataset_descriptor import SpectralTemporalDatasetDescriptor
@@ -20,17 +19,115 @@ from .kinetic_matrix import calculate_kinetic_matrix
 from .spectral_matrix import calculate_spectral_matrix
 
 
-def apply_spectral_constraints(
+class SpectralConstraintPlan(typing.NamedTuple):
+    """The spectral relations and constraints which apply at an index on the global axis."""
+    relations: typing.List[SpectralRelation]
+    """The spectral relations applied at the index, in model order."""
+    removed_compartments: typing.Set[str]
+    """The compartments removed by only and zero constraints at the index."""
+    equal_area_constraints: typing.List[EqualAreaConstraint]
+    """The equal area constraints which add a penalty at the index."""
+
+
+class _SpectralConstraintPlanCache(typing.NamedTuple):
+    """The compiled plans of a model and the definitions and the axis they were compiled for."""
+    definitions: typing.Tuple
+    axis: typing.Optional[np.ndarray]
+    plans: typing.Dict[float, SpectralConstraintPlan]
+
+
+def prepare_spectral_constraint_plans(model: typing.Type['KineticModel'], axis: np.ndarray):
+    """Compiles the :class:`SpectralConstraintPlan` for every index of a global axis.
+
+    The plans only depend on the definitions of the relations and constraints and are cached on
+    the model. The definitions are compared with those of the cached plans on every call, so
+    adding, replacing or editing a relation or constraint invalidates them. Plans are only
+    compiled for indices which are not cached yet.
+
+    Parameters
+    ----------
+    model :
+        The kinetic model.
+    axis :
+        The global axis.
+    """
+    definitions = _spectral_constraint_definitions(model)
+    cache = model.__dict__.get('_spectral_constraint_plans')
+    if cache is None or cache.definitions != definitions:
+        cache = _SpectralConstraintPlanCache(definitions, None, {})
+    elif cache.axis is axis:
+        return
+    missing = [index for index in axis if index not in cache.plans]
+    if missing:
+        cache.plans.update(compile_spectral_constraint_plans(model, np.asarray(missing)))
+    model.__dict__['_spectral_constraint_plans'] = cache._replace(axis=axis)
+
+
+def retrieve_spectral_constraint_plan(
         model: typing.Type['KineticModel'],
-        clp_labels: typing.List[str],
-        matrix: np.ndarray,
-        index: float) -> typing.Tuple[typing.List[str], np.ndarray]:
-    for constraint in model.spectral_constraints:
-        if isinstance(constraint, (OnlyConstraint, ZeroConstraint)) and constraint.applies(index):
-            idx = [not label == constraint.compartment for label in clp_labels]
-            clp_labels = [label for label in clp_labels if not label == constraint.compartment]
-            matrix = matrix[:, idx]
-    return (clp_labels, matrix)
+        index: float) -> SpectralConstraintPlan:
+    """Returns the :class:`SpectralConstraintPlan` for an index on the global axis.
+
+    The plans are compiled by :func:`prepare_spectral_constraint_plans`, an index which was not
+    prepared is compiled on its own.
+
+    Parameters
+    ----------
+    model :
+        The kinetic model.
+    index :
+        The index on the global axis.
+    """
+    cache = model.__dict__.get('_spectral_constraint_plans')
+    if cache is None or index not in cache.plans:
+        prepare_spectral_constraint_plans(model, [index])
+        cache = model.__dict__['_spectral_constraint_plans']
+    return cache.plans[index]
+
+
+def _spectral_constraint_definitions(model: typing.Type['KineticModel']) -> typing.Tuple:
+    """Returns the parts of the relations and constraints the plans depend on."""
+    return tuple(
+        (id(item), type(item).__name__, item.compartment, getattr(item, 'target', None),
+         repr(item.interval))
+        for item in [*model.spectral_relations, *model.spectral_constraints])
+
+
+def compile_spectral_constraint_plans(
+        model: typing.Type['KineticModel'],
+        axis: np.ndarray) -> typing.Dict[float, SpectralConstraintPlan]:
+    """Evaluates the spectral relations and constraints of the model on a global axis.
+
+    Each relation and constraint is evaluated once on the whole axis and the resulting masks are
+    collected into a :class:`SpectralConstraintPlan` for every index.
+
+    Parameters
+    ----------
+    model :
+        The kinetic model.
+    axis :
+        The global axis.
+    """
+    relation_masks = [relation.applies(axis) for relation in model.spectral_relations]
+    constraint_masks = [constraint.applies(axis) for constraint in model.spectral_constraints]
+
+    plans = {}
+    for i, index in enumerate(axis):
+        plans[index] = SpectralConstraintPlan(
+            relations=[relation for relation, mask in
+                       zip(model.spectral_relations, relation_masks) if mask[i]],
+            removed_compartments={
+                constraint.compartment for constraint, mask in
+                zip(model.spectral_constraints, constraint_masks) if mask[i] and
+                not isinstance(constraint, EqualAreaConstraint)
+            },
+            equal_area_constraints=[
+                constraint for constraint, mask in
+                zip(model.spectral_constraints, constraint_masks) if mask[i] and
+                isinstance(constraint, EqualAreaConstraint)
+            ],
+        )
+    return plans
 
 
 def spectral_constraint_penalty(
@@ -41,45 +138,73 @@ def spectral_constraint_penalty(
         matrix: np.ndarray,
         index: float) -> np.ndarray:
     residual = []
-    for constraint in model.spectral_constraints:
-        if isinstance(constraint, EqualAreaConstraint) and constraint.applies(index):
-            constraint = constraint.fill(model, parameter)
-            source_idx = clp_labels.index(constraint.compartment)
-            target_idx = clp_labels.index(constraint.target)
-            residual.append(
-                (clp[source_idx] - constraint.parameter * clp[target_idx]) * constraint.weight
-            )
+    for constraint in retrieve_spectral_constraint_plan(model, index).equal_area_constraints:
+        value = parameter.get(constraint.parameter.full_label).value
+        source_idx = clp_labels.index(constraint.compartment)
+        target_idx = clp_labels.index(constraint.target)
+        residual.append(
+            (clp[source_idx] - value * clp[target_idx]) * constraint.weight
+        )
     return residual
 
 
-def apply_spectral_relations(
+def apply_kinetic_model_constraints(
         model: typing.Type['KineticModel'],
         parameter: ParameterGroup,
         clp_labels: typing.List[str],
         matrix: np.ndarray,
-        index: float) -> typing.Tuple[typing.List[str], np.ndarray]:
-    for relation in model.spectral_relations:
-        if relation.applies(index):
-            relation = relation.fill(model, parameter)
+        index: float):
+    plan = retrieve_spectral_constraint_plan(model, index)
+    if not plan.relations and not plan.removed_compartments:
+        return clp_labels, matrix
+
+    keep = np.asarray([label not in plan.removed_compartments for label in clp_labels],
+                      dtype=bool)
+
+    if plan.relations:
+        # every relation adds the source column scaled by the relation parameter to the target
+        # column and removes the source, which is a single right multiplication
+        relation_matrix = np.identity(len(clp_labels))
+        related = np.ones(len(clp_labels), dtype=bool)
+        for relation in plan.relations:
             source_idx = clp_labels.index(relation.compartment)
             target_idx = clp_labels.index(relation.target)
-            matrix[:, target_idx] += relation.parameter * matrix[:, source_idx]
+            if not related[source_idx] or not related[target_idx]:
+                raise ValueError(f"Compartment of spectral relation {relation.compartment} -> "
+                                 f"{relation.target} has already been related.")
+            value = parameter.get(relation.parameter.full_label).value
+            relation_matrix[:, target_idx] += value * relation_matrix[:, source_idx]
+            related[source_idx] = False
+        keep &= related
+        matrix = matrix @ relation_matrix[:, keep]
+    else:
+        matrix = matrix[:, keep]
 
-            idx = [not label == relation.compartment for label in clp_labels]
-            clp_labels = [label for label in clp_labels if not label == relation.compartment]
-            matrix = matrix[:, idx]
+    clp_labels = [label for label, k in zip(clp_labels, keep) if k]
     return (clp_labels, matrix)
 
 
-def apply_kinetic_model_constraints(
-        model: typing.Type['KineticModel'],
-        parameter: ParameterGroup,
-        clp_labels: typing.List[str],
-        matrix: np.ndarray,
-        index: float):
-    clp_labels, matrix = apply_spectral_relations(model, parameter, clp_labels, matrix, index)
-    clp_labels, matrix = apply_spectral_constraints(model, clp_labels, matrix, index)
-    return clp_labels, matrix
+def kinetic_model_index_dependent(model: typing.Type['KineticModel']) -> bool:
+    """Returns `True` if the constrained matrix of a kinetic model can depend on the index on the
+    global axis.
+
+    This is the case for a dispersion of a gaussian IRF, a measured IRF with a spectral axis and
+    for any spectral relation or constraint, since their intervals are evaluated on the global
+    axis.
+
+    Parameters
+    ----------
+    model :
+        The kinetic model.
+    """
+    if model.spectral_relations or model.spectral_constraints:
+        return True
+    for irf in model.irf.values():
+        if isinstance(irf, IrfGaussian) and (irf.center_dispersion or irf.width_dispersion):
+            return True
+        if isinstance(irf, IrfMeasured) and irf.irfdata is not None and np.ndim(irf.irfdata) == 2:
+            return True
+    return False
 
 
 @model(
@@ -100,7 +225,9 @@ def apply_kinetic_model_constraints(
     global_dimension='spectral',
     finalize_result_function=finalize_kinetic_result,
     constrain_matrix_function=apply_kinetic_model_constraints,
-    additional_penalty_function=spectral_constraint_penalty
+    additional_penalty_function=spectral_constraint_penalty,
+    index_dependent_function=kinetic_model_index_dependent,
+    prepare_function=prepare_spectral_constraint_plans,
 )
 class KineticModel(Model):
     """
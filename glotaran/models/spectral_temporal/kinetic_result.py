@@ -1,3 +1,5 @@
+import typing
+
 import numpy as np
 import xarray as xr
 
@@ -5,16 +7,18 @@ import glotaran
 from glotaran.analysis.result import Result
 
 from .irf import IrfGaussian
-from .spectral_constraints import OnlyConstraint, ZeroConstraint
+from .spectral_constraints import OnlyConstraint, ZeroConstraint, EqualAreaConstraint
 
 
 def finalize_kinetic_result(
         model: 'glotaran.models.spectral_temporal.KineticModel', result: Result):
 
+    parameter = result.optimized_parameter
+    global_clp_lookup = None
     for label in result.model.dataset:
         dataset = result.data[label]
 
-        dataset_descriptor = result.model.dataset[label].fill(model, result.optimized_parameter)
+        dataset_descriptor = result.model.dataset[label].fill(model, parameter)
 
         if not dataset_descriptor.get_k_matrices():
             continue
@@ -32,33 +36,29 @@ def finalize_kinetic_result(
         if dataset_descriptor.baseline:
             dataset['baseline'] = dataset.clp.sel(clp_label=f"{dataset_descriptor.label}_baseline")
 
+        spectral_axis = dataset.coords[model.global_dimension].values
         for constraint in model.spectral_constraints:
-            if isinstance(constraint, (OnlyConstraint, ZeroConstraint)):
-                idx = [index for index in dataset.spectral if constraint.applies(index)]
-                if constraint.compartment in dataset.coords['species']:
-                    dataset.species_associated_spectra\
-                        .loc[{'species': constraint.compartment, 'spectral': idx}] \
-                        = np.zeros((len(idx)))
+            if isinstance(constraint, (OnlyConstraint, ZeroConstraint)) and \
+                    not isinstance(constraint, EqualAreaConstraint):
+                mask = constraint.applies(spectral_axis)
+                if constraint.compartment in compartments:
+                    dataset.species_associated_spectra[{
+                        'species': compartments.index(constraint.compartment),
+                        model.global_dimension: mask,
+                    }] = 0
                 if constraint.compartment == f"{dataset_descriptor.label}_baseline":
-                    dataset.baseline.loc[{'spectral': idx}] = np.zeros((len(idx)))
+                    dataset.baseline[{model.global_dimension: mask}] = 0
 
         for relation in model.spectral_relations:
-            if relation.compartment in dataset_descriptor.initial_concentration.compartments:
-                relation = relation.fill(model, result.optimized_parameter)
-                idx = [index.values for index in dataset.spectral if relation.applies(index)]
-                all_idx = np.asarray(list(result.global_clp.keys()))
-                clp = []
-                for i in idx:
-                    j = np.abs(all_idx - i).argmin()
-                    j = all_idx[j]
-                    clp.append(
-                        result.global_clp[j].sel(clp_label=relation.target).values *
-                        relation.parameter
-                    )
-                sas = xr.DataArray(clp, coords=[('spectral', idx)])
-
-                dataset.species_associated_spectra\
-                    .loc[{'species': relation.compartment, 'spectral': idx}] = sas
+            if relation.compartment in compartments:
+                if global_clp_lookup is None:
+                    global_clp_lookup = _GlobalClpLookup(result.global_clp)
+                mask = relation.applies(spectral_axis)
+                value = parameter.get(relation.parameter.full_label).value
+                dataset.species_associated_spectra[{
+                    'species': compartments.index(relation.compartment),
+                    model.global_dimension: mask,
+                }] = global_clp_lookup.get(relation.target, spectral_axis[mask]) * value
 
         dataset['species_concentration'] = (
             (model.global_dimension, model.matrix_dimension, 'species',),
@@ -80,7 +80,7 @@ def finalize_kinetic_result(
 
             a_matrix = k_matrix.a_matrix(dataset_descriptor.initial_concentration)
 
-            das = dataset.species_associated_spectra.sel(species=compartments)@ a_matrix.T
+            das = dataset.species_associated_spectra.sel(species=compartments).values @ a_matrix.T
 
             all_das_labels.append(megacomplex.label)
             all_das.append(
@@ -116,3 +116,31 @@ def finalize_kinetic_result(
                     (model.global_dimension, 'coherent_artifact_order'),
                     dataset.clp.sel(clp_label=irf.clp_labels()).values
                 )
+
+
+class _GlobalClpLookup:
+    """Looks up global conditionally linear parameters at the nearest index on the global axis."""
+
+    def __init__(self, global_clp: typing.Dict[typing.Any, xr.DataArray]):
+        indices = np.asarray(list(global_clp.keys()))
+        order = np.argsort(indices)
+        self._indices = indices[order]
+
+        self._labels = {}
+        for clp in global_clp.values():
+            for clp_label in clp.coords['clp_label'].values:
+                self._labels.setdefault(clp_label, len(self._labels))
+
+        self._clp = np.full((indices.size, len(self._labels)), np.nan)
+        for row, clp in enumerate(global_clp[index] for index in indices[order]):
+            columns = [self._labels[clp_label] for clp_label in clp.coords['clp_label'].values]
+            self._clp[row, columns] = clp.values
+
+    def get(self, clp_label: str, index: np.ndarray) -> np.ndarray:
+        """Returns the values of a clp at the global indices nearest to the given indices."""
+        right = np.clip(np.searchsorted(self._indices, index), 0, self._indices.size - 1)
+        left = np.clip(right - 1, 0, self._indices.size - 1)
+        nearest = np.where(
+            np.abs(self._indices[left] - index) <= np.abs(self._indices[right] - index),
+            left, right)
+        return self._clp[nearest, self._labels[clp_label]]
@@ -1,11 +1,30 @@
 """This package contains compartment constraint items."""
 
 import typing
+import numpy as np
 
 from glotaran.model import model_attribute, model_attribute_typed
 from glotaran.parameter import Parameter
 
 
+def in_intervals(intervals: typing.List[typing.Tuple[float, float]],
+                 index: typing.Union[float, np.ndarray]) -> typing.Union[bool, np.ndarray]:
+    """Returns `True` where the index lies in one of the intervals.
+
+    Parameters
+    ----------
+    intervals :
+        A list of closed intervals.
+    index :
+        A single index or an array of indices on the global axis.
+    """
+    index = np.asarray(index)
+    result = np.zeros(index.shape, dtype=bool)
+    for interval in intervals:
+        result |= (interval[0] <= index) & (index <= interval[1])
+    return result[()]
+
+
 @model_attribute(
     properties={
         'compartment': str,
@@ -21,17 +40,16 @@ class OnlyConstraint:
         Parameters
         ----------
         index : any
+            A single index or an array of indices.
 
         Returns
         -------
-        applies : bool
+        applies : bool or np.ndarray
 
         """
-        def applies(interval):
-            return interval[0] <= index <= interval[1]
         if isinstance(self.interval, tuple):
-            return applies(self.interval)
-        return not any([applies(i) for i in self.interval])
+            return in_intervals([self.interval], index)
+        return np.logical_not(in_intervals(self.interval, index))
 
 
 @model_attribute(
@@ -49,17 +67,15 @@ class ZeroConstraint:
         Parameters
         ----------
         index : any
+            A single index or an array of indices.
 
         Returns
         -------
-        applies : bool
+        applies : bool or np.ndarray
 
         """
-        def applies(interval):
-            return interval[0] <= index <= interval[1]
-        if isinstance(self.interval, tuple):
-            return applies(self.interval)
-        return any([applies(i) for i in self.interval])
+        interval = [self.interval] if isinstance(self.interval, tuple) else self.interval
+        return in_intervals(interval, index)
 
 
 @model_attribute(properties={
@@ -1,6 +1,6 @@
 """Glotaran Spectral Matrix"""
 
-import numpy as np
+from .spectral_shape import calculate_shape_matrix
 
 
 def calculate_spectral_matrix(dataset, axis):
@@ -23,11 +23,6 @@ def calculate_spectral_matrix(dataset, axis):
     shape_compartments = [s for s in dataset.shape]
     compartments = [c for c in dataset.initial_concentration.compartments
                     if c in shape_compartments]
-    matrix = np.zeros((axis.size, len(compartments)))
-    for i, comp in enumerate(compartments):
-        shapes = dataset.shape[comp]
-        if not isinstance(shapes, list):
-            shapes = [shapes]
-        for shape in shapes:
-            matrix[:, i] += shape.calculate(axis)
-    return compartments, matrix
+    shapes = [dataset.shape[comp] if isinstance(dataset.shape[comp], list)
+              else [dataset.shape[comp]] for comp in compartments]
+    return compartments, calculate_shape_matrix(shapes, axis)
@@ -5,6 +5,8 @@ import typing
 from glotaran.model import model_attribute
 from glotaran.parameter import Parameter
 
+from .spectral_constraints import in_intervals
+
 
 @model_attribute(
     properties={
@@ -21,10 +23,11 @@ class SpectralRelation:
         Parameters
         ----------
         index : any
+            A single index or an array of indices.
 
         Returns
         -------
-        applies : bool
+        applies : bool or np.ndarray
 
         """
-        return any(interval[0] <= index <= interval[1] for interval in self.interval)
+        return in_intervals(self.interval, index)
@@ -1,5 +1,8 @@
 """This package contains the spectral shape item."""
 
+import collections
+import typing
+
 import numpy as np
 from glotaran.model import model_attribute, model_attribute_typed
 from glotaran.parameter import Parameter
@@ -82,3 +85,86 @@ class SpectralShapeZero:
 })
 class SpectralShape:
     """Base class for spectral shapes"""
+
+
+_SHAPE_MATRIX_CACHE_SIZE = 128
+"""The number of shape matrices kept in the cache of :func:`calculate_shape_matrix`."""
+
+_shape_matrix_cache = collections.OrderedDict()
+
+
+def calculate_shape_matrix(shapes: typing.List[typing.List[typing.Any]],
+                           axis: np.ndarray,
+                           reduce: np.ufunc = np.add) -> np.ndarray:
+    """Calculates a matrix with a column for every list of shapes, reduced over the shapes of
+    the list.
+
+    All gaussian shapes are evaluated at once on a `(axis size, number of shapes)` grid. The
+    matrices are cached against the shape types, the shape parameter values and the axis, so
+    repeated calls with unchanged shapes return a copy of the cached matrix.
+
+    Parameters
+    ----------
+    shapes :
+        A list of filled shapes for every column.
+    axis :
+        The axis to calculate the shapes on.
+    reduce :
+        The function reducing the shapes of a column, e.g. `np.add` or `np.multiply`.
+    """
+    flat = [shape for column in shapes for shape in column]
+    lengths = [len(column) for column in shapes]
+    if not flat:
+        # columns without shapes are the identity of the reduction, e.g. zero for a sum
+        return np.full((axis.size, len(shapes)), reduce.identity, dtype=np.float64)
+    keys = [_shape_key(shape) for shape in flat]
+    key = None
+    if all(k is not None for k in keys):
+        key = (reduce.__name__, tuple(lengths), tuple(keys), axis.dtype.str, axis.tobytes())
+        if key in _shape_matrix_cache:
+            _shape_matrix_cache.move_to_end(key)
+            return _shape_matrix_cache[key].copy()
+
+    # the shapes are evaluated as rows, so that every shape is contiguous on the axis
+    gaussian = [i for i, k in enumerate(keys) if k is not None and k[0] == 'gaussian']
+    if gaussian:
+        amplitude, location, width = np.array([keys[i][1:] for i in gaussian]).T[:, :, None]
+        gaussians = amplitude * np.exp(-np.log(2) * np.square(2 * (axis - location) / width))
+    if len(gaussian) == len(flat):
+        values = gaussians
+    else:
+        values = np.empty((len(flat), axis.size), dtype=np.float64)
+        if gaussian:
+            values[gaussian] = gaussians
+        for i, shape in enumerate(flat):
+            if keys[i] is None or keys[i][0] != 'gaussian':
+                values[i] = shape.calculate(axis)
+
+    if all(length == 1 for length in lengths):
+        matrix = np.ascontiguousarray(values.T)
+    else:
+        # columns without shapes are the identity of the reduction, e.g. zero for a sum
+        matrix = np.full((axis.size, len(shapes)), reduce.identity, dtype=np.float64)
+        filled = [i for i, length in enumerate(lengths) if length]
+        if filled:
+            starts = np.cumsum([0] + [lengths[i] for i in filled[:-1]])
+            matrix[:, filled] = reduce.reduceat(values, starts, axis=0).T
+
+    if key is not None:
+        _shape_matrix_cache[key] = matrix
+        if len(_shape_matrix_cache) > _SHAPE_MATRIX_CACHE_SIZE:
+            _shape_matrix_cache.popitem(last=False)
+        matrix = matrix.copy()
+    return matrix
+
+
+def _shape_key(shape: typing.Any) -> typing.Optional[typing.Tuple]:
+    """Returns a hashable key of the type and the parameter values of a shape or `None` for
+    unknown shapes."""
+    if isinstance(shape, SpectralShapeGaussian):
+        return ('gaussian', float(shape.amplitude), float(shape.location), float(shape.width))
+    if isinstance(shape, SpectralShapeOne):
+        return ('one',)
+    if isinstance(shape, SpectralShapeZero):
+        return ('zero',)
+    return None
@@ -7,9 +7,10 @@ from glotaran.models.spectral_temporal import KineticModel
 from glotaran.models.spectral_temporal.kinetic_matrix import calculate_kinetic_matrix
 
 
-from .test_kinetic_model import ThreeComponentSequential
+from .test_kinetic_model import ThreeComponentSequential, IrfDispersion
 
 
+@pytest.mark.benchmark(group='kinetic_matrix')
 def test_kinetic_matrix_benchmark(benchmark):
     model = KineticModel.from_dict({
         'initial_concentration': {
@@ -54,6 +55,59 @@ def test_kinetic_matrix_benchmark(benchmark):
     benchmark(calculate_kinetic_matrix, dataset, 0, time)
 
 
+@pytest.mark.benchmark(group='kinetic_matrix')
+def test_kinetic_matrix_no_irf_benchmark(benchmark):
+    model = KineticModel.from_dict({
+        'initial_concentration': {
+            'j1': {
+                'compartments': ['s1', 's2', 's3'],
+                'parameters': ['j.1', 'j.0', 'j.0']
+            },
+        },
+        'megacomplex': {
+            'mc1': {'k_matrix': ['k1']},
+        },
+        'k_matrix': {
+            "k1": {'matrix': {
+                ("s2", "s1"): 'kinetic.1',
+                ("s3", "s2"): 'kinetic.2',
+                ("s3", "s3"): 'kinetic.3',
+            }}
+        },
+        'dataset': {
+            'dataset1': {
+                'initial_concentration': 'j1',
+                'megacomplex': ['mc1'],
+            },
+        },
+    })
+    parameter = ParameterGroup.from_dict({
+        'kinetic': [
+            ["1", 101e-4],
+            ["2", 302e-3],
+            ["3", 201e-2],
+        ],
+        'j': [['1', 1, {'vary': False}], ['0', 0, {'vary': False}]],
+    })
+    dataset = model.dataset['dataset1'].fill(model, parameter)
+    time = np.asarray(np.arange(0, 100, 0.02))
+
+    benchmark(calculate_kinetic_matrix, dataset, 0, time)
+
+
+@pytest.mark.benchmark(group='kinetic_matrix')
+def test_kinetic_matrix_dispersion_benchmark(benchmark):
+    suite = IrfDispersion
+    dataset = suite.model.dataset['dataset1'].fill(suite.model, suite.wanted)
+
+    def calculate_all_indices():
+        for index in suite.spectral:
+            calculate_kinetic_matrix(dataset, index, suite.time)
+
+    benchmark(calculate_all_indices)
+
+
+@pytest.mark.benchmark(group='kinetic_residual')
 @pytest.mark.parametrize("nnls", [True, False])
 def test_kinetic_residual_benchmark(benchmark, nnls):
 
@@ -80,3 +134,14 @@ def test_kinetic_residual_benchmark(benchmark, nnls):
     data = {'dataset1': dataset}
 
     benchmark(Result.from_parameter, model, data, initial, nnls=nnls, atol=0)
+
+
+@pytest.mark.benchmark(group='finalize')
+def test_kinetic_finalize_benchmark(benchmark):
+
+    suite = IrfDispersion
+    dataset = suite.sim_model.simulate('dataset1', suite.wanted, suite.axis,
+                                       noise=True, noise_std_dev=1e-2, noise_seed=42)
+    result = Result.from_parameter(suite.model, {'dataset1': dataset}, suite.wanted, False)
+
+    benchmark.pedantic(result.finalize, rounds=5, iterations=1)
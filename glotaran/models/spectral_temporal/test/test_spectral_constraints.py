@@ -0,0 +1,147 @@
+import numpy as np
+import xarray as xr
+
+from glotaran.parameter import ParameterGroup
+from glotaran.models.spectral_temporal import KineticModel
+from glotaran.models.spectral_temporal.spectral_relations import SpectralRelation
+from glotaran.models.spectral_temporal.kinetic_model import (
+    apply_kinetic_model_constraints, compile_spectral_constraint_plans,
+    spectral_constraint_penalty)
+
+
+def test_spectral_constraints():
+    model = KineticModel.from_dict({
+        'spectral_relations': [
+            {
+                'compartment': 's1',
+                'target': 's2',
+                'parameter': 'rel.1',
+                'interval': [(0, 2)],
+            },
+        ],
+        'spectral_constraints': [
+            {'type': 'zero', 'compartment': 's3', 'interval': [(1, 2), (4, 5)]},
+            {'type': 'only', 'compartment': 's4', 'interval': [(2, 3)]},
+            {'type': 'equal_area', 'compartment': 's2', 'target': 's5',
+             'parameter': 'rel.2', 'weight': 0.5, 'interval': [(3, 4)]},
+        ],
+    })
+    parameter = ParameterGroup.from_dict({'rel': [2, 3]})
+
+    axis = np.arange(6)
+    plans = compile_spectral_constraint_plans(model, axis)
+    assert [len(plans[i].relations) for i in axis] == [1, 1, 1, 0, 0, 0]
+    assert plans[0].removed_compartments == {'s4'}
+    assert plans[1].removed_compartments == {'s3', 's4'}
+    assert plans[2].removed_compartments == {'s3'}
+    assert plans[3].removed_compartments == set()
+    assert plans[4].removed_compartments == {'s3', 's4'}
+    assert [len(plans[i].equal_area_constraints) for i in axis] == [0, 0, 0, 1, 1, 0]
+
+    clp_labels = ['s1', 's2', 's3', 's4', 's5']
+    matrix = np.arange(20, dtype=np.float64).reshape((4, 5))
+
+    labels, constrained = \
+        apply_kinetic_model_constraints(model, parameter, clp_labels, matrix.copy(), 1)
+    assert labels == ['s2', 's5']
+    assert np.array_equal(constrained[:, 0], matrix[:, 1] + 2 * matrix[:, 0])
+    assert np.array_equal(constrained[:, 1], matrix[:, 4])
+
+    labels, constrained = \
+        apply_kinetic_model_constraints(model, parameter, clp_labels, matrix.copy(), 3)
+    assert labels == clp_labels
+    assert np.array_equal(constrained, matrix)
+
+    clp = np.asarray([1, 2, 3, 4, 5])
+    penalty = spectral_constraint_penalty(model, parameter, clp_labels, clp, matrix, 3)
+    assert np.allclose(penalty, [(2 - 3 * 5) * 0.5])
+    assert spectral_constraint_penalty(model, parameter, clp_labels, clp, matrix, 0) == []
+
+
+def test_spectral_constraint_plan_invalidation():
+    model = KineticModel.from_dict({
+        'spectral_constraints': [
+            {'type': 'zero', 'compartment': 's1', 'interval': [(0, 1)]},
+        ],
+    })
+    parameter = ParameterGroup.from_dict({'rel': [2]})
+    matrix = np.ones((4, 2))
+    axis = np.arange(4.0)
+
+    # the plans are compiled for the whole axis once per residual evaluation
+    model.prepare(axis)
+    assert set(model.__dict__['_spectral_constraint_plans'].plans) == set(axis)
+    labels, _ = apply_kinetic_model_constraints(model, parameter, ['s1', 's2'], matrix, 0)
+    assert labels == ['s2']
+
+    # editing a constraint after the plans were cached
+    model.spectral_constraints[0].interval = [(2, 3)]
+    model.prepare(axis)
+    labels, _ = apply_kinetic_model_constraints(model, parameter, ['s1', 's2'], matrix, 0)
+    assert labels == ['s1', 's2']
+
+    model.spectral_constraints[0].compartment = 's2'
+    model.prepare(axis)
+    labels, _ = apply_kinetic_model_constraints(model, parameter, ['s1', 's2'], matrix, 2)
+    assert labels == ['s1']
+
+    model.spectral_relations.append(SpectralRelation.from_dict(
+        {'compartment': 's1', 'target': 's2', 'parameter': 'rel.1', 'interval': [(0, 1)]}))
+    model.prepare(axis)
+    labels, constrained = \
+        apply_kinetic_model_constraints(model, parameter, ['s1', 's2'], matrix, 0)
+    assert labels == ['s2']
+    assert np.allclose(constrained, 3)
+
+    # indices which were not prepared are compiled on their own
+    labels, _ = apply_kinetic_model_constraints(model, parameter, ['s1', 's2'], matrix, 0.5)
+    assert labels == ['s2']
+
+
+def test_spectral_constraints_finalize():
+    model_dict = {
+        'initial_concentration': {
+            'j1': {'compartments': ['s1', 's2', 's3'], 'parameters': ['j.1', 'j.1', 'j.1']},
+        },
+        'megacomplex': {
+            'mc1': {'k_matrix': ['k1']},
+        },
+        'k_matrix': {
+            "k1": {'matrix': {
+                ("s1", "s1"): 'kinetic.1',
+                ("s2", "s2"): 'kinetic.2',
+                ("s3", "s3"): 'kinetic.3',
+            }}
+        },
+        'spectral_relations': [
+            {'compartment': 's1', 'target': 's2', 'parameter': 'rel.1',
+             'interval': [(0, 2)]},
+        ],
+        'spectral_constraints': [
+            {'type': 'zero', 'compartment': 's3', 'interval': [(4, 5)]},
+        ],
+        'dataset': {
+            'dataset1': {
+                'initial_concentration': 'j1',
+                'megacomplex': ['mc1'],
+            },
+        },
+    }
+    model = KineticModel.from_dict(model_dict)
+    parameter = ParameterGroup.from_dict({
+        'kinetic': [0.5, 0.3, 0.1],
+        'j': [['1', 1, {'vary': False, 'non-negative': False}]],
+        'rel': [2],
+    })
+
+    time = np.arange(0, 50, 1.5)
+    spectral = np.arange(6)
+    dataset = xr.DataArray(np.random.rand(time.size, spectral.size),
+                           coords=[('time', time), ('spectral', spectral)])
+
+    result = model.result_from_parameter(parameter, {'dataset1': dataset})
+    sas = result.data['dataset1'].species_associated_spectra
+
+    assert np.allclose(sas.sel(species='s1')[:3], 2 * sas.sel(species='s2')[:3])
+    assert np.all(sas.sel(species='s3')[4:] == 0)
+    assert np.all(sas.sel(species='s3')[:4] != 0)
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from glotaran.models.spectral_temporal.spectral_shape import (
+    SpectralShapeGaussian,
+    SpectralShapeOne,
+    SpectralShapeZero,
+    calculate_shape_matrix,
+)
+
+
+def _gaussian(amplitude, location, width):
+    shape = SpectralShapeGaussian()
+    shape.amplitude = amplitude
+    shape.location = location
+    shape.width = width
+    return shape
+
+
+def test_calculate_shape_matrix():
+    axis = np.linspace(400, 700, 61)
+    shapes = [
+        [_gaussian(1.0, 500, 50)],
+        [_gaussian(2.0, 550, 30), _gaussian(0.5, 650, 80)],
+        [SpectralShapeOne()],
+        [SpectralShapeZero(), _gaussian(1.0, 600, 20)],
+        [],
+    ]
+
+    matrix = calculate_shape_matrix(shapes, axis)
+
+    assert matrix.shape == (61, 5)
+    for i, column in enumerate(shapes):
+        assert np.allclose(matrix[:, i], sum(shape.calculate(axis) for shape in column) +
+                           np.zeros_like(axis))
+
+    product = calculate_shape_matrix(shapes, axis, reduce=np.multiply)
+    assert np.allclose(product[:, 1], shapes[1][0].calculate(axis) * shapes[1][1].calculate(axis))
+    assert np.allclose(product[:, 3], 0)
+    assert np.allclose(product[:, 4], 1)
+
+
+def test_calculate_shape_matrix_without_gaussians():
+    axis = np.linspace(400, 700, 61)
+
+    assert calculate_shape_matrix([], axis).shape == (61, 0)
+    assert np.array_equal(calculate_shape_matrix([[]], axis), np.zeros((61, 1)))
+    assert np.array_equal(calculate_shape_matrix([[], []], axis, reduce=np.multiply),
+                          np.ones((61, 2)))
+
+    matrix = calculate_shape_matrix([[SpectralShapeOne()], [SpectralShapeZero()], []], axis)
+    assert np.array_equal(matrix, np.stack([np.ones(61), np.zeros(61), np.zeros(61)], axis=1))
+
+
+def test_calculate_shape_matrix_cache():
+    axis = np.linspace(400, 700, 61)
+    shape = _gaussian(1.0, 500, 50)
+
+    matrix = calculate_shape_matrix([[shape]], axis)
+    matrix[:] = 0
+    # the cached matrix is not changed by changes of a returned matrix
+    assert np.allclose(calculate_shape_matrix([[shape]], axis)[:, 0], shape.calculate(axis))
+
+    shape.location = 600
+    assert np.allclose(calculate_shape_matrix([[shape]], axis)[:, 0], shape.calculate(axis))
+    assert np.allclose(calculate_shape_matrix([[shape]], axis[::2])[:, 0],
+                       shape.calculate(axis[::2]))
+
+
+@pytest.mark.benchmark(group='spectral_matrix')
+def test_calculate_shape_matrix_benchmark(benchmark):
+    axis = np.linspace(400, 700, 1000)
+    shapes = [[_gaussian(1.0, 400 + 10 * i, 20 + i)] for i in range(30)]
+
+    def calculate():
+        # new parameter values miss the cache like in an optimization
+        shapes[0][0].amplitude += 1
+        return calculate_shape_matrix(shapes, axis)
+
+    benchmark(calculate)
@@ -17,6 +17,11 @@ class Keys:
     VARY = "vary"
 
 
+_READ_ONLY_ATTRIBUTES = {'value', 'min', 'max', 'vary', 'expr', 'stderr', 'non_neg', 'label',
+                         'full_label'}
+"""The attributes which cannot be set on a read-only parameter."""
+
+
 class Parameter(LmParameter):
     """A parameter for optimization."""
 
@@ -37,6 +42,7 @@ class Parameter(LmParameter):
         self._non_neg = False
         self.label = label
         self._full_label = full_label
+        self._read_only = False
 
     @classmethod
     def from_parameter(cls, label: str, parameter: LmParameter) -> 'Parameter':
@@ -129,6 +135,25 @@ class Parameter(LmParameter):
         self.stderr = p.stderr
         self.non_neg = p.non_neg
 
+    def set_read_only(self):
+        """Makes the parameter read-only, setting its value or options raises an exception.
+
+        Copies of a read-only parameter are writable.
+        """
+        self._read_only = True
+
+    @property
+    def read_only(self) -> bool:
+        """Indicates if the parameter is read-only."""
+        return getattr(self, '_read_only', False)
+
+    def __setattr__(self, name, value):
+        # lmfit sets some attributes to their current value when reading, e.g. `vary` of
+        # parameters with an expression
+        if name in _READ_ONLY_ATTRIBUTES and self.read_only and getattr(self, name) != value:
+            raise Exception(f"Parameter '{self.full_label}' is read-only")
+        super().__setattr__(name, value)
+
     def _set_options_from_dict(self, options: typing.Dict):
         if Keys.NON_NEG in options:
             self.non_neg = options[Keys.NON_NEG]
@@ -188,6 +213,15 @@ class Parameter(LmParameter):
 
         LmParameter.value.fset(self, val)
 
+    def __getstate__(self):
+        """Get state for pickle."""
+        return super().__getstate__(), self._label, self._full_label, self._non_neg
+
+    def __setstate__(self, state):
+        """Set state for pickle."""
+        state, self._label, self._full_label, self._non_neg = state
+        super().__setstate__(state)
+
     def __str__(self):
         """ """
         return f"__{self.label}__: _Value_: {self.value}, _StdErr_: {self.stderr}, _Min_:" + \
@@ -0,0 +1,224 @@
+"""The compiled evaluator for parameter expressions."""
+
+import ast
+import io
+import re
+import tokenize
+import typing
+
+import numpy as np
+
+import glotaran  # noqa F01
+
+_FUNCTIONS = {
+    'abs': np.abs,
+    'arccos': np.arccos,
+    'arcsin': np.arcsin,
+    'arctan': np.arctan,
+    'cos': np.cos,
+    'cosh': np.cosh,
+    'exp': np.exp,
+    'log': np.log,
+    'log10': np.log10,
+    'sin': np.sin,
+    'sinh': np.sinh,
+    'sqrt': np.sqrt,
+    'tan': np.tan,
+    'tanh': np.tanh,
+}
+"""The functions available in parameter expressions."""
+
+_CONSTANTS = {
+    'e': np.e,
+    'pi': np.pi,
+}
+"""The constants available in parameter expressions."""
+
+_ALLOWED_NODES = (ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Load,
+                  ast.operator, ast.unaryop)
+"""The syntax allowed in parameter expressions, arithmetic and function calls."""
+
+_NUMBER_NODES = tuple(getattr(ast, name) for name in ['Constant', 'Num'] if hasattr(ast, name))
+"""The nodes of numeric literals, `ast.Num` before Python 3.8."""
+
+_REFERENCE = re.compile(r'\$([\w.]+)')
+"""A reference to a parameter by its label, e.g. `$kinetic.1`."""
+
+
+class ParameterExpressions:
+    """The compiled parameter expressions of a parameter group.
+
+    Parameters can be defined by an expression of other parameters with the `expr` option, e.g.
+    `$kinetic.1 * 2`. The parameters are referenced by their label prefixed with `$` or by
+    their `lmfit` name, e.g. `_kinetic_1`. Expressions can use the arithmetic operators and the
+    functions and constants in :data:`_FUNCTIONS` and :data:`_CONSTANTS`.
+
+    The expressions are parsed once and compiled into a single Python function, which
+    evaluates all expressions in the order of their dependencies on a vector of the involved
+    parameter values.
+    """
+
+    def __init__(self, group: 'glotaran.parameter.ParameterGroup'):
+        """
+        Parameters
+        ----------
+        group :
+            The parameter group with the expressions, which is validated.
+        """
+        labels = [label for label, _ in group.all()]
+        names = {f"_{label.replace('.', '_')}": label for label in labels}
+        names.update({label: label for label in labels})
+
+        sources = {}
+        dependencies = {}
+        for label, p in group.all():
+            if p.expr:
+                sources[label], dependencies[label] = _parse(label, p.expr, names)
+
+        order = _dependency_order(dependencies)
+
+        involved = set(order)
+        for dependency in dependencies.values():
+            involved.update(dependency)
+        position = {label: i for i, label in enumerate(labels)}
+        self._labels = sorted(involved, key=position.get)
+        self._order = order
+        self._dependencies = dependencies
+
+        index = {label: i for i, label in enumerate(self._labels)}
+        lines = ["def evaluate(values):"]
+        for label in order:
+            lines.append(f"    values[{index[label]}] = "
+                         f"{_substitute(sources[label], index)}")
+        lines.append("    return values")
+        self._source = '\n'.join(lines)
+        self._targets = [(index[label], label) for label in order]
+        self._evaluate = _compile(self._source)
+
+    def __getstate__(self):
+        """Get state for pickle, the compiled function is recompiled from its source."""
+        state = dict(self.__dict__)
+        del state['_evaluate']
+        return state
+
+    def __setstate__(self, state):
+        """Set state for pickle."""
+        self.__dict__.update(state)
+        self._evaluate = _compile(self._source)
+
+    @property
+    def labels(self) -> typing.List[str]:
+        """The labels of the parameters defined by an expression in the order of evaluation."""
+        return list(self._order)
+
+    @property
+    def dependencies(self) -> typing.Dict[str, typing.Set[str]]:
+        """The labels of the parameters directly referenced by the expression of each parameter
+        defined by an expression."""
+        return {label: set(dependency) for label, dependency in self._dependencies.items()}
+
+    def evaluate(self, group: 'glotaran.parameter.ParameterGroup'):
+        """Sets the values of all parameters defined by an expression.
+
+        Parameters
+        ----------
+        group :
+            The parameter group, it must contain all parameters of the group the expressions were
+            compiled for.
+        """
+        if not self._order:
+            return
+        values = self._evaluate(group.get_many(self._labels))
+        for i, label in self._targets:
+            group.get(label).value = float(values[i])
+
+
+def _compile(source: str) -> typing.Callable[[np.ndarray], np.ndarray]:
+    """Compiles the source of the evaluation function with only the allowed functions and
+    constants in its namespace."""
+    namespace = {'__builtins__': {}}
+    namespace.update(_FUNCTIONS)
+    namespace.update(_CONSTANTS)
+    exec(compile(source, '<parameter expressions>', 'exec'), namespace)
+    return namespace['evaluate']
+
+
+def _parse(label: str,
+           expr: str,
+           names: typing.Dict[str, str],
+           ) -> typing.Tuple[str, typing.Set[str]]:
+    """Validates an expression and returns its source with the parameter names replaced by
+    their labels and the labels of the referenced parameters."""
+
+    references = {}
+
+    def replace_reference(match):
+        placeholder = f"__reference_{len(references)}"
+        references[placeholder] = match.group(1)
+        return placeholder
+
+    source = _REFERENCE.sub(replace_reference, expr)
+    try:
+        tree = ast.parse(source.strip(), mode='eval')
+    except SyntaxError:
+        raise Exception(f"Invalid expression '{expr}' for parameter '{label}'")
+
+    substitutions = {}
+    for node in ast.walk(tree):
+        if isinstance(node, _NUMBER_NODES):
+            if not isinstance(getattr(node, 'n', getattr(node, 'value', None)), (int, float)):
+                raise Exception(f"Invalid expression '{expr}' for parameter '{label}', only "
+                                "numeric constants are allowed")
+            continue
+        if not isinstance(node, _ALLOWED_NODES):
+            raise Exception(f"Invalid expression '{expr}' for parameter '{label}', "
+                            f"'{type(node).__name__}' is not allowed")
+        if isinstance(node, ast.Call):
+            if not isinstance(node.func, ast.Name) or node.func.id not in _FUNCTIONS or \
+                    node.keywords:
+                raise Exception(f"Invalid expression '{expr}' for parameter '{label}', only "
+                                f"the functions {list(_FUNCTIONS)} are allowed")
+        elif isinstance(node, ast.Name) and node.id not in _FUNCTIONS:
+            reference = references.get(node.id, node.id)
+            if reference in names:
+                substitutions[node.id] = names[reference]
+            elif node.id not in _CONSTANTS:
+                raise Exception(f"Unknown parameter '{reference}' in expression '{expr}' for "
+                                f"parameter '{label}'")
+    return _replace_names(source, substitutions), set(substitutions.values())
+
+
+def _replace_names(source: str, substitutions: typing.Dict[str, str]) -> str:
+    """Replaces names in the source with placeholders `{label}`."""
+    tokens = []
+    for token in tokenize.generate_tokens(io.StringIO(source.strip()).readline):
+        if token.type == tokenize.NAME and token.string in substitutions:
+            tokens.append((tokenize.NAME, f"{{{substitutions[token.string]}}}"))
+        else:
+            tokens.append((token.type, token.string))
+    return tokenize.untokenize(tokens).strip()
+
+
+def _substitute(source: str, index: typing.Dict[str, int]) -> str:
+    """Replaces the label placeholders in the source with the positions in the value vector."""
+    return re.sub(r'\{([^{}]+)\}', lambda match: f"values[{index[match.group(1)]}]", source)
+
+
+def _dependency_order(dependencies: typing.Dict[str, typing.Set[str]]) -> typing.List[str]:
+    """Returns the labels of the expressions ordered so that every expression comes after the
+    expressions it depends on. Raises an exception for cyclic dependencies."""
+
+    order = []
+    remaining = {label: dependency & set(dependencies)
+                 for label, dependency in dependencies.items()}
+    while remaining:
+        ready = [label for label, dependency in remaining.items() if not dependency]
+        if not ready:
+            raise Exception(f"Cyclic dependency in the expressions of the parameters "
+                            f"{sorted(remaining)}")
+        for label in ready:
+            del remaining[label]
+        for dependency in remaining.values():
+            dependency.difference_update(ready)
+        order += ready
+    return order
@@ -7,9 +7,15 @@ import csv
 import numpy as np
 import pandas as pd
 import typing
-import yaml
+
+from glotaran.parse.parser import parse_yml
 
 from .parameter import Parameter
+from .parameter_expression import ParameterExpressions
+
+
+_COLUMNS = ['label', 'value', 'min', 'max', 'vary', 'non-negative', 'stderr']
+"""The columns of parameter tables."""
 
 
 class ParameterNotFoundException(Exception):
@@ -33,7 +39,9 @@ class ParameterGroup(dict):
 
         self._label = label
         self._parameters = {}
+        self._index = {}
         self._root = None
+        self._read_only = False
         super(ParameterGroup, self).__init__()
 
     @classmethod
@@ -154,15 +162,64 @@ class ParameterGroup(dict):
         yaml_string :
             The YAML string with the parameters.
         """
-        items = yaml.load(yaml_string)
+        items = parse_yml(yaml_string)
         if isinstance(items, list):
             cls = cls.from_list(items)
         else:
             cls = cls.from_dict(items)
+        # validates the expressions
+        ParameterExpressions(cls)
         return cls
 
     @classmethod
-    def from_csv(cls, filepath: str, delimiter: str = '\t'):
+    def from_dataframe(cls, df: pd.DataFrame) -> "ParameterGroup":
+        """Creates a :class:`ParameterGroup` from a :class:`pandas.DataFrame`.
+
+        The columns are read as whole and the group tree is built in one pass over the rows.
+
+        Parameters
+        ----------
+        df :
+            The data frame with the columns `label`, `value`, `min`, `max`, `vary`,
+            `non-negative` and `stderr`, as written by :meth:`to_dataframe`.
+        """
+
+        root = cls(None)
+        groups = {(): root}
+
+        columns = zip(
+            df['label'].astype(str).tolist(),
+            df['value'].astype(np.float64).tolist(),
+            df['min'].astype(np.float64).tolist(),
+            df['max'].astype(np.float64).tolist(),
+            df['vary'].tolist(),
+            df['non-negative'].tolist(),
+            df['stderr'].astype(np.float64).tolist(),
+        )
+        for label, value, minimum, maximum, vary, non_neg, stderr in columns:
+            path = tuple(label.split('.'))
+            group = groups.get(path[:-1])
+            if group is None:
+                group = root
+                for i in range(1, len(path)):
+                    if path[:i] not in groups:
+                        subgroup = ParameterGroup(path[i-1])
+                        group.add_group(subgroup)
+                        groups[path[:i]] = subgroup
+                    group = groups[path[:i]]
+
+            p = Parameter(label=path[-1])
+            p.value = value
+            p.stderr = stderr
+            p.min = minimum
+            p.max = maximum
+            p.vary = vary
+            p.non_neg = non_neg
+            group.add_parameter(p)
+        return root
+
+    @classmethod
+    def from_csv(cls, filepath: str, delimiter: str = '\t') -> "ParameterGroup":
         """Creates a :class:`ParameterGroup` from a CSV file.
 
         Parameters
@@ -172,75 +229,86 @@ class ParameterGroup(dict):
         delimiter : str
             The delimiter of the CSV file.
         """
+        return cls.from_dataframe(pd.read_csv(filepath, sep=delimiter))
 
-        root = cls()
-        df = pd.read_csv(filepath, sep=delimiter)
-
-        for i, label in enumerate(df['label']):
-            label = label.split('.')
-            if len(label) == 1:
-                p = Parameter(label=label.pop())
-                p.value = df['value'][i]
-                p.stderr = df['stderr'][i]
-                p.min = df['min'][i]
-                p.max = df['max'][i]
-                p.vary = df['vary'][i]
-                p.non_neg = df['non-negative'][i]
-                root.add_parameter(p)
-                continue
+    @classmethod
+    def from_parquet(cls, filepath: str) -> "ParameterGroup":
+        """Creates a :class:`ParameterGroup` from a Parquet file.
 
-            top = root
-            while len(label) != 0:
-                group = label.pop(0)
-                if group in top:
-                    if len(label) == 1:
-                        p = Parameter(label=label.pop())
-                        p.value = df['value'][i]
-                        p.stderr = df['stderr'][i]
-                        p.min = df['min'][i]
-                        p.max = df['max'][i]
-                        p.vary = df['vary'][i]
-                        p.non_neg = df['non-negative'][i]
-                        top[group].add_parameter(p)
-                    else:
-                        top = top[group]
-                else:
-                    group = ParameterGroup(group)
-                    top.add_group(group)
-                    if len(label) == 1:
-                        p = Parameter(label=label.pop())
-                        p.value = df['value'][i]
-                        p.stderr = df['stderr'][i]
-                        p.min = df['min'][i]
-                        p.max = df['max'][i]
-                        p.vary = df['vary'][i]
-                        p.non_neg = df['non-negative'][i]
-                        group.add_parameter(p)
-                    else:
-                        top = group
-        return root
+        Requires `pyarrow` or `fastparquet`.
+
+        Parameters
+        ----------
+        filepath :
+            The path to the Parquet file.
+        """
+        return cls.from_dataframe(pd.read_parquet(filepath))
+
+    @classmethod
+    def from_feather(cls, filepath: str) -> "ParameterGroup":
+        """Creates a :class:`ParameterGroup` from a Feather file.
+
+        Requires `pyarrow`.
+
+        Parameters
+        ----------
+        filepath :
+            The path to the Feather file.
+        """
+        return cls.from_dataframe(pd.read_feather(filepath))
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """Creates a :class:`pandas.DataFrame` with one row per parameter."""
+
+        df = pd.DataFrame.from_records(self._rows(), columns=_COLUMNS)
+        return df.astype({'value': np.float64, 'min': np.float64, 'max': np.float64,
+                          'vary': bool, 'non-negative': bool, 'stderr': np.float64})
 
     def to_csv(self, filename: str, delimiter: str = '\t'):
         """Writes a :class:`ParameterGroup` to a CSV file.
 
         Parameters
         ----------
-        filepath :
+        filename :
             The path to the CSV file.
         delimiter : str
             The delimiter of the CSV file.
         """
 
+        # the csv module writes the rows faster than pandas
         with open(filename, mode='w') as parameter_file:
             parameter_writer = csv.writer(parameter_file, delimiter=delimiter)
-            parameter_writer.writerow(
-                ['label', 'value', 'min', 'max', 'vary', 'non-negative', 'stderr']
-            )
+            parameter_writer.writerow(_COLUMNS)
+            parameter_writer.writerows(self._rows())
+
+    def to_parquet(self, filepath: str):
+        """Writes a :class:`ParameterGroup` to a Parquet file.
+
+        Requires `pyarrow` or `fastparquet`.
 
-            for (label, p) in self.all():
-                parameter_writer.writerow(
-                    [label, p.value, p.min, p.max, p.vary, p.non_neg, p.stderr]
-                )
+        Parameters
+        ----------
+        filepath :
+            The path to the Parquet file.
+        """
+        self.to_dataframe().to_parquet(filepath, index=False)
+
+    def to_feather(self, filepath: str):
+        """Writes a :class:`ParameterGroup` to a Feather file.
+
+        Requires `pyarrow`.
+
+        Parameters
+        ----------
+        filepath :
+            The path to the Feather file.
+        """
+        self.to_dataframe().to_feather(filepath)
+
+    def _rows(self) -> typing.List[typing.Tuple]:
+        """Returns the rows of the parameter table in the order of :data:`_COLUMNS`."""
+        return [(label, p.value, p.min, p.max, p.vary, p.non_neg, p.stderr)
+                for label, p in self.all()]
 
     def add_parameter(self, parameter: Parameter):
         """Adds a :class:`Parameter` to the group.
@@ -250,6 +318,7 @@ class ParameterGroup(dict):
         parameter :
             The parameter to add.
         """
+        self._check_writable()
         if not isinstance(parameter, list):
             parameter = [parameter]
         if any(not isinstance(p, Parameter) for p in parameter):
@@ -261,6 +330,7 @@ class ParameterGroup(dict):
                 p.label = f"{p.index}"
             p.full_label = f'{self.label}.{p.label}' if self.label else p.label
             self._parameters[p.label] = p
+            self._update_index(p.label, p)
 
     def add_group(self, group: 'ParameterGroup'):
         """Adds a :class:`ParameterGroup` to the group.
@@ -270,10 +340,68 @@ class ParameterGroup(dict):
         group :
             The group to add.
         """
+        self._check_writable()
         if not isinstance(group, ParameterGroup):
             raise TypeError("Group must be glotaran.model.ParameterGroup")
+        if group.label in self:
+            self._remove_from_index(f"{group.label}.")
         group.set_root(self)
         self[group.label] = group
+        for label, p in group._index.items():
+            self._update_index(f"{group.label}.{label}", p)
+
+    def set_read_only(self):
+        """Makes the group, its subgroups and all their parameters read-only.
+
+        Adding parameters or groups and setting the values or options of the parameters raises
+        an exception. Copies of a read-only group are writable.
+        """
+        self._read_only = True
+        for group in self.values():
+            group.set_read_only()
+        for p in self._parameters.values():
+            p.set_read_only()
+
+    @property
+    def read_only(self) -> bool:
+        """Indicates if the group is read-only."""
+        return self._read_only
+
+    def _check_writable(self):
+        if self._read_only:
+            raise Exception(f"Parameter group '{self.label}' is read-only")
+
+    def __getstate__(self):
+        """Get state for pickle and copy, copies are writable."""
+        state = self.__dict__.copy()
+        state['_read_only'] = False
+        return state
+
+    def _update_index(self, label: str, parameter: Parameter):
+        """Adds a parameter to the index of the group and of all its roots.
+
+        Parameters
+        ----------
+        label :
+            The label of the parameter relative to the group.
+        parameter :
+            The parameter.
+        """
+        group = self
+        while group is not None:
+            group._index[label] = parameter
+            label = f"{group.label}.{label}"
+            group = group._root
+
+    def _remove_from_index(self, prefix: str):
+        """Removes all parameters with labels starting with the prefix from the index of the
+        group and of all its roots."""
+        group = self
+        while group is not None:
+            for label in [label for label in group._index if label.startswith(prefix)]:
+                del group._index[label]
+            prefix = f"{group.label}.{prefix}"
+            group = group._root
 
     def set_root(self, root: 'ParameterGroup'):
         """Sets the root of the group.
@@ -313,12 +441,7 @@ class ParameterGroup(dict):
         label :
             The label of the parameter.
         """
-
-        try:
-            self.get(label)
-            return True
-        except Exception:
-            return False
+        return str(label) in self._index
 
     def get(self, label: str) -> Parameter:
         """Gets a :class:`Parameter` by it label.
@@ -332,20 +455,28 @@ class ParameterGroup(dict):
         # sometimes the spec parser delivers the labels as int
         label = str(label)
 
-        path = label.split(".")
-        label = path.pop()
-
-        group = self
-        for l in path:
-            try:
-                group = group[l]
-            except KeyError:
-                raise ParameterNotFoundException(path, label)
         try:
-            return group._parameters[label]
+            return self._index[label]
         except KeyError:
+            path = label.split(".")
+            label = path.pop()
             raise ParameterNotFoundException(path, label)
 
+    def get_many(self, labels: typing.Iterable[str]) -> np.ndarray:
+        """Gets the values of several parameters by their labels.
+
+        Parameters
+        ----------
+        labels :
+            The labels of the parameters.
+
+        Returns
+        -------
+        values :
+            The parameter values in the order of `labels`.
+        """
+        return np.asarray([self.get(label).value for label in labels], dtype=np.float64)
+
     def all(self, root: str = None, seperator: str = ".") \
             -> typing.Generator[typing.Tuple[str, Parameter], None, None]:
         """Returns a generator over all parameter in the group and it's subgroups together with
@@ -374,11 +505,19 @@ class ParameterGroup(dict):
         -----
 
         Only for internal use.
+
+        Parameters defined by an expression are added as fixed parameters without the
+        expression, the expressions are evaluated by
+        :class:`glotaran.parameter.parameter_expression.ParameterExpressions` instead of `lmfit`.
         """
 
         params = Parameters()
         for label, p in self.all(seperator="_"):
             p.name = "_" + label
+            if p.expr:
+                p = copy.deepcopy(p)
+                p.expr = None
+                p.vary = False
             if p.non_neg:
                 p = copy.deepcopy(p)
                 if p.value == 1:
@@ -387,14 +526,13 @@ class ParameterGroup(dict):
                     p.min += 1e-10
                 if p.max == 1:
                     p.max += 1e-10
-                else:
-                    try:
-                        p.value = log(p.value)
-                        p.min = log(p.min) if np.isfinite(p.min) else p.min
-                        p.max = log(p.max) if np.isfinite(p.max) else p.max
-                    except Exception:
-                        raise Exception("Could not take log of parameter"
-                                        f" '{label}' with value '{p.value}'")
+                try:
+                    p.value = log(p.value)
+                    p.min = log(p.min) if np.isfinite(p.min) else p.min
+                    p.max = log(p.max) if np.isfinite(p.max) else p.max
+                except Exception:
+                    raise Exception("Could not take log of parameter"
+                                    f" '{label}' with value '{p.value}'")
             params.add(p)
         return params
 
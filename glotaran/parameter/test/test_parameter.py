@@ -1,6 +1,9 @@
+import copy
+import pickle
 import numpy as np
+import pytest
 
-from glotaran.parameter import ParameterGroup
+from glotaran.parameter import Parameter, ParameterGroup
 
 
 def test_param_array():
@@ -126,6 +129,7 @@ def test_non_negative():
     - ["nonneg1", 1, {non-negative: True}]
     - ["nonneg2", 2, {non-negative: True}]
     - ["nonnegmin", 6, {non-negative: True, min: 2}]
+    - ["nonnegmax", 0.5, {non-negative: True, min: 0.1, max: 1}]
     """
     params = ParameterGroup.from_yaml(params)
     result = ParameterGroup.from_parameter_dict(params.as_parameter_dict())
@@ -140,3 +144,149 @@ def test_non_negative():
         assert np.allclose(r.value, p.value)
         assert np.allclose(r.min, p.min)
         assert np.allclose(r.max, p.max)
+
+
+def test_pickle():
+    params = """
+    kinetic:
+        - ["1", 1]
+        - ["2", 2, {non-negative: True, vary: False}]
+    """
+    params = ParameterGroup.from_yaml(params)
+    result = pickle.loads(pickle.dumps(params))
+
+    for label, p in params.all():
+        r = result.get(label)
+        assert r.label == p.label
+        assert r.full_label == p.full_label
+        assert r.non_neg == p.non_neg
+        assert r.vary == p.vary
+        assert r.value == p.value
+
+
+def test_read_only():
+    params = ParameterGroup.from_dict({
+        'kinetic': [1, ['2', 2, {'expr': '$kinetic.1 * 2'}]],
+        'irf': [1],
+    })
+    params.set_read_only()
+
+    assert params.read_only
+    assert params['kinetic'].read_only
+    assert params.get('kinetic.1').read_only
+    with pytest.raises(Exception, match="read-only"):
+        params.get('kinetic.1').value = 3
+    with pytest.raises(Exception, match="read-only"):
+        params.get('kinetic.2').min = 0
+    with pytest.raises(Exception, match="read-only"):
+        params['irf'].add_parameter(Parameter(label='2'))
+
+    # reading a parameter with an expression and converting the group are allowed
+    assert params.get('kinetic.2').expr == '$kinetic.1 * 2'
+    params.as_parameter_dict()
+
+    for copied in [copy.deepcopy(params), pickle.loads(pickle.dumps(params))]:
+        assert not copied.read_only
+        copied.get('kinetic.1').value = 3
+        assert params.get('kinetic.1').value == 1
+
+
+def test_index():
+    params = ParameterGroup.from_dict({
+        'kinetic': [1.0, 2.0],
+        'shape': {'amps': [3.0], 'locs': [4.0]},
+    })
+
+    assert params.has('kinetic.1')
+    assert params.has('shape.amps.1')
+    assert not params.has('shape.amps.2')
+    assert not params.has('shape')
+    assert params['shape'].has('locs.1')
+    assert params.get('shape.locs.1') is params['shape']['locs'].get('1')
+
+    params['shape']['amps'].add_parameter(Parameter(label='width'))
+    assert params.get('shape.amps.width') is params['shape']['amps'].get('width')
+
+    group = ParameterGroup.from_list([5.0], label='amps')
+    params['shape'].add_group(group)
+    assert params.get('shape.amps.1').value == 5.0
+    assert not params.has('shape.amps.width')
+
+    with pytest.raises(Exception, match='Cannot find parameter'):
+        params.get('kinetic.3')
+
+
+def test_get_many():
+    params = ParameterGroup.from_dict({'kinetic': [1.0, 2.0], 'j': [3]})
+    values = params.get_many(['j.1', 'kinetic.2', 'kinetic.1'])
+    assert values.dtype == np.float64
+    assert np.array_equal(values, [3.0, 2.0, 1.0])
+
+
+@pytest.mark.benchmark(group='parameter')
+def test_get_many_benchmark(benchmark):
+    params = ParameterGroup.from_dict(
+        {f'group{i}': {'kinetic': list(range(1, 51))} for i in range(100)})
+    labels = [label for label, _ in params.all()]
+    values = benchmark(params.get_many, labels)
+    assert values.size == 5000
+
+
+def _assert_equal_groups(result, wanted):
+    assert [label for label, _ in result.all()] == [label for label, _ in wanted.all()]
+    for label, p in wanted.all():
+        r = result.get(label)
+        assert r.label == p.label
+        assert r.value == p.value
+        assert r.min == p.min
+        assert r.max == p.max
+        assert r.vary == p.vary
+        assert r.non_neg == p.non_neg
+        assert r.stderr == p.stderr or (r.stderr is None or np.isnan(r.stderr)) \
+            and p.stderr is None
+
+
+@pytest.fixture
+def table_params():
+    params = ParameterGroup.from_dict({
+        'kinetic': [1.0, [2.0, {'non-negative': True, 'vary': False, 'min': 0.5}]],
+        'shape': {'amps': [3.0], 'locs': {'a': [4.0]}},
+    })
+    params.get('kinetic.1').stderr = 0.1
+    return params
+
+
+def test_csv(tmp_path, table_params):
+    filename = str(tmp_path / 'parameter.csv')
+    table_params.to_csv(filename)
+    _assert_equal_groups(ParameterGroup.from_csv(filename), table_params)
+
+    params = ParameterGroup.from_list([1.0, 2.0])
+    params.to_csv(filename, delimiter=',')
+    _assert_equal_groups(ParameterGroup.from_csv(filename, delimiter=','), params)
+
+
+def test_dataframe(table_params):
+    df = table_params.to_dataframe()
+    assert list(df['label']) == ['kinetic.1', 'kinetic.2', 'shape.amps.1', 'shape.locs.a.1']
+    assert df['vary'].dtype == bool
+    _assert_equal_groups(ParameterGroup.from_dataframe(df), table_params)
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "feather"])
+def test_columnar_formats(tmp_path, table_params, file_format):
+    pytest.importorskip('pyarrow')
+    filename = str(tmp_path / f'parameter.{file_format}')
+    getattr(table_params, f'to_{file_format}')(filename)
+    result = getattr(ParameterGroup, f'from_{file_format}')(filename)
+    _assert_equal_groups(result, table_params)
+
+
+@pytest.mark.benchmark(group='parameter')
+def test_from_csv_benchmark(benchmark, tmp_path):
+    params = ParameterGroup.from_dict(
+        {f'group{i}': {'kinetic': list(range(1, 51))} for i in range(100)})
+    filename = str(tmp_path / 'parameter.csv')
+    params.to_csv(filename)
+    result = benchmark(ParameterGroup.from_csv, filename)
+    assert len(list(result.all())) == 5000
@@ -0,0 +1,67 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from glotaran.parameter import ParameterGroup
+from glotaran.parameter.parameter_expression import ParameterExpressions
+
+
+def test_expressions():
+    params = ParameterGroup.from_yaml("""
+    kinetic:
+        - 0.5
+        - [0, {expr: "$kinetic.3 - $shape.amps.1"}]
+        - [0, {expr: "_kinetic_1 * 2"}]
+    shape:
+        amps: [3.0]
+        locs: [[0, {expr: "exp($kinetic.2) + pi"}]]
+    """)
+    expressions = ParameterExpressions(params)
+    assert expressions.labels == ['kinetic.3', 'kinetic.2', 'shape.locs.1']
+
+    expressions.evaluate(params)
+    assert params.get('kinetic.3').value == 1.0
+    assert params.get('kinetic.2').value == -2.0
+    assert np.isclose(params.get('shape.locs.1').value, np.exp(-2.0) + np.pi)
+
+    params.get('kinetic.1').value = 1.0
+    pickle.loads(pickle.dumps(expressions)).evaluate(params)
+    assert params.get('kinetic.2').value == -1.0
+
+
+def test_expressions_not_in_parameter_dict():
+    params = ParameterGroup.from_yaml("kinetic: [0.5, [1.0, {expr: '$kinetic.1 * 2'}]]")
+    parameter_dict = params.as_parameter_dict()
+    assert parameter_dict['_kinetic_2'].expr is None
+    assert not parameter_dict['_kinetic_2'].vary
+    assert params.get('kinetic.2').expr == '$kinetic.1 * 2'
+
+
+@pytest.mark.parametrize("expr,message", [
+    ("$kinetic.1 + $kinetic.9", "Unknown parameter 'kinetic.9'"),
+    ("$kinetic.1 +", "Invalid expression"),
+    ("__import__('os')", "only the functions"),
+    ("($kinetic.1).real", "'Attribute' is not allowed"),
+    ("'text'", "only numeric constants"),
+    ("$kinetic.3", "Cyclic dependency"),
+])
+def test_invalid_expressions(expr, message):
+    with pytest.raises(Exception, match=message):
+        ParameterGroup.from_yaml(f"""
+        kinetic:
+            - 0.5
+            - [0, {{expr: "{expr}"}}]
+            - [0, {{expr: "$kinetic.2"}}]
+        """)
+
+
+@pytest.mark.benchmark(group='parameter')
+def test_expressions_benchmark(benchmark):
+    params = ParameterGroup.from_dict({
+        'kinetic': list(range(1, 101)),
+        'scaled': [[0, {'expr': f'$kinetic.{i} * 2'}] for i in range(1, 101)],
+    })
+    expressions = ParameterExpressions(params)
+    benchmark(expressions.evaluate, params)
+    assert params.get('scaled.100').value == 200
@@ -1,11 +1,23 @@
 """Functions for reading and parsing models from serialized representations."""
 
 from typing import Dict
-import yaml
+import hashlib
 import os
+import pickle
 import re
+import yaml
+
+import glotaran
 from .register import get_model, known_model
 
+_BaseLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+"""The libyaml based safe loader if PyYAML is compiled with libyaml, otherwise the pure Python
+safe loader."""
+
+
+class _Loader(_BaseLoader):
+    """The YAML loader for models and parameters."""
+
 
 # shamelessly taken from
 # https://stackoverflow.com/questions/39553008/how-to-read-a-python-tuple-using-pyyaml#39553138
@@ -32,9 +44,13 @@ def _yml_tuple_constructor(loader, node):
 
 
 # !tuple is my own tag name, I think you could choose anything you want
-yaml.add_constructor(u'!tuple', _yml_tuple_constructor)
-# this is to spot the strings written as tuple in the yaml
-yaml.add_implicit_resolver(u'!tuple', re.compile(r"\((.*?,.*?)\)"))
+_Loader.add_constructor(u'!tuple', _yml_tuple_constructor)
+# this is to spot the strings written as tuple in the yaml, the regex is only tried on scalars
+# starting with a parenthesis
+_Loader.add_implicit_resolver(u'!tuple', re.compile(r"\((.*?,.*?)\)"), ['('])
+
+_model_cache = {}
+"""The in memory cache of pickled models with the hash of the model file as key."""
 
 
 def parse_yml_file(fname: str) -> Dict:
@@ -60,8 +76,16 @@ def parse_yml_file(fname: str) -> Dict:
 
 
 def parse_yml(data: str):
+    """parse_yml parses YML with the safe loader, tuples written as `(a, b)` are parsed as
+    python tuples.
+
+    Parameters
+    ----------
+    data :
+        The YML string or file object to parse.
+    """
     try:
-        return yaml.load(data)
+        return yaml.load(data, Loader=_Loader)
     except Exception as e:
         raise e
 
@@ -84,9 +108,63 @@ def parse_spec(spec: Dict):
         raise e
 
 
-def load_yml_file(fname: str):
-    spec = parse_yml_file(fname)
-    return parse_spec(spec)
+def load_yml_file(fname: str, cache: bool = False, cache_dir: str = None):
+    """load_yml_file loads a model from a YML file.
+
+    Parameters
+    ----------
+    fname :
+        The path of the model file.
+    cache :
+        If `True`, the constructed model is cached in memory with the hash of the file content as
+        key. Repeated loads of an unchanged file skip parsing and return a fresh copy of the
+        model.
+    cache_dir :
+        If not `None`, the constructed model is additionally cached as pickle file in this
+        folder, so that other processes can skip parsing too. Implies `cache`.
+    """
+    if not cache and cache_dir is None:
+        return parse_spec(parse_yml_file(fname))
+
+    if not os.path.isfile(fname):
+        raise Exception("File does not exist.")
+    with open(fname, 'rb') as f:
+        content = f.read()
+    key = _cache_key(content)
+
+    pickled = _model_cache.get(key)
+    cache_file = None if cache_dir is None else os.path.join(cache_dir, f'{key}.pickle')
+    if pickled is None and cache_file is not None and os.path.isfile(cache_file):
+        with open(cache_file, 'rb') as f:
+            pickled = f.read()
+        _model_cache[key] = pickled
+    if pickled is not None:
+        return pickle.loads(pickled)
+
+    model = parse_spec(parse_yml(content))
+    pickled = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+    _model_cache[key] = pickled
+    if cache_file is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        # write to a temporary file first, so that concurrent loads never read a partial file
+        temporary_file = f'{cache_file}.{os.getpid()}'
+        with open(temporary_file, 'wb') as f:
+            f.write(pickled)
+        os.replace(temporary_file, cache_file)
+    return model
+
+
+def clear_model_cache():
+    """clear_model_cache clears the in memory model cache of :func:`load_yml_file`."""
+    _model_cache.clear()
+
+
+def _cache_key(content: bytes) -> str:
+    """Returns the cache key of model file content, the version is included because the pickled
+    models depend on it."""
+    digest = hashlib.sha256(content)
+    digest.update(glotaran.__version__.encode())
+    return digest.hexdigest()
 
 
 def load_yml(data: str):
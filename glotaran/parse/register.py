@@ -1,12 +1,22 @@
 """A register for models"""
 
+import importlib
+import typing
 
-from glotaran.model.model import Model
+import glotaran  # noqa F01
 
 _model_register = {}
 
+_BUILTIN_MODELS = {
+    'doas': 'glotaran.models.doas',
+    'flim': 'glotaran.models.flim.flim_model',
+    'kinetic': 'glotaran.models.spectral_temporal',
+}
+"""The modules of the builtin models, which are imported when the model type is first
+requested."""
 
-def register_model(model_type: str, model: Model):
+
+def register_model(model_type: str, model: typing.Type['glotaran.model.Model']):
     """register_model registers a model.
 
     Parameters
@@ -27,10 +37,11 @@ def known_model(model_type: str) -> bool:
     model_type :
         model_type is type of the model.
     """
+    _import_builtin_model(model_type)
     return model_type in _model_register
 
 
-def get_model(model_type: str) -> Model:
+def get_model(model_type: str) -> typing.Type['glotaran.model.Model']:
     """get_model gets a model from the register.
 
     Parameters
@@ -38,4 +49,11 @@ def get_model(model_type: str) -> Model:
     model_type :
         model_type is type of the model.
     """
+    _import_builtin_model(model_type)
     return _model_register[model_type]
+
+
+def _import_builtin_model(model_type: str):
+    """Imports the module of a builtin model, which registers the model."""
+    if model_type not in _model_register and model_type in _BUILTIN_MODELS:
+        importlib.import_module(_BUILTIN_MODELS[model_type])
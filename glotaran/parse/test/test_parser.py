@@ -0,0 +1,65 @@
+import os
+from os.path import join, dirname, abspath
+
+import pytest
+
+from glotaran.models.spectral_temporal import KineticModel
+from glotaran.parameter import ParameterGroup
+from glotaran.parse import parser
+
+THIS_DIR = dirname(abspath(__file__))
+KINETIC_SPEC = join(THIS_DIR, 'test_model_spec_kinetic.yml')
+
+
+def test_parse_tuple():
+    spec = parser.parse_yml("a: (s1, s2)\n(s2, s1): k.1\nb: (no comma)\nc: [1, 2]")
+    assert spec == {'a': ('s1', 's2'), ('s2', 's1'): 'k.1', 'b': '(no comma)', 'c': [1, 2]}
+
+
+def test_parse_is_safe():
+    with pytest.raises(Exception):
+        parser.parse_yml("a: !!python/object/apply:os.getcwd []")
+
+
+def test_parameter_from_yaml():
+    parameter = ParameterGroup.from_yaml("kinetic: [1.0, 2.0]\nj: [[1, {'vary': False}]]")
+    assert parameter.get('kinetic.1').value == 1.0
+    assert not parameter.get('j.1').vary
+
+
+def test_model_cache(tmp_path):
+    parser.clear_model_cache()
+    model_file = str(tmp_path / 'model.yml')
+    with open(model_file, 'w') as f:
+        f.write(open(KINETIC_SPEC).read())
+
+    model = parser.load_yml_file(model_file, cache=True)
+    cached = parser.load_yml_file(model_file, cache=True)
+    assert isinstance(cached, KineticModel)
+    assert cached is not model
+    assert cached.markdown() == model.markdown()
+
+    with open(model_file, 'a') as f:
+        f.write("\n# changed\n")
+    changed = parser.load_yml_file(model_file, cache=True)
+    assert len(parser._model_cache) == 2
+    assert changed.markdown() == model.markdown()
+
+
+def test_model_cache_dir(tmp_path):
+    parser.clear_model_cache()
+    cache_dir = str(tmp_path / 'cache')
+    model = parser.load_yml_file(KINETIC_SPEC, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+
+    parser.clear_model_cache()
+    cached = parser.load_yml_file(KINETIC_SPEC, cache_dir=cache_dir)
+    assert cached.markdown() == model.markdown()
+
+
+@pytest.mark.benchmark(group='parse')
+def test_parse_yml_benchmark(benchmark):
+    spec = "k_matrix:\n  km1:\n    matrix:\n" + "".join(
+        f"      (s{i+1}, s{i}): k.{i}\n" for i in range(2000))
+    result = benchmark(parser.parse_yml, spec)
+    assert len(result['k_matrix']['km1']['matrix']) == 2000
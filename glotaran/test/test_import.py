@@ -0,0 +1,65 @@
+import subprocess
+import sys
+
+import pytest
+
+import glotaran
+
+
+_IMPORT_TIME_BUDGET = 0.1
+"""The maximum cumulative time in seconds of `import glotaran`, far above the lazy import and
+far below the import of the numerical dependencies."""
+
+
+def _run(code):
+    return subprocess.run([sys.executable, *code], check=True, stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, universal_newlines=True)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7),
+                    reason="module level __getattr__ requires Python 3.7")
+def test_import_is_lazy():
+    modules = _run(['-c', 'import sys, glotaran; print(" ".join(sys.modules))']).stdout.split()
+    for heavy in ['lmfit', 'numpy', 'pandas', 'scipy', 'scipy.optimize', 'xarray', 'yaml']:
+        assert heavy not in modules
+
+
+def _import_time():
+    """Returns the cumulative time of `import glotaran` in seconds reported by
+    `-X importtime`."""
+    stderr = _run(['-X', 'importtime', '-c', 'import glotaran']).stderr
+    for line in stderr.splitlines():
+        fields = line.split('|')
+        if len(fields) == 3 and fields[2].strip() == 'glotaran':
+            return int(fields[1]) * 1e-6
+    raise Exception(f"No import time of glotaran reported:\n{stderr}")
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7),
+                    reason="-X importtime and module level __getattr__ require Python 3.7")
+def test_import_time_budget():
+    # the fastest of some runs is robust against a busy machine
+    assert min(_import_time() for _ in range(3)) < _IMPORT_TIME_BUDGET
+
+
+def test_lazy_attributes():
+    assert glotaran.KineticModel is glotaran.models.spectral_temporal.KineticModel
+    assert glotaran.DOASModel is glotaran.models.doas.DOASModel
+    assert glotaran.ParameterGroup is glotaran.parameter.ParameterGroup
+    assert glotaran.read_parameter_from_yml == glotaran.ParameterGroup.from_yaml
+    assert glotaran.read_model_from_yml is glotaran.parse.parser.load_yml
+    assert 'KineticModel' in dir(glotaran)
+
+    with pytest.raises(AttributeError):
+        glotaran.UnknownModel
+
+
+def test_read_model_imports_builtin_model():
+    code = ('import glotaran; '
+            'print(type(glotaran.read_model_from_yml("type: doas")).__name__)')
+    assert _run(['-c', code]).stdout.strip() == 'DOASModel'
+
+
+@pytest.mark.benchmark(group='import')
+def test_import_benchmark(benchmark):
+    benchmark.pedantic(_run, args=(['-c', 'import glotaran'],), rounds=5, iterations=1)
@@ -20,6 +20,11 @@ install_requires = [
     'xarray>=0.11.2',
     'natsort>=5.3.3',  # dependency introduced by glotaran.dataio.chlorospec_format
 ]
+extras_require = {
+    # compressed NetCDF result files, without it results are written as NetCDF3 with scipy
+    'netcdf': ['netCDF4>=1.4.2'],
+    'zarr': ['zarr>=2.2.0'],
+}
 
 
 class CleanCommand(Command):
@@ -117,6 +122,7 @@ setup(
     packages=find_packages(),
     setup_requires=setup_requires,
     install_requires=setup_requires+install_requires,
+    extras_require=extras_require,
     cmdclass={'clean': CleanCommand},
     ext_modules=ext_modules,
     test_suite='glotaran',